@@ -0,0 +1,331 @@
+"""
+Benchmarks of the construction and evaluation hot paths of the signals package.
+
+Every case is timed with time.perf_counter as the best of several repeats, and its peak memory is measured with
+tracemalloc in a separate run, so the tracing overhead does not affect the timings. Results can be saved as a named
+baseline and later runs compared against it:
+
+    python benchmarks/run.py --save master
+    python benchmarks/run.py --compare master
+    python benchmarks/run.py --quick --filter eval_on
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import signals
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Sequence
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class Case(NamedTuple):
+    """Benchmark case, setup(param) returns the function to time and the number of samples it produces."""
+
+    name: str
+    params: Sequence[int]
+    quick_params: Sequence[int]
+    setup: Callable[[int], tuple]
+
+
+def _reference() -> signals.BaseSignal:
+    """Typical reference signal: doublet and step sequence on top of periodic signals."""
+    return (
+        signals.Doublet(t_start=1.0, ampl=2.0, block_width=0.5)
+        + signals.StepSequence(np.arange(1.0, 101.0), np.sin(np.arange(100.0)))
+        + signals.SeeSaw(t_start=2.0, ampl=0.5, freq=0.2)
+        + 0.1 * signals.Sinusoid(freq=1.3)
+    )
+
+
+def _deep_tree(depth: int) -> signals.BaseSignal:
+    signal = signals.Const(0.0)
+    for k in range(depth):
+        signal = signal + (k + 1.0) * signals.Step(t_start=0.01 * k)
+    return signal
+
+
+def expression_construction(n: int):
+    """Sum of n scaled steps built with the arithmetic operators, the peak memory is the size of the tree."""
+    return lambda: _deep_tree(n), n
+
+
+def scalar_call_deep_tree(depth: int):
+    signal = _deep_tree(depth)
+    t = [0.013 * k for k in range(100)]
+
+    def run():
+        for tk in t:
+            signal(tk)
+
+    return run, len(t)
+
+
+def eval_on(n: int):
+    signal = _reference()
+    t = np.linspace(0.0, 120.0, n)
+    return lambda: signal.eval_on(t), n
+
+
+def grid_eval_on(n: int):
+    """Reference signal on a UniformGrid, without the time vector and with the grid fast paths."""
+    signal = _reference()
+    grid = signals.UniformGrid(0.0, 120.0 / n, n)
+    return lambda: signal.eval_on(grid), n
+
+
+def repeated_maneuver(count: int):
+    """A 3211 maneuver repeated count times on 10^5 samples, the cost does not grow with the repetitions."""
+    signal = signals.ThreeTwoOneOne(t_start=1.0).repeat(period=10.0, count=count)
+    t = np.linspace(0.0, 10.0 * count, 10**5)
+    return lambda: signal.eval_on(t), t.size
+
+
+def tabulated_call(n_terms: int):
+    """Scalar calls of a table of a reference with n_terms smoothed steps and sinusoids, tabulated to 1e-6."""
+    signal = signals.SmoothedStepSequence(
+        np.arange(n_terms, dtype=float), np.cos(np.arange(n_terms)), smooth_width=0.3
+    ) + signals.Sinusoid(t_end=float(n_terms), freq=0.7)
+    table = signal.tabulate(0.0, float(n_terms), tol=1e-6, kind="cubic")
+    t = np.linspace(0.0, n_terms, 1000).tolist()
+    return lambda: [table(x) for x in t], len(t)
+
+
+def filtered_reference(n: int):
+    """Rate limited and lowpass filtered step and sinusoid on n samples, from the first sample at every call."""
+    signal = 5 * signals.Step(t_start=1.0, t_end=6.0) + signals.Sinusoid(freq=0.7)
+    dt = 1e-3
+    t = np.arange(n) * dt
+
+    def run():
+        filtered = signal.rate_limit(rate=4.0, dt=dt).lowpass2(freq=2.0, dt=dt)
+        return filtered(t)
+
+    return run, n
+
+
+def guarded_division(n: int):
+    """Quotient of the example expression on n samples, a fifth of which have a zero denominator."""
+    e = signals.Exponential(t_start=2.0, alpha=0.1)
+    s = signals.Sinusoid(t_start=2.0)
+    signal = (s * 2 * e + 3 * signals.Ramp() - 4 * s) / (2 * e)
+    t = np.linspace(0.0, 10.0, n)
+
+    def run():
+        with signals.errstate(fill_value=0.0):
+            return signal(t)
+
+    return run, n
+
+
+def parallel_eval_on(workers: int):
+    """Composite sinusoid with a hundred components on 10^5 samples, split over a thread pool."""
+    signal = signals.CompositeSinusoid(
+        0.0, 100.0, frequencies=np.linspace(0.05, 5.0, 100), amplitudes=np.ones(100)
+    )
+    t = np.linspace(0.0, 100.0, 10**5)
+    return lambda: signal.eval_on(t, workers=workers), t.size
+
+
+def multisine_grid(n_components: int):
+    """Multisine on a uniform grid of 10^5 samples, synthesized with the FFT or rotating phasors."""
+    f = np.linspace(0.1, 20.0, n_components) * 1.001
+    signal = signals.CompositeSinusoid(0.0, np.inf, f, np.ones(n_components))
+    return lambda: signal.eval_grid(10**5, 1e-3), 10**5
+
+
+def step_sequence(n: int):
+    times, amplitudes = np.arange(n, dtype=float), np.cos(np.arange(n, dtype=float))
+    return lambda: signals.StepSequence(times, amplitudes), n
+
+
+def smoothed_step_sequence(n: int):
+    times, amplitudes = np.arange(n, dtype=float), np.cos(np.arange(n, dtype=float))
+    return lambda: signals.SmoothedStepSequence(times, amplitudes, 0.5), n
+
+
+def periodic_signals(n: int):
+    """Construction of SeeSaw and AlternatingRamp followed by an evaluation on n samples."""
+    t = np.linspace(0.0, 100.0, n)
+
+    def run():
+        signals.SeeSaw(t_start=1.0, t_end=90.0, ampl=1.0, freq=0.3).eval_on(t)
+        signals.AlternatingRamp(
+            t_start=1.0, t_end=90.0, ampl_max=2.0, freq=0.3
+        ).eval_on(t)
+
+    return run, 2 * n
+
+
+def randomized_sequence(n: int):
+    def run():
+        signals.RandomizedCosineStepSequence(
+            t_max=float(n), ampl_max=1.0, block_width=1.0, smooth_width=0.5, rng=0
+        )
+
+    return run, n
+
+
+def randomized_sequence_batch(batch: int):
+    t = np.linspace(0.0, 60.0, 1000)
+
+    def run():
+        signals.RandomizedStepSequenceBatch(
+            batch, t_max=60.0, ampl_max=1.0, block_width=2.0, rng=0
+        ).eval_on(t)
+
+    return run, batch * t.size
+
+
+def cold_import(n_names: int):
+    """Fresh interpreter that imports the package and uses its first n_names public names."""
+    code = f"import signals\nfor name in signals.__all__[:{n_names}]: getattr(signals, name)"
+    return lambda: subprocess.run([sys.executable, "-c", code], check=True), 1
+
+
+CASES = [
+    Case("expression_construction", [10**3, 10**5], [10**3], expression_construction),
+    Case("scalar_call_deep_tree", [10, 100, 500], [10, 100], scalar_call_deep_tree),
+    Case("eval_on", [10**3, 10**4, 10**5, 10**6, 10**7], [10**3, 10**5], eval_on),
+    Case("grid_eval_on", [10**3, 10**5, 10**7], [10**3, 10**5], grid_eval_on),
+    Case("repeated_maneuver", [1, 100, 10**4], [1, 100], repeated_maneuver),
+    Case("tabulated_call", [10, 10**3], [10], tabulated_call),
+    Case(
+        "filtered_reference", [10**3, 10**5, 10**6], [10**3, 10**5], filtered_reference
+    ),
+    Case("guarded_division", [10**3, 10**5, 10**6], [10**3, 10**5], guarded_division),
+    Case("parallel_eval_on", [1, 2, 4, 8], [1, 2], parallel_eval_on),
+    Case("multisine_grid", [50, 500], [50], multisine_grid),
+    Case("step_sequence", [10, 10**3, 10**5], [10, 10**3], step_sequence),
+    Case(
+        "smoothed_step_sequence",
+        [10, 10**3, 10**5],
+        [10, 10**3],
+        smoothed_step_sequence,
+    ),
+    Case("periodic_signals", [10**3, 10**5], [10**3], periodic_signals),
+    Case("randomized_sequence", [10, 10**3, 10**5], [10, 10**3], randomized_sequence),
+    Case("randomized_sequence_batch", [10, 10**3], [10], randomized_sequence_batch),
+    Case("cold_import", [0, 4, 35], [4], cold_import),
+]
+
+
+def measure(run: Callable, repeat: int, min_time: float) -> float:
+    """Best time per call in seconds, every repeat calls run often enough to last at least min_time."""
+    number, elapsed = 1, 0.0
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0.0 else max(2, int(min_time / elapsed) + 1)
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def peak_memory(run: Callable) -> int:
+    """Peak number of bytes allocated by one call."""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_cases(
+    cases: List[Case], quick: bool, pattern: str, repeat: int, min_time: float
+) -> Dict[str, dict]:
+    results = {}
+    for case in cases:
+        if pattern not in case.name:
+            continue
+        for param in case.quick_params if quick else case.params:
+            run, samples = case.setup(param)
+            seconds = measure(run, repeat, min_time)
+            results[f"{case.name}[{param}]"] = {
+                "seconds": seconds,
+                "samples_per_second": samples / seconds,
+                "peak_bytes": peak_memory(run),
+            }
+            _print_row(f"{case.name}[{param}]", results[f"{case.name}[{param}]"])
+    return results
+
+
+def _print_row(name: str, result: dict, reference: dict = None):
+    row = (
+        f"{name:<40s} {result['seconds'] * 1e3:12.4f} ms "
+        f"{result['samples_per_second']:14.4g} samples/s "
+        f"{result['peak_bytes'] / 2**20:10.2f} MiB"
+    )
+    if reference is not None:
+        row += f"   x{reference['seconds'] / result['seconds']:.2f} speed-up"
+    print(row)
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="only the small sizes")
+    parser.add_argument(
+        "--filter", default="", help="only cases whose name contains this"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats per case")
+    parser.add_argument(
+        "--min-time", type=float, default=0.05, help="seconds per repeat"
+    )
+    parser.add_argument("--save", metavar="NAME", help="save the results as a baseline")
+    parser.add_argument(
+        "--compare", metavar="NAME", help="compare with a saved baseline"
+    )
+    args = parser.parse_args()
+
+    results = run_cases(CASES, args.quick, args.filter, args.repeat, args.min_time)
+
+    if args.compare:
+        baseline = json.loads((RESULTS_DIR / f"{args.compare}.json").read_text())
+        print(
+            f"\nCompared with baseline {args.compare} ({baseline['meta']['commit']}):"
+        )
+        for name, result in results.items():
+            if name in baseline["results"]:
+                _print_row(name, result, baseline["results"][name])
+
+    if args.save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{args.save}.json"
+        path.write_text(json.dumps({"meta": _metadata(), "results": results}, indent=2))
+        print(f"\nSaved baseline to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,8 @@ def main():
 
     # Time array:
     t = np.arange(0, 10.0, 0.01)
-    s1 = step_sequence.eval_on(t=t)
-    s2 = smoothed_step_sequence.eval_on(t=t)
+    s1 = step_sequence.eval_on(t)
+    s2 = smoothed_step_sequence.eval_on(t)
 
     import matplotlib.pyplot as plt
 
@@ -1,4 +1,4 @@
-from signals import Step, Sinusoid, Exponential, Ramp
+from signals import Step, Sinusoid, Exponential, Ramp, errstate
 
 
 def main():
@@ -12,6 +12,11 @@ def main():
 
     print(f"Signal value at 4 seconds is: {x(4.0):.3f}")
 
+    # Before 2 seconds the denominator is zero
+    with errstate(fill_value=0.0) as report:
+        print(f"Signal value at 1 second is: {x(1.0):.3f}")
+    print(f"Filled divisions by zero: {report.zero_division}")
+
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,125 @@
-from .base_signal import BaseSignal, Signal, Const
-from .simple_signals import Step, Ramp, Exponential, Parabolic, Sinusoid
-from .complex_signals import SeeSaw, AlternatingRamp, RampSinusoid, CosineSmoothedStep
-from .aerospace_signals import ThreeTwoOneOne, Doublet, CompositeSinusoid
-from .stochastic_signals import RandomizedStepSequence, RandomizedCosineStepSequence
-from .sequences import StepSequence, SmoothedStepSequence
+"""
+Signals for control tasks.
+
+The public names are loaded lazily: a submodule is only imported when one of its names is first accessed, so a
+process that only needs a Step does not pay for importing the sequences, the serialization or the other modules.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "BaseSignal": "base_signal",
+    "Signal": "base_signal",
+    "Const": "base_signal",
+    "Step": "simple_signals",
+    "Ramp": "simple_signals",
+    "Exponential": "simple_signals",
+    "ExponentialRise": "simple_signals",
+    "Parabolic": "simple_signals",
+    "Sinusoid": "simple_signals",
+    "SeeSaw": "complex_signals",
+    "AlternatingRamp": "complex_signals",
+    "RampSinusoid": "complex_signals",
+    "CosineSmoothedStep": "complex_signals",
+    "MultiSine": "complex_signals",
+    "ThreeTwoOneOne": "aerospace_signals",
+    "Doublet": "aerospace_signals",
+    "CompositeSinusoid": "aerospace_signals",
+    "schroeder_phases": "aerospace_signals",
+    "RandomizedStepSequence": "stochastic_signals",
+    "RandomizedCosineStepSequence": "stochastic_signals",
+    "RandomizedStepSequenceBatch": "stochastic_signals",
+    "RandomizedCosineStepSequenceBatch": "stochastic_signals",
+    "StepSequence": "sequences",
+    "SmoothedStepSequence": "sequences",
+    "StepSequenceBatch": "sequences",
+    "PiecewiseSignal": "piecewise",
+    "SignalBank": "bank",
+    "eval_many": "bank",
+    "EvaluationCache": "cache",
+    "eval_grid_into": "export",
+    "save_npy": "export",
+    "to_dict": "serialization",
+    "from_dict": "serialization",
+    "save_signals": "serialization",
+    "load_signals": "serialization",
+    "profile": "profiling",
+    "UniformGrid": "grid",
+    "TabulatedSignal": "tabulate",
+    "ReferencePublisher": "publisher",
+    "FakeClock": "publisher",
+    "Saturated": "filters",
+    "RateLimited": "filters",
+    "FirstOrderLowpass": "filters",
+    "SecondOrderLowpass": "filters",
+    "LinearFilter": "filters",
+    "errstate": "guards",
+    "ErrorReport": "guards",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    # Later lookups find the name in the module dict and skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .base_signal import BaseSignal, Signal, Const
+    from .simple_signals import (
+        Step,
+        Ramp,
+        Exponential,
+        ExponentialRise,
+        Parabolic,
+        Sinusoid,
+    )
+    from .complex_signals import (
+        SeeSaw,
+        AlternatingRamp,
+        RampSinusoid,
+        CosineSmoothedStep,
+        MultiSine,
+    )
+    from .aerospace_signals import (
+        ThreeTwoOneOne,
+        Doublet,
+        CompositeSinusoid,
+        schroeder_phases,
+    )
+    from .stochastic_signals import (
+        RandomizedStepSequence,
+        RandomizedCosineStepSequence,
+        RandomizedStepSequenceBatch,
+        RandomizedCosineStepSequenceBatch,
+    )
+    from .sequences import StepSequence, SmoothedStepSequence, StepSequenceBatch
+    from .piecewise import PiecewiseSignal
+    from .bank import SignalBank, eval_many
+    from .cache import EvaluationCache
+    from .export import eval_grid_into, save_npy
+    from .serialization import to_dict, from_dict, save_signals, load_signals
+    from .profiling import profile
+    from .grid import UniformGrid
+    from .tabulate import TabulatedSignal
+    from .publisher import ReferencePublisher, FakeClock
+    from .filters import (
+        Saturated,
+        RateLimited,
+        FirstOrderLowpass,
+        SecondOrderLowpass,
+        LinearFilter,
+    )
+    from .guards import errstate, ErrorReport
@@ -1,7 +1,8 @@
-from typing import List
+import numpy as np
+from typing import List, Optional
 from signals.base_signal import Signal
-from signals.simple_signals import Step, Sinusoid
-from signals.complex_signals import CosineSmoothedStep
+from signals.simple_signals import Step
+from signals.complex_signals import CosineSmoothedStep, MultiSine
 
 
 def Doublet(t_start: float, ampl: float, block_width: float) -> Signal:
@@ -24,17 +25,47 @@ def ThreeTwoOneOne(
 
 
 def CompositeSinusoid(
-    t_start: float, t_end: float, frequencies: List[float], amplitudes: List[float]
-) -> Signal:
-    """Provide a list of frequencies and amplitudes to build a composite sinusoid wave."""
+    t_start: float,
+    t_end: float,
+    frequencies: List[float],
+    amplitudes: List[float],
+    phases: Optional[List[float]] = None,
+    schroeder: bool = False,
+) -> MultiSine:
+    """
+    Provide a list of frequencies and amplitudes to build a composite sinusoid wave. The phases default to zero,
+    with schroeder=True they are chosen with schroeder_phases() for a low peak factor.
+    """
     assert len(frequencies) == len(
         amplitudes
     ), "frequencies and amplitudes arguments must be of the same length"
+    assert phases is None or not schroeder, "provide either phases or schroeder=True"
+
+    if schroeder:
+        phases = schroeder_phases(frequencies, amplitudes)
+
+    return MultiSine(
+        t_start=t_start,
+        t_end=t_end,
+        frequencies=frequencies,
+        amplitudes=amplitudes,
+        phases=phases,
+    )
+
+
+def schroeder_phases(frequencies: List[float], amplitudes: List[float]) -> np.ndarray:
+    """
+    Schroeder phases for a multisine with a low peak factor. In order of increasing frequency the phase of component k
+    is phi_k = -2 pi sum_{l < k} (k - l) p_l, with p_l the fraction of the power in component l.
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    power = np.asarray(amplitudes, dtype=float) ** 2
+    order = np.argsort(frequencies, kind="stable")
 
-    s = 0
-    for f, a in zip(frequencies, amplitudes):
-        s = s + Sinusoid(t_start=t_start, t_end=t_end, ampl=a, freq=f)
-    return s
+    p = power[order] / max(power.sum(), np.finfo(float).tiny)
+    phases = np.empty(frequencies.size)
+    phases[order] = -2.0 * np.pi * np.concatenate(([0.0], np.cumsum(np.cumsum(p))[:-1]))
+    return np.mod(phases, 2.0 * np.pi)
 
 
 def ThreeTwoOneOneSmoothed(
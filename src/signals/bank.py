@@ -0,0 +1,163 @@
+"""
+Batched evaluation of many independent signals on a shared time vector.
+
+The signals are decomposed into scaled terms and terms of the same leaf type are gathered across all signals, so
+that for instance every Sinusoid of every channel is evaluated by a single broadcast np.sin call.
+"""
+
+from __future__ import annotations
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
+from signals.base_signal import BaseSignal
+from signals.simple_signals import Step, Sinusoid
+from signals.complex_signals import MultiSine
+from signals.tree import linear_terms
+
+ArrayLike = Union[list, tuple, np.ndarray]
+
+# Upper bound on the number of elements of the temporary (n_terms, n_times) blocks of a group
+_BLOCK_ELEMENTS = 1 << 20
+
+
+class _Group:
+    """Terms of one leaf type, sorted by the row of the signal they belong to."""
+
+    def __init__(self, rows: List[int], params: List[Tuple[float, ...]], n_params: int):
+        order = np.argsort(rows, kind="stable")
+        rows = np.asarray(rows, dtype=int)[order]
+        self.params = np.asarray(params, dtype=float).reshape(len(rows), n_params)
+        self.params = self.params[order]
+
+        # Rows that receive a contribution and the first term of each of them, as used by np.add.reduceat
+        self.rows, self.starts = np.unique(rows, return_index=True)
+
+    def __len__(self) -> int:
+        return self.params.shape[0]
+
+    def column(self, i: int) -> np.ndarray:
+        return self.params[:, i, np.newaxis]
+
+    def accumulate(self, out: np.ndarray, values: np.ndarray):
+        """Add the (n_terms, n_times) values to the rows of out that the terms belong to."""
+        if len(self.rows) == len(self):
+            out[self.rows] += values
+        else:
+            out[self.rows] += np.add.reduceat(values, self.starts, axis=0)
+
+
+class SignalBank:
+    """
+    Evaluates a list of signals on a shared time vector into an (n_signals, n_times) array.
+
+    Step and Sinusoid terms of all signals, including the components of MultiSine signals, are evaluated together in
+    broadcast numpy operations, any other term is evaluated with its own array path. Like a compiled signal, the bank
+    is a snapshot of the signals it was built from.
+    """
+
+    def __init__(self, signals: Sequence[BaseSignal]):
+        self.signals = list(signals)
+        self.consts = np.zeros(len(self.signals))
+
+        steps_rows, steps = [], []
+        sines_rows, sines = [], []
+        self.generic: List[Tuple[int, float, BaseSignal]] = []
+
+        for row, signal in enumerate(self.signals):
+            self.consts[row], terms = linear_terms(signal)
+            for coef, node in terms:
+                if type(node) is Step:
+                    steps_rows.append(row)
+                    steps.append((coef, node.t_start, node.t_end))
+                elif type(node) is Sinusoid:
+                    sines_rows.append(row)
+                    sines.append(
+                        (coef, node.t_start, node.t_end, node.ampl, node.freq, node.phi)
+                    )
+                elif type(node) is MultiSine:
+                    for f, a, phi in zip(
+                        node.frequencies, node.amplitudes, node.phases
+                    ):
+                        sines_rows.append(row)
+                        sines.append((coef, node.t_start, node.t_end, a, f, phi))
+                else:
+                    self.generic.append((row, coef, node))
+
+        self.steps = _Group(steps_rows, steps, n_params=3)
+        self.sines = _Group(sines_rows, sines, n_params=6)
+
+    def __len__(self) -> int:
+        return len(self.signals)
+
+    def __call__(self, t: ArrayLike, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Evaluate all signals at the timestamps t, optionally writing into the (n_signals, n_times) buffer out."""
+        # A scalar timestamp is a single column of the output
+        t = np.asarray(t, dtype=float).reshape(-1)
+        shape = (len(self.signals), t.size)
+        if out is None:
+            out = np.empty(shape)
+        assert out.shape == shape, f"output buffer must have shape {shape}"
+
+        out[:] = self.consts[:, np.newaxis]
+
+        # On sorted timestamps every step is a contiguous run of samples, the runs are added with a difference array
+        is_sorted = bool(np.all(t[1:] >= t[:-1]))
+        if is_sorted and len(self.steps):
+            self._eval_sorted_steps(t, out)
+
+        # The grouped terms are evaluated in blocks of timestamps to bound the size of the temporaries
+        n_group = max(len(self.sines), 0 if is_sorted else len(self.steps), 1)
+        block = max(_BLOCK_ELEMENTS // n_group, 1)
+        for lo in range(0, t.size, block):
+            self._eval_groups(t[lo : lo + block], out[:, lo : lo + block], is_sorted)
+
+        for row, coef, node in self.generic:
+            out[row] += coef * node(t)
+        return out
+
+    def _eval_sorted_steps(self, t: np.ndarray, out: np.ndarray):
+        coef, t_start, t_end = self.steps.params.T
+        first = np.searchsorted(t, t_start, side="left")
+        # A step with an empty window, t_end <= t_start, covers no samples
+        last = np.maximum(np.searchsorted(t, t_end, side="left"), first)
+        rows = np.repeat(
+            self.steps.rows, np.diff(np.append(self.steps.starts, len(coef)))
+        )
+
+        diff = np.zeros((len(self.signals), t.size + 1))
+        np.add.at(diff, (rows, first), coef)
+        np.add.at(diff, (rows, last), -coef)
+        out += np.cumsum(diff[:, :-1], axis=1)
+
+    def _eval_groups(self, t: np.ndarray, out: np.ndarray, is_sorted: bool):
+        if len(self.steps) and not is_sorted:
+            coef, t_start, t_end = (self.steps.column(i) for i in range(3))
+            active = (t_start <= t) & (t < t_end)
+            self.steps.accumulate(out, coef * active)
+
+        if len(self.sines):
+            coef, t_start, t_end, ampl, freq, phi = (
+                self.sines.column(i) for i in range(6)
+            )
+            values = coef * (ampl * np.sin(2.0 * np.pi * freq * (t - t_start) + phi))
+
+            # Windows are only applied if some sinusoid is inactive somewhere in the block
+            if t.size and (np.any(t_start > t.min()) or np.any(t_end <= t.max())):
+                values = np.where((t_start <= t) & (t < t_end), values, 0.0)
+            self.sines.accumulate(out, values)
+
+
+def eval_many(
+    signals: Sequence[BaseSignal],
+    t: ArrayLike,
+    out: Optional[np.ndarray] = None,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Evaluate a list of signals on a shared time vector into an (n_signals, n_times) array. With a number of workers
+    the signals are split over a thread pool, with the same results.
+    """
+    if workers is not None:
+        from signals.parallel import parallel_eval_many
+
+        return parallel_eval_many(signals, t, out=out, workers=workers)
+    return SignalBank(signals)(t, out=out)
@@ -1,16 +1,68 @@
 from __future__ import annotations
 import numpy as np
 from abc import abstractmethod, ABC
-from dataclasses import dataclass, field
-from typing import List, Tuple, Union
+from dataclasses import dataclass, field, fields
+from typing import List, Optional, Tuple, Union
+from signals.guards import divide
+
+# Support interval of a signal that is zero everywhere
+EMPTY_SUPPORT = (np.inf, -np.inf)
+
+
+def union_support(
+    a: Tuple[float, float], b: Tuple[float, float]
+) -> Tuple[float, float]:
+    """Smallest interval that contains both support intervals."""
+    return min(a[0], b[0]), max(a[1], b[1])
+
+
+def intersect_support(
+    a: Tuple[float, float], b: Tuple[float, float]
+) -> Tuple[float, float]:
+    """Intersection of two support intervals."""
+    lo, hi = max(a[0], b[0]), min(a[1], b[1])
+    return (lo, hi) if lo < hi else EMPTY_SUPPORT
+
+
+def add_slots(cls: type) -> type:
+    """
+    Class decorator that rebuilds a dataclass with __slots__ for its fields, so that its instances have no __dict__.
+    Apply it on top of @dataclass, like dataclass(slots=True) which is only available from Python 3.10. Methods of the
+    decorated class must not use the zero-argument form of super(), which is bound to the original class.
+    """
+    inherited = {
+        name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())
+    }
+    own = tuple(cls.__dict__.get("__slots__", ()))
+    names = [f.name for f in fields(cls)] + list(own)
+
+    namespace = dict(cls.__dict__)
+    namespace["__slots__"] = tuple(
+        n for n in dict.fromkeys(names) if n not in inherited
+    )
+
+    # Field defaults are class attributes that would shadow the slots, the generated __init__ keeps its own copy
+    for name in names:
+        namespace.pop(name, None)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
 
 
 class BaseSignal:
     """
     This base class defines the lhs and rhs arithmetic operation calls (+, -, * and /) for different operand
     types.
+
+    The signal nodes are slotted dataclasses, so an instance only stores its fields and large expression trees stay
+    compact in memory. Subclasses that do not define __slots__ get a regular __dict__.
     """
 
+    __slots__ = ()
+
     def __add__(self, other: Union[BaseSignal, float, int]) -> BaseSignal:
         if isinstance(other, BaseSignal):
             return SumOfSignals(self, other)
@@ -83,68 +135,405 @@ class BaseSignal:
                 f"Operand / was called for types: {type(other)} / {type(self)}"
             )
 
-    def __call__(self, t: float) -> float:
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         raise NotImplementedError
 
+    @property
+    def support(self) -> Tuple[float, float]:
+        """Interval [lo, hi) outside of which the signal is known to evaluate to zero."""
+        return -np.inf, np.inf
+
+    def eval_on(
+        self,
+        t_array: Union[np.ndarray, List[Union[int, float]], Tuple[Union[int, float]]],
+        workers: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Evaluate the signal on an array of timestamps in a single vectorized pass. With a number of workers the
+        time axis is split into blocks that are evaluated by a thread pool, with the same results. The timestamps
+        can also be a UniformGrid, which is evaluated without building the time vector, see signals.grid.
+        """
+        from signals.grid import UniformGrid, eval_on_grid
+
+        if workers is not None:
+            from signals.parallel import parallel_eval
+
+            return parallel_eval(self, t_array, workers=workers)
+        if isinstance(t_array, UniformGrid):
+            return eval_on_grid(self, t_array)
+        return self.__call__(np.asarray(t_array, dtype=float))
+
+    def eval_into(
+        self,
+        t_array: Union[np.ndarray, List[Union[int, float]], Tuple[Union[int, float]]],
+        out: np.ndarray,
+        chunk: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Evaluate the signal on an array of timestamps directly into the preallocated array out (which may be a
+        np.memmap). The timestamps are evaluated in blocks of chunk samples to bound the size of the temporaries.
+        """
+        from signals.export import eval_into, DEFAULT_CHUNK
+
+        return eval_into(self, t_array, out, chunk=chunk or DEFAULT_CHUNK)
+
+    def derivative(self, order: int = 1) -> BaseSignal:
+        """
+        Analytic derivative of the given order as a new signal. Jumps, such as the edges of a window, do not add
+        impulses, so the derivative holds almost everywhere.
+        """
+        from signals.calculus import derivative
+
+        return derivative(self, order)
+
+    def integral(self) -> BaseSignal:
+        """Analytic integral of the signal from -inf to t as a new signal."""
+        from signals.calculus import integral
+
+        return integral(self)
+
+    def eval_with_derivatives(
+        self, t: Union[float, np.ndarray], order: int = 2
+    ) -> np.ndarray:
+        """Evaluate the signal and its derivatives up to order, stacked along the first axis of the result."""
+        from signals.calculus import eval_with_derivatives
+
+        return eval_with_derivatives(self, t, order)
+
+    def _eval_grid(self, grid) -> np.ndarray:
+        """Evaluate this node on a UniformGrid, used by eval_on_grid(). Defaults to the timestamps of the grid."""
+        return self(grid.times())
+
+    def _derivative(self) -> BaseSignal:
+        """Closed-form derivative of this node, used by derivative()."""
+        raise NotImplementedError(
+            f"no closed-form derivative for {type(self).__name__}"
+        )
+
+    def _integral(self) -> BaseSignal:
+        """Closed-form integral from -inf of this node, used by integral()."""
+        raise NotImplementedError(f"no closed-form integral for {type(self).__name__}")
+
+    def shift(self, dt: float) -> BaseSignal:
+        """The signal delayed by dt, s(t - dt), as a node that shares this expression."""
+        from signals.transforms import Shifted
+
+        if type(self) is Shifted:
+            return Shifted(self.signal, self.delay + dt)
+        return Shifted(self, dt)
+
+    def scale_time(self, k: float) -> BaseSignal:
+        """The signal on a time axis stretched by k > 0, s(t / k), as a node that shares this expression."""
+        from signals.transforms import TimeScaled
 
+        return TimeScaled(self, k)
+
+    def repeat(
+        self,
+        period: float,
+        count: Optional[int] = None,
+        t_start: Optional[float] = None,
+    ) -> BaseSignal:
+        """
+        Repeat the window [t_start, t_start + period) of the signal count times, or forever. The window starts by
+        default at the start of the support of the signal, or at zero if the signal has no finite start. Queries are
+        mapped to their phase within the period, so the cost of an evaluation does not grow with the repetitions.
+        """
+        from signals.transforms import Repeated
+
+        if t_start is None:
+            lo = self.support[0]
+            t_start = lo if np.isfinite(lo) else 0.0
+        return Repeated(self, period, count, t_start)
+
+    def divide(
+        self, other: Union[BaseSignal, float, int], fill_value: float
+    ) -> BaseSignal:
+        """Divide the signal by other, the quotient evaluates to fill_value where other is zero."""
+        assert isinstance(
+            other, (BaseSignal, float, int)
+        ), "can only divide by a signal or a number"
+        if not isinstance(other, BaseSignal):
+            other = Const(value=other)
+        return DivisionOfSignals(self, other, fill_value)
+
+    def saturate(self, lower: float = -np.inf, upper: float = np.inf) -> BaseSignal:
+        """Clip the signal to [lower, upper]."""
+        from signals.filters import Saturated
+
+        return Saturated(self, lower, upper)
+
+    def rate_limit(
+        self, rate: float, dt: float, t_start: float = 0.0, steady_state: bool = False
+    ) -> BaseSignal:
+        """
+        Limit the rate of change of the signal to rate, sampled every dt from t_start. The limiter starts from zero,
+        or from the signal at t_start if steady_state is set. It is a stateful operator, see signals.filters.
+        """
+        from signals.filters import RateLimited
+
+        return RateLimited(
+            self, dt=dt, t_start=t_start, steady_state=steady_state, rate=rate
+        )
+
+    def lowpass(
+        self, tau: float, dt: float, t_start: float = 0.0, steady_state: bool = False
+    ) -> BaseSignal:
+        """
+        Filter the signal by a first order lowpass with time constant tau, sampled every dt from t_start. The filter
+        starts from rest, or at the steady state for the signal at t_start if steady_state is set.
+        """
+        from signals.filters import FirstOrderLowpass
+
+        return FirstOrderLowpass(
+            self, dt=dt, t_start=t_start, steady_state=steady_state, tau=tau
+        )
+
+    def lowpass2(
+        self,
+        freq: float,
+        dt: float,
+        zeta: float = np.sqrt(0.5),
+        t_start: float = 0.0,
+        steady_state: bool = False,
+    ) -> BaseSignal:
+        """
+        Filter the signal by a second order lowpass with natural frequency freq (in Hz) and damping ratio zeta,
+        sampled every dt from t_start. The filter starts from rest, or at the steady state for the signal at t_start
+        if steady_state is set.
+        """
+        from signals.filters import SecondOrderLowpass
+
+        return SecondOrderLowpass(
+            self,
+            dt=dt,
+            t_start=t_start,
+            steady_state=steady_state,
+            freq=freq,
+            zeta=zeta,
+        )
+
+    def lfilter(
+        self,
+        b: Union[List[float], np.ndarray],
+        a: Union[List[float], np.ndarray],
+        dt: float,
+        t_start: float = 0.0,
+        steady_state: bool = False,
+    ) -> BaseSignal:
+        """
+        Filter the samples of the signal every dt from t_start by the IIR filter with numerator b and denominator a,
+        with the conventions of scipy.signal.lfilter. The filter starts from rest, or at the steady state for the
+        signal at t_start if steady_state is set.
+        """
+        from signals.filters import LinearFilter
+
+        return LinearFilter(
+            self, dt=dt, t_start=t_start, steady_state=steady_state, b=b, a=a
+        )
+
+    def compile(self) -> BaseSignal:
+        """
+        Compile the expression into a single fused evaluator with the same call semantics. Constants are folded,
+        associative sums and products are flattened, so the cost of a call does not grow with the depth of the tree.
+        """
+        from signals.compiler import compile_signal
+
+        return compile_signal(self)
+
+    def tabulate(
+        self, t0: float, t1: float, tol: float = 1e-6, kind: str = "linear"
+    ) -> BaseSignal:
+        """
+        Sample the signal once on [t0, t1) into a lookup table with linear or cubic interpolation. The knots are
+        refined around the breakpoints of the expression until the interpolation error is below tol, the achieved
+        error and memory footprint are reported by the error and nbytes of the returned TabulatedSignal.
+        """
+        from signals.tabulate import tabulate
+
+        return tabulate(self, t0, t1, tol=tol, kind=kind)
+
+    def simplify(self) -> BaseSignal:
+        """
+        Return an equivalent expression in canonical form: scalar factors and constants are folded, zero terms are
+        dropped, equal leaves share one coefficient and steps of equal height on adjacent windows are joined.
+        """
+        from signals.simplify import simplify
+
+        return simplify(self)
+
+    def stream(
+        self,
+        dt: float,
+        t0: float = 0.0,
+        chunk: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+    ):
+        """
+        Iterate over the signal at the monotonically increasing time-steps t0 + k * dt. Terms of the signal that have
+        ended are dropped from the stream, so the cost of a tick does not grow with the number of expired steps.
+        With a chunk size the samples are returned in blocks, written into the (optionally provided) buffer out.
+        """
+        from signals.streaming import SignalStream
+
+        return SignalStream(self, dt=dt, t0=t0, chunk=chunk, out=out)
+
+    def indexed(self) -> BaseSignal:
+        """
+        Build an interval index over the terms of the signal, so that evaluations only touch the terms whose support
+        contains the query time.
+        """
+        from signals.intervals import IndexedSignal
+
+        return IndexedSignal(self)
+
+    def cached(self, cache=None, frozen: bool = True) -> BaseSignal:
+        """
+        Wrap the signal so that its evaluations are stored in an LRU cache (a new one, or the provided
+        EvaluationCache). Entries are keyed on the parameters of the whole expression, computed once for a frozen
+        signal, which must not be modified afterwards unless refresh() is called on the returned CachedSignal. With
+        frozen=False the parameters are hashed at every evaluation, so modifying the signal invalidates the entries.
+        """
+        from signals.cache import CachedSignal
+
+        return CachedSignal(self, cache=cache, frozen=frozen)
+
+
+@add_slots
 @dataclass
 class TwoSidedOperation(BaseSignal, ABC):
-    """Container class to define an arithmetic operations left and right hand side."""
+    """Container class to define an arithmetic operations left and right hand side.
+
+    Both operands are evaluated on the same query, so a call with an array of timestamps results in one
+    elementwise array operation per node.
+    """
 
     lhs: Union[BaseSignal, float, int]
     rhs: Union[BaseSignal, float, int]
 
+    @property
+    def support(self) -> Tuple[float, float]:
+        from signals.tree import support
+
+        return support(self)
+
+    def _combine_support(
+        self, lhs: Tuple[float, float], rhs: Tuple[float, float]
+    ) -> Tuple[float, float]:
+        """Support of the operation given the supports of its operands."""
+        return -np.inf, np.inf
+
 
 class SumOfSignals(TwoSidedOperation):
-    def __call__(self, t: float) -> float:
+    __slots__ = ()
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return self.lhs(t) + self.rhs(t)
 
+    def _combine_support(self, lhs, rhs):
+        return union_support(lhs, rhs)
+
 
 class DifferenceOfSignals(TwoSidedOperation):
-    def __call__(self, t: float) -> float:
+    __slots__ = ()
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return self.lhs(t) - self.rhs(t)
 
+    def _combine_support(self, lhs, rhs):
+        return union_support(lhs, rhs)
+
 
 class ProductOfSignals(TwoSidedOperation):
-    def __call__(self, t: float) -> float:
+    __slots__ = ()
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return self.lhs(t) * self.rhs(t)
 
+    def _combine_support(self, lhs, rhs):
+        return intersect_support(lhs, rhs)
+
 
+@add_slots
+@dataclass
 class DivisionOfSignals(TwoSidedOperation):
-    def __call__(self, t: float) -> float:
-        return self.lhs(t) / self.rhs(t)
+    """
+    Quotient of two signals. Where the denominator is zero the quotient evaluates to fill_value, or to the fill value
+    of the enclosing signals.guards.errstate() block (nan by default) when it is None.
+    """
+
+    fill_value: Optional[float] = None
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        return divide(self.lhs(t), self.rhs(t), self.fill_value)
+
+    def _combine_support(self, lhs, rhs):
+        from signals.tree import constant_value
+
+        # Outside the numerator's support the quotient is only zero if the denominator cannot be zero there
+        if constant_value(self.rhs) not in (None, 0.0):
+            return lhs
+        return -np.inf, np.inf
 
 
+@add_slots
 @dataclass
 class Signal(BaseSignal, ABC):
     """
     Signal objects can be called at time t (float) to return their (float) value.
     The signals are defined on the domain t in [t_start, t_end] and evaluate to zeto outside those bounds.
     The default domain is [0, inf]
+
+    Calling a signal with a numpy array of timestamps evaluates the window mask and the _signal() kernel on the
+    whole array at once. The kernel only receives the timestamps inside the window, so _signal() implementations
+    should be written with numpy operations that work on both floats and arrays.
     """
 
     t_start: float = field(default=0.0, init=True)
     t_end: float = field(default=np.PINF, init=True)
 
-    def __call__(self, t: float) -> float:
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return self._eval_array(t)
+
         if self.t_start <= t < self.t_end:
             return self._signal(t - self.t_start)
         else:
             return 0.0
 
+    @property
+    def support(self) -> Tuple[float, float]:
+        return (
+            (self.t_start, self.t_end) if self.t_start < self.t_end else EMPTY_SUPPORT
+        )
+
+    def _eval_array(self, t: np.ndarray) -> np.ndarray:
+        """Evaluate the signal on an array of timestamps, masking out the samples outside [t_start, t_end)."""
+        out = np.zeros(t.shape)
+        mask = (self.t_start <= t) & (t < self.t_end)
+        if mask.any():
+            out[mask] = self._signal(t[mask] - self.t_start)
+        return out
+
+    def _eval_grid(self, grid) -> np.ndarray:
+        """Evaluate the signal on a UniformGrid, the window [t_start, t_end) is located by index arithmetic."""
+        out = np.zeros(grid.n)
+        lo, hi = grid.window(self.t_start, self.t_end)
+        if lo < hi:
+            out[lo:hi] = self._grid_signal(grid.block(lo, hi))
+        return out
+
+    def _grid_signal(self, grid) -> Union[float, np.ndarray]:
+        """Evaluate the kernel on a grid inside the window, by default on its timestamps."""
+        return self._signal(grid.times() - self.t_start)
+
     @abstractmethod
-    def _signal(self, t: float) -> float:
-        """Evaluate the signal at time-step t."""
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Evaluate the signal at time-step t (a float or an array of time-steps inside the window)."""
         raise NotImplementedError
 
-    def eval_on(
-        self,
-        t_array: Union[np.ndarray, List[Union[int, float]], Tuple[Union[int, float]]],
-    ) -> np.ndarray:
-        """Evaluate the signal on an array of timestamps."""
-        return np.array([self.__call__(t_i) for t_i in t_array])
-
 
+@add_slots
 @dataclass
 class Const(Signal):
     """Signal with a constant value defined on domain [-inf, +inf]"""
@@ -152,5 +541,21 @@ class Const(Signal):
     value: float = 0.0
     t_start: float = np.NINF
 
-    def _signal(self, t: float) -> float:
+    @property
+    def support(self) -> Tuple[float, float]:
+        return EMPTY_SUPPORT if self.value == 0.0 else Signal.support.fget(self)
+
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return self.value
+
+    def _derivative(self) -> BaseSignal:
+        return Const(value=0.0)
+
+    def _integral(self) -> BaseSignal:
+        from signals.piecewise import PiecewiseSignal
+
+        if self.value == 0.0:
+            return Const(value=0.0)
+        return PiecewiseSignal.window(
+            self.t_start, self.t_end, [self.value]
+        )._integral()
@@ -0,0 +1,153 @@
+"""
+Opt-in cache of evaluation results, for signals that are evaluated again and again on the same time grids.
+
+Entries are keyed on the fingerprint of the expression and a fingerprint of the queried timestamps. The expression
+fingerprint covers the parameters of every node. A cached signal computes it once, since hashing the whole tree costs
+more than evaluating most expressions, so the expression must not be modified afterwards or refresh() must be called.
+Signals that are modified in place can be cached with frozen=False instead, the fingerprint is then recomputed at every
+lookup and changing a field of a node simply leads to a miss.
+
+The cache can be shared by threads, the lookups and updates of the entries are serialized by a lock and the
+evaluations of the misses run outside of it.
+"""
+
+from __future__ import annotations
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional, Tuple, Union
+from signals.base_signal import BaseSignal
+from signals.tree import fingerprint
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    nbytes: int
+
+
+def time_key(t: Union[float, np.ndarray]) -> Hashable:
+    """Fingerprint of the timestamps of a query, scalars are keyed on their value."""
+    if not isinstance(t, np.ndarray):
+        return float(t)
+    t = np.ascontiguousarray(t)
+    digest = hashlib.blake2b(t.tobytes(), digest_size=16).digest()
+    return t.dtype.str, t.shape, digest
+
+
+class EvaluationCache:
+    """
+    Least recently used cache of evaluation results, bounded by the number of entries and optionally by the total
+    size of the cached arrays. Cached arrays are returned read-only, since they are shared by all queries that hit
+    the same entry.
+    """
+
+    def __init__(self, maxsize: int = 128, max_bytes: Optional[int] = None):
+        assert maxsize > 0, "the cache must hold at least one entry"
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions, len(self._entries), self.nbytes
+            )
+
+    def clear(self):
+        """Drop all entries, the hit and miss counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def evaluate(
+        self,
+        signal: BaseSignal,
+        t: Union[float, np.ndarray],
+        key: Optional[bytes] = None,
+    ) -> Union[float, np.ndarray]:
+        """Return signal(t) from the cache, evaluating and storing it on a miss."""
+        if key is None:
+            key = fingerprint(signal)
+        entry_key = (key, time_key(t))
+
+        with self._lock:
+            value = self._entries.get(entry_key)
+            if value is not None:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = signal(t)
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+        with self._lock:
+            self._store(entry_key, value)
+        return value
+
+    def _store(self, key: Tuple, value: Union[float, np.ndarray]):
+        # Called with the lock held
+        size = value.nbytes if isinstance(value, np.ndarray) else 0
+
+        # Results that do not fit the byte budget on their own are not cached
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        # Another thread may have stored the same entry while the value was evaluated
+        previous = self._entries.pop(key, None)
+        if isinstance(previous, np.ndarray):
+            self.nbytes -= previous.nbytes
+
+        self._entries[key] = value
+        self.nbytes += size
+        while len(self._entries) > self.maxsize or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes if isinstance(evicted, np.ndarray) else 0
+            self.evictions += 1
+
+
+class CachedSignal(BaseSignal):
+    """
+    Signal that evaluates the wrapped expression through an EvaluationCache, created with BaseSignal.cached().
+    Several cached signals can share one cache.
+    """
+
+    def __init__(
+        self,
+        signal: BaseSignal,
+        cache: Optional[EvaluationCache] = None,
+        frozen: bool = True,
+    ):
+        self.signal = signal
+        self.cache = EvaluationCache() if cache is None else cache
+        self.frozen = frozen
+        self.refresh()
+
+    def refresh(self):
+        """Compute the fingerprint of a frozen expression again, after it was modified."""
+        self._key = fingerprint(self.signal) if self.frozen else None
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        return self.signal.support
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.signal!r})"
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        return self.cache.evaluate(self.signal, t, key=self._key)
@@ -0,0 +1,123 @@
+"""
+Analytic derivatives and integrals of signal expressions.
+
+Sums, differences and scaling by constants are handled by decomposing the expression into its linear terms, products
+and quotients of signals use the product and quotient rules. Every leaf provides its own closed form through the
+_derivative() and _integral() methods, built from the existing signal types.
+
+Derivatives hold almost everywhere: the jumps of a signal, for instance at the edges of its window, are not turned
+into impulses. Integrals run from -inf, so they are only defined for signals whose support is bounded below.
+"""
+
+from __future__ import annotations
+import numpy as np
+from typing import List, Union
+from signals.base_signal import (
+    BaseSignal,
+    Const,
+    TwoSidedOperation,
+    SumOfSignals,
+    ProductOfSignals,
+    DivisionOfSignals,
+)
+from signals.tree import balanced_tree, constant_value, linear_terms
+
+ArrayLike = Union[list, tuple, np.ndarray]
+
+
+def _is_zero(signal: BaseSignal) -> bool:
+    return constant_value(signal) == 0.0
+
+
+def _combine(terms: List[BaseSignal]) -> BaseSignal:
+    terms = [term for term in terms if not _is_zero(term)]
+    return balanced_tree(terms, SumOfSignals) if terms else Const(value=0.0)
+
+
+def _scaled(coef: float, signal: BaseSignal) -> BaseSignal:
+    return signal if coef == 1.0 else ProductOfSignals(signal, Const(value=coef))
+
+
+def _node_derivative(node: BaseSignal) -> BaseSignal:
+    if isinstance(node, ProductOfSignals):
+        u, v = node.lhs, node.rhs
+        du, dv = derivative(u), derivative(v)
+        terms = []
+        if not _is_zero(du):
+            terms.append(ProductOfSignals(du, v))
+        if not _is_zero(dv):
+            terms.append(ProductOfSignals(u, dv))
+        return _combine(terms)
+
+    if isinstance(node, DivisionOfSignals):
+        u, v = node.lhs, node.rhs
+        du, dv = derivative(u), derivative(v)
+        terms = []
+        if not _is_zero(du):
+            terms.append(DivisionOfSignals(du, v, node.fill_value))
+        if not _is_zero(dv):
+            terms.append(
+                ProductOfSignals(
+                    Const(value=-1.0),
+                    DivisionOfSignals(
+                        ProductOfSignals(u, dv), ProductOfSignals(v, v), node.fill_value
+                    ),
+                )
+            )
+        return _combine(terms)
+
+    if isinstance(node, TwoSidedOperation):
+        raise NotImplementedError(f"no derivative rule for {type(node).__name__}")
+    return node._derivative()
+
+
+def derivative(signal: Union[BaseSignal, float, int], order: int = 1) -> BaseSignal:
+    """Derivative of the given order of a signal expression, as a new expression."""
+    assert order >= 0, "the order of a derivative must be non-negative"
+    if not isinstance(signal, BaseSignal):
+        signal = Const(value=float(signal))
+
+    for _ in range(order):
+        _, terms = linear_terms(signal)
+        signal = _combine(
+            [_scaled(coef, _node_derivative(node)) for coef, node in terms]
+        )
+    return signal
+
+
+def integral(signal: BaseSignal) -> BaseSignal:
+    """
+    Integral of a signal expression from -inf to t, as a new expression. Raises a ValueError for signals that are not
+    zero towards -inf and a NotImplementedError for terms without a closed-form integral, such as products of signals.
+    """
+    const, terms = linear_terms(signal)
+    if const != 0.0:
+        raise ValueError("the integral of a signal with a constant offset is unbounded")
+
+    integrals = []
+    for coef, node in terms:
+        if isinstance(node, TwoSidedOperation):
+            raise NotImplementedError(
+                f"no closed-form integral for {type(node).__name__} of two signals"
+            )
+        integrals.append(_scaled(coef, node._integral()))
+    return _combine(integrals)
+
+
+def eval_with_derivatives(
+    signal: BaseSignal, t: Union[float, ArrayLike], order: int = 2
+) -> np.ndarray:
+    """
+    Evaluate a signal and its derivatives up to the given order at the timestamps t, returned as an array of shape
+    (order + 1,) + t.shape. All derivatives are evaluated together in a SignalBank, so the terms of the same type
+    are gathered over the value, the rate and the acceleration.
+    """
+    from signals.bank import SignalBank
+
+    t = np.asarray(t, dtype=float)
+    expressions = [signal]
+    for _ in range(order):
+        expressions.append(derivative(expressions[-1]))
+
+    out = SignalBank(expressions)(t.reshape(-1))
+    return out.reshape((order + 1,) + t.shape)
@@ -0,0 +1,379 @@
+"""
+Expression compiler for signal trees.
+
+The tree built by the BaseSignal arithmetic is lowered into a flat intermediate representation where associative
+sums and products are n-ary, full-domain constants are folded into scalar coefficients and repeated leaves share a
+single coefficient. The representation is then emitted as the source code of two straight-line Python functions,
+one for scalar and one for array queries, so that the cost per call does not depend on the depth of the tree.
+"""
+
+from __future__ import annotations
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from signals.base_signal import (
+    BaseSignal,
+    Signal,
+    Const,
+    TwoSidedOperation,
+    SumOfSignals,
+    DifferenceOfSignals,
+    ProductOfSignals,
+    DivisionOfSignals,
+)
+from signals.simple_signals import Step
+from signals.guards import divide
+from signals.tree import constant_value
+
+
+class _Leaf:
+    """A signal that is evaluated as-is by the compiled function."""
+
+    __slots__ = ("signal", "key")
+
+    def __init__(self, signal: BaseSignal):
+        self.signal = signal
+        self.key = ("leaf", id(signal))
+
+
+class _Lin:
+    """Linear combination const + sum(coef * term) of terms that are leaves, products or divisions."""
+
+    __slots__ = ("const", "terms", "_key")
+
+    def __init__(self, const: float = 0.0):
+        self.const = const
+        self.terms: Dict[tuple, list] = {}
+        self._key = None
+
+    @property
+    def key(self) -> tuple:
+        if self._key is None:
+            self._key = (
+                "lin",
+                self.const,
+                frozenset((k, c) for k, (c, _) in self.terms.items()),
+            )
+        return self._key
+
+    def add_term(self, coef: float, node: Union[_Leaf, _Prod, _Div]):
+        entry = self.terms.get(node.key)
+        if entry is None:
+            self.terms[node.key] = [coef, node]
+        else:
+            entry[0] += coef
+
+    def is_const(self) -> bool:
+        return not self.terms
+
+
+class _Prod:
+    """N-ary product of factors."""
+
+    __slots__ = ("factors", "key")
+
+    def __init__(self, factors: list):
+        self.factors = factors
+        self.key = ("prod",) + tuple(sorted((f.key for f in factors), key=hash))
+
+
+class _Div:
+    """Quotient of two linear combinations, with the fill value of the samples where the denominator is zero."""
+
+    __slots__ = ("num", "den", "fill_value", "key")
+
+    def __init__(self, num: _Lin, den: _Lin, fill_value: Optional[float] = None):
+        self.num = num
+        self.den = den
+        self.fill_value = fill_value
+        self.key = ("div", num.key, den.key, fill_value)
+
+
+def _lower_leaf(node: Union[BaseSignal, float, int]) -> _Lin:
+    """Lower a node that is not an arithmetic operation."""
+    value = constant_value(node)
+    if value is not None:
+        return _Lin(value)
+
+    lin = _Lin()
+    lin.add_term(1.0, _Leaf(node))
+    return lin
+
+
+def _copy(lin: _Lin, owned: bool) -> _Lin:
+    """Return a linear combination that may be modified in place."""
+    if owned:
+        lin._key = None
+        return lin
+    new = _Lin(lin.const)
+    new.terms = {k: [c, n] for k, (c, n) in lin.terms.items()}
+    return new
+
+
+def _scale(lin: _Lin, factor: float, owned: bool) -> _Lin:
+    if factor == 0.0:
+        return _Lin()
+
+    out = _copy(lin, owned)
+    out.const *= factor
+    for entry in out.terms.values():
+        entry[0] *= factor
+    return out
+
+
+def _add(lhs: _Lin, rhs: _Lin, sign: float, lhs_owned: bool, rhs_owned: bool) -> _Lin:
+    # Merge the smaller combination into the larger one, this keeps long sum chains linear in their length
+    if sign > 0 and rhs_owned and len(rhs.terms) > len(lhs.terms):
+        lhs, rhs, lhs_owned = rhs, lhs, rhs_owned
+
+    out = _copy(lhs, lhs_owned)
+    out.const += sign * rhs.const
+    for key, (coef, node) in rhs.terms.items():
+        out.add_term(sign * coef, node)
+
+        # Terms that cancel out are removed
+        if out.terms[key][0] == 0.0:
+            del out.terms[key]
+    return out
+
+
+def _as_factor(lin: _Lin):
+    """Split a linear combination into a scalar coefficient and a list of product factors."""
+    if lin.const == 0.0 and len(lin.terms) == 1:
+        coef, node = next(iter(lin.terms.values()))
+        if isinstance(node, _Prod):
+            return coef, list(node.factors)
+        return coef, [node]
+    return 1.0, [lin]
+
+
+def _mul(lhs: _Lin, rhs: _Lin, lhs_owned: bool, rhs_owned: bool) -> _Lin:
+    if lhs.is_const():
+        return _scale(rhs, lhs.const, rhs_owned)
+    if rhs.is_const():
+        return _scale(lhs, rhs.const, lhs_owned)
+
+    coef_l, factors_l = _as_factor(lhs)
+    coef_r, factors_r = _as_factor(rhs)
+    out = _Lin()
+    out.add_term(coef_l * coef_r, _Prod(factors_l + factors_r))
+    return out
+
+
+def _div(
+    lhs: _Lin, rhs: _Lin, lhs_owned: bool, fill_value: Optional[float] = None
+) -> _Lin:
+    if rhs.is_const() and rhs.const != 0.0:
+        return _scale(lhs, 1.0 / rhs.const, lhs_owned)
+
+    out = _Lin()
+    out.add_term(1.0, _Div(lhs, rhs, fill_value))
+    return out
+
+
+def _count_parents(root: BaseSignal) -> Dict[int, int]:
+    """Count how many times each node is referenced, shared nodes must not be modified in place when lowering."""
+    counts = {id(root): 1}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, TwoSidedOperation):
+            for child in (node.lhs, node.rhs):
+                if counts.get(id(child), 0) == 0:
+                    stack.append(child)
+                counts[id(child)] = counts.get(id(child), 0) + 1
+    return counts
+
+
+def lower(root: BaseSignal) -> _Lin:
+    """Lower a signal expression into its flattened linear-combination form without recursion."""
+    counts = _count_parents(root)
+    lowered: Dict[int, _Lin] = {}
+    stack = [(root, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in lowered:
+            continue
+
+        if not isinstance(node, TwoSidedOperation):
+            lowered[id(node)] = _lower_leaf(node)
+            continue
+
+        if not expanded:
+            stack.append((node, True))
+            stack.append((node.rhs, False))
+            stack.append((node.lhs, False))
+            continue
+
+        lhs, rhs = lowered[id(node.lhs)], lowered[id(node.rhs)]
+        lhs_owned = counts[id(node.lhs)] == 1 and node.lhs is not node.rhs
+        rhs_owned = counts[id(node.rhs)] == 1 and node.lhs is not node.rhs
+
+        if isinstance(node, SumOfSignals):
+            result = _add(lhs, rhs, 1.0, lhs_owned, rhs_owned)
+        elif isinstance(node, DifferenceOfSignals):
+            result = _add(lhs, rhs, -1.0, lhs_owned, rhs_owned)
+        elif isinstance(node, ProductOfSignals):
+            result = _mul(lhs, rhs, lhs_owned, rhs_owned)
+        elif isinstance(node, DivisionOfSignals):
+            result = _div(lhs, rhs, lhs_owned, node.fill_value)
+        else:
+            result = _lower_leaf(node)
+        lowered[id(node)] = result
+
+    return lowered[id(root)]
+
+
+class _Emitter:
+    """Emits straight-line Python source code for a lowered expression."""
+
+    def __init__(self, array: bool):
+        self.array = array
+        self.lines: List[str] = []
+        self.namespace: Dict[str, object] = {"np": np}
+        self.names: Dict[object, str] = {}
+
+    def _new_var(self) -> str:
+        return f"v{len(self.lines)}"
+
+    def _bind(self, value: object) -> str:
+        name = f"_g{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def _number(self, value: float) -> str:
+        value = float(value)
+        return repr(value) if np.isfinite(value) else self._bind(value)
+
+    def _memo_key(self, node) -> object:
+        return id(node) if isinstance(node, _Lin) else node.key
+
+    def _children(self, node) -> list:
+        if isinstance(node, _Lin):
+            return [n for _, n in node.terms.values()]
+        if isinstance(node, _Prod):
+            return node.factors
+        if isinstance(node, _Div):
+            return [node.num, node.den]
+        return []
+
+    def emit(self, root: _Lin) -> str:
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if self._memo_key(node) in self.names:
+                continue
+            children = self._children(node)
+            if children and not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children))
+                continue
+            self.names[self._memo_key(node)] = self._emit_node(node)
+        return self.names[self._memo_key(root)]
+
+    def _var(self, node) -> str:
+        return self.names[self._memo_key(node)]
+
+    def _assign(self, expr: str) -> str:
+        var = self._new_var()
+        self.lines.append(f"{var} = {expr}")
+        return var
+
+    def _emit_node(self, node) -> str:
+        if isinstance(node, _Leaf):
+            return self._emit_leaf(node.signal)
+        if isinstance(node, _Prod):
+            return self._assign(" * ".join(self._var(f) for f in node.factors))
+        if isinstance(node, _Div):
+            return self._emit_div(node)
+        return self._emit_lin(node)
+
+    def _emit_div(self, node: _Div) -> str:
+        num, den = self._var(node.num), self._var(node.den)
+        fill = "None" if node.fill_value is None else self._number(node.fill_value)
+        guarded = f"{self._bind(divide)}({num}, {den}, {fill})"
+        if self.array:
+            return self._assign(guarded)
+        # Scalar queries divide inline and only call the guard for a zero denominator
+        return self._assign(f"{num} / {den} if {den} != 0.0 else {guarded}")
+
+    def _emit_leaf(self, signal: BaseSignal) -> str:
+        if not isinstance(signal, Signal):
+            return self._assign(f"{self._bind(signal)}(t)")
+
+        t_start, t_end = self._number(signal.t_start), self._number(signal.t_end)
+        if self.array:
+            if type(signal) is Step:
+                return self._assign(f"(({t_start} <= t) & (t < {t_end})) * 1.0")
+            return self._assign(f"{self._bind(signal)}(t)")
+
+        if type(signal) is Step:
+            value = "1.0"
+        elif type(signal) is Const:
+            value = self._number(signal.value)
+        else:
+            value = f"{self._bind(signal._signal)}(t - {t_start})"
+        return self._assign(f"{value} if {t_start} <= t < {t_end} else 0.0")
+
+    def _emit_lin(self, lin: _Lin) -> str:
+        terms = []
+        for coef, node in lin.terms.values():
+            var = self._var(node)
+            terms.append(var if coef == 1.0 else f"{self._number(coef)} * {var}")
+
+        if not terms:
+            if self.array:
+                return self._assign(f"np.full(t.shape, {self._number(lin.const)})")
+            return self._assign(self._number(lin.const))
+
+        if lin.const != 0.0:
+            terms.append(self._number(lin.const))
+        if len(terms) == 1:
+            return self._assign(terms[0])
+
+        # The first statement allocates a new accumulator, further terms are added in place
+        var = self._assign(f"{terms[0]} + {terms[1]}")
+        for term in terms[2:]:
+            self.lines.append(f"{var} += {term}")
+        return var
+
+    def build(self, root: _Lin, name: str) -> Callable:
+        result = self.emit(root)
+        body = "\n".join(f"    {line}" for line in self.lines)
+        self.source = f"def {name}(t):\n{body}\n    return {result}\n"
+        exec(compile(self.source, f"<compiled signal {name}>", "exec"), self.namespace)
+        return self.namespace[name]
+
+
+class CompiledSignal(BaseSignal):
+    """
+    Fused evaluator of a signal expression, created with BaseSignal.compile().
+
+    The compiled function is a snapshot of the tree structure and window bounds at compile time. Changing the
+    original tree afterwards requires compiling it again.
+    """
+
+    def __init__(self, signal: BaseSignal):
+        self.signal = signal
+        lin = lower(signal)
+
+        scalar = _Emitter(array=False)
+        self._scalar = scalar.build(lin, "scalar_signal")
+        array = _Emitter(array=True)
+        self._array = array.build(lin, "array_signal")
+
+        self.source = scalar.source + "\n\n" + array.source
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return self._array(t)
+        return self._scalar(t)
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        return self.signal.support
+
+
+def compile_signal(signal: BaseSignal) -> CompiledSignal:
+    """Compile a signal expression into a single fused evaluator with the same call semantics."""
+    return CompiledSignal(signal)
@@ -1,36 +1,35 @@
-from dataclasses import dataclass
-from signals.base_signal import Signal
-from signals.simple_signals import Sinusoid, Ramp
+from dataclasses import dataclass, field
+from typing import Union
+from signals.base_signal import BaseSignal, Signal, add_slots
+from signals.simple_signals import Sinusoid, Ramp, Step
+from signals.piecewise import PiecewiseSignal, COSINE
+from signals.grid import RECURRENCE_BLOCK, UniformGrid
 import numpy as np
 
 
+@add_slots
+@dataclass
 class SeeSaw(Signal):
     """Alternating linear zigzag signal with a constant amplitude and frequency."""
 
-    def __init__(
-        self, t_start: float, t_end: float, ampl: float = 1.0, freq: float = 1.0
-    ):
-        super().__init__(t_start, t_end)
-        self.halfperiod = 1 / (2 * freq)
-        self.sine = Sinusoid(ampl=ampl, freq=freq)
-
-        # Sample the discrete points from the sinusoid:
-        self.sampling_times = np.arange(
-            self.t_start - self.halfperiod / 2, t_end + self.halfperiod, self.halfperiod
-        )
-
-        # Correct for the half-period shift
-        self.sampling_times[0] = self.t_start
+    ampl: float = 1.0
+    freq: float = 1.0
 
-        # Discrete samples
-        self.samples = np.array([self.sine(t) for t in self.sampling_times])
+    @property
+    def halfperiod(self) -> float:
+        return 1 / (2 * self.freq)
 
-    def _signal(self, t: float) -> float:
-        return np.interp(t, self.sampling_times, self.samples)
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        # Triangle wave through the peaks of ampl * sin(2 pi freq t), rising from zero at t = 0
+        phase = np.mod(self.freq * t - 0.25, 1.0)
+        return self.ampl * (4.0 * np.abs(phase - 0.5) - 1.0)
 
 
+@add_slots
 @dataclass
 class RampSinusoid(Signal):
+    __slots__ = ("sine",)
+
     ampl_max: float = 1.0
     freq: float = 1.0
 
@@ -38,47 +37,225 @@ class RampSinusoid(Signal):
         rate = self.ampl_max / (self.t_end - self.t_start)
         self.sine = rate * Ramp(t_start=self.t_start) * Sinusoid(freq=self.freq)
 
-    def _signal(self, t: float) -> float:
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return self.sine(t)
 
 
+@add_slots
+@dataclass
 class AlternatingRamp(Signal):
     """Alternating linear zigzag signal with a linearly increasing amplitude and frequency."""
 
-    def __init__(
-        self, t_start: float, t_end: float, ampl_max: float = 1.0, freq: float = 1.0
-    ):
-        super().__init__(t_start, t_end)
-        self.ampl_max = ampl_max
-        self.freq = freq
+    ampl_max: float = 1.0
+    freq: float = 1.0
 
-        self.period = 1 / freq
-        self.halfperiod = 1 / (2 * freq)
+    @property
+    def halfperiod(self) -> float:
+        return 1 / (2 * self.freq)
 
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        # Linear interpolation between the peaks of rate * t * sin(2 pi freq t) at t_k = (k - 1/2) * halfperiod,
+        # which alternate in sign and grow linearly in magnitude. The first half period ramps up from zero.
         rate = self.ampl_max / (self.t_end - self.t_start)
-        self.sine = rate * Ramp(t_start=self.t_start) * Sinusoid(freq=self.freq)
+        hp = self.halfperiod
+
+        u = t / hp + 0.5
+        k = np.floor(u)
+        frac = u - k
+        sign = 1.0 - 2.0 * np.mod(k + 1.0, 2.0)
+        zigzag = sign * rate * hp * (k - 0.5 - 2.0 * k * frac)
+        return np.where(k < 1.0, rate * t, zigzag)[()]
+
+
+@add_slots
+@dataclass
+class CosineSmoothedStep(Signal):
+    width: float = 1.0
+
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        # Past the transition the cosine is evaluated at pi, which yields exactly 1.0
+        t = np.minimum(t, self.width)
+        return -(np.cos(np.pi * t / self.width) - 1) / 2
+
+    def _derivative(self) -> BaseSignal:
+        # Half a period of a sine during the transition, zero once it has completed
+        w = self.width
+        t_end = min(self.t_end, self.t_start + w)
+        return Sinusoid(self.t_start, t_end, ampl=np.pi / (2 * w), freq=1 / (2 * w))
+
+    def _integral(self) -> BaseSignal:
+        params = (1.0, self.width, 0.0)
+        pw = PiecewiseSignal.window(self.t_start, self.t_end, [0.0], COSINE, params)
+        return pw._integral()
+
+
+# Upper bound on the number of elements of the temporary (n_components, n_times) blocks of a MultiSine evaluation
+_BLOCK_ELEMENTS = 1 << 16
+
+
+@add_slots
+@dataclass(eq=False)
+class MultiSine(Signal):
+    """
+    Sum of sinusoids sum_k a_k * sin(2 pi f_k t + phi_k), stored as arrays of frequencies, amplitudes and phases.
+
+    Arrays of timestamps are evaluated in blocks of an (n_components, n_times) broadcast, which adds the components
+    in the same order as a sum of Sinusoid signals. On a uniform time grid eval_grid() synthesizes the samples with
+    an inverse FFT when all frequencies fall on the bins of the grid, and with rotating phasors otherwise.
+    """
 
-        # Sample the discrete points from the sinusoid:
-        self.sampling_times = np.arange(
-            self.t_start - self.halfperiod / 2, t_end + self.halfperiod, self.halfperiod
+    frequencies: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    amplitudes: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    phases: np.ndarray = None
+
+    def __post_init__(self):
+        self.frequencies = np.asarray(self.frequencies, dtype=float).reshape(-1)
+        self.amplitudes = np.asarray(self.amplitudes, dtype=float).reshape(-1)
+        if self.phases is None:
+            self.phases = np.zeros_like(self.frequencies)
+        self.phases = np.asarray(self.phases, dtype=float).reshape(-1)
+
+        assert (
+            self.frequencies.shape == self.amplitudes.shape == self.phases.shape
+        ), "frequencies, amplitudes and phases must be of the same length"
+
+    @property
+    def n_components(self) -> int:
+        return self.frequencies.size
+
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return self._broadcast(t)
+
+        values = self.amplitudes * np.sin(
+            2.0 * np.pi * self.frequencies * t + self.phases
         )
+        return sum(values.tolist())
 
-        # Correct for the half-period shift
-        self.sampling_times[0] = self.t_start
+    def _derivative(self) -> BaseSignal:
+        omega = 2.0 * np.pi * self.frequencies
+        return MultiSine(
+            self.t_start,
+            self.t_end,
+            frequencies=self.frequencies,
+            amplitudes=self.amplitudes * omega,
+            phases=self.phases + np.pi / 2,
+        )
 
-        # Discrete samples
-        self.samples = np.array([self.sine(t) for t in self.sampling_times])
+    def _integral(self) -> BaseSignal:
+        if self.t_start == -np.inf:
+            raise ValueError(
+                "the integral of a signal that starts at -inf is unbounded"
+            )
 
-    def _signal(self, t: float) -> float:
-        return np.interp(t, self.sampling_times, self.samples)
+        # Every component integrates to a / omega * (cos(phi) - cos(omega * tau + phi)), constant components to ramps
+        omega = 2.0 * np.pi * self.frequencies
+        moving = omega != 0.0
+        ampl = self.amplitudes[moving] / omega[moving]
+        phi = self.phases[moving]
+        offset = float(np.sum(ampl * np.cos(phi)))
+        rate = float(np.sum(self.amplitudes[~moving] * np.sin(self.phases[~moving])))
 
+        window = dict(t_start=self.t_start, t_end=self.t_end)
+        signal = MultiSine(
+            **window,
+            frequencies=self.frequencies[moving],
+            amplitudes=ampl,
+            phases=phi - np.pi / 2,
+        )
+        signal = signal + offset * Step(**window) + rate * Ramp(**window)
 
-@dataclass
-class CosineSmoothedStep(Signal):
-    width: float = 1.0
+        if np.isfinite(self.t_end):
+            length = self.t_end - self.t_start
+            final = offset - np.sum(ampl * np.cos(omega[moving] * length + phi))
+            signal = signal + (final + rate * length) * Step(t_start=self.t_end)
+        return signal
+
+    def _broadcast(self, t: np.ndarray) -> np.ndarray:
+        out = np.empty(t.shape)
+        t_flat, out_flat = t.reshape(-1), out.reshape(-1)
+        omega = (2.0 * np.pi * self.frequencies)[:, np.newaxis]
+        ampl, phi = self.amplitudes[:, np.newaxis], self.phases[:, np.newaxis]
 
-    def _signal(self, t: float) -> float:
-        if t < self.width:
-            return -(np.cos(np.pi * t / self.width) - 1) / 2
+        # Reducing along the first axis adds the components one after the other for every sample
+        block = max(_BLOCK_ELEMENTS // max(self.n_components, 1), 1)
+        for lo in range(0, t_flat.size, block):
+            values = np.sin(omega * t_flat[lo : lo + block] + phi)
+            values *= ampl
+            values.sum(axis=0, out=out_flat[lo : lo + block])
+        return out
+
+    def eval_grid(
+        self, n: int, dt: float, t0: float = 0.0, method: str = "auto"
+    ) -> np.ndarray:
+        """
+        Evaluate the signal at the n time-steps t0 + k * dt. The method is "fft" when every frequency is a multiple
+        of 1 / (n * dt) up to the Nyquist frequency, "recurrence" for rotating phasors that are re-synchronized at the
+        start of every block, or "direct" for the broadcast evaluation. "auto" picks the FFT whenever it applies.
+
+        An expression evaluated on a UniformGrid uses the recurrence, which gives the same samples on every block of
+        the grid, while the rounding of the FFT depends on the number of time-steps.
+        """
+        assert method in ("auto", "fft", "recurrence", "direct"), "unknown method"
+        grid = UniformGrid(t0, dt, n)
+        if method == "direct":
+            return self(grid.times())
+        return self._eval_grid(grid, method)
+
+    def _eval_grid(self, grid: UniformGrid, method: str = "recurrence") -> np.ndarray:
+        n, dt = grid.n, grid.dt
+        if n == 0:
+            return np.zeros(0)
+        bins = self.frequencies * n * dt
+        on_bins = np.all(np.abs(bins - np.round(bins)) < 1e-9) and np.all(
+            (bins > -0.5) & (bins < n // 2 + 0.5)
+        )
+        assert method != "fft" or on_bins, "the frequencies are not on the FFT bins"
+
+        # Phase of every component at the first time-step
+        theta = (
+            2.0 * np.pi * self.frequencies * (grid.time(0) - self.t_start) + self.phases
+        )
+        if on_bins and method != "recurrence":
+            out = self._fft(n, np.round(bins).astype(int), theta)
         else:
-            return 1.0
+            out = self._recurrence(grid)
+
+        lo, hi = grid.window(self.t_start, self.t_end)
+        out[:lo] = 0.0
+        out[hi:] = 0.0
+        return out
+
+    def _fft(self, n: int, bins: np.ndarray, theta: np.ndarray) -> np.ndarray:
+        # a * sin(2 pi b k / n + theta) is the real part of a * exp(i (theta - pi / 2)) * exp(2 pi i b k / n)
+        spectrum = np.zeros(n // 2 + 1, dtype=complex)
+        coefs = 0.5 * n * self.amplitudes * np.exp(1j * (theta - 0.5 * np.pi))
+
+        # The bins at zero and at the Nyquist frequency only have a real part, which is not mirrored
+        edge = (bins == 0) | (2 * bins == n)
+        coefs[edge] = n * self.amplitudes[edge] * np.sin(theta[edge])
+        np.add.at(spectrum, bins, coefs)
+        return np.fft.irfft(spectrum, n)
+
+    def _recurrence(self, grid: UniformGrid) -> np.ndarray:
+        # The phasors of one block are a fixed rotation table, every block only needs the phasors at its start. The
+        # blocks are aligned on the indices of the time-steps like the recurrences of signals.grid.
+        block = min(
+            max(_BLOCK_ELEMENTS // max(self.n_components, 1), 1), RECURRENCE_BLOCK
+        )
+        omega = 2.0 * np.pi * self.frequencies
+        rotations = np.exp(1j * (omega * grid.dt)[:, np.newaxis] * np.arange(block))
+        times, skip = grid.block_times(block)
+
+        out = np.empty(grid.n)
+        pos = 0
+        for i, t in enumerate(times):
+            start = self.amplitudes * np.exp(
+                1j * (omega * (t - self.t_start) + self.phases)
+            )
+            values = (start @ rotations).imag
+            lo = skip if i == 0 else 0
+            size = min(block - lo, grid.n - pos)
+            out[pos : pos + size] = values[lo : lo + size]
+            pos += size
+        return out
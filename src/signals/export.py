@@ -0,0 +1,75 @@
+"""
+Blocked evaluation of signals into preallocated outputs, for time ranges that are too long to evaluate in one pass.
+
+The timestamps are evaluated in fixed-size blocks and each block is written into its slice of the output, so the peak
+memory of an evaluation only depends on the block size. The output can be any writable array, including a np.memmap
+or an .npy file on disk created by save_npy().
+"""
+
+from __future__ import annotations
+import numpy as np
+from os import PathLike
+from typing import Union
+from signals.base_signal import BaseSignal
+from signals.grid import UniformGrid, eval_on_grid
+
+ArrayLike = Union[list, tuple, np.ndarray]
+
+# Default number of timestamps per block
+DEFAULT_CHUNK = 1 << 16
+
+
+def eval_into(
+    signal: BaseSignal, t: ArrayLike, out: np.ndarray, chunk: int = DEFAULT_CHUNK
+) -> np.ndarray:
+    """Evaluate the signal at the timestamps t into out, one block of chunk timestamps at a time."""
+    t = np.asarray(t, dtype=float)
+    assert out.shape == t.shape, "the output must have the shape of the timestamps"
+    assert chunk > 0, "the chunk size must be positive"
+    assert out.ndim <= 1 or out.flags.c_contiguous, "the output must be contiguous"
+
+    t_flat, out_flat = t.reshape(-1), out.reshape(-1)
+    for lo in range(0, t_flat.size, chunk):
+        out_flat[lo : lo + chunk] = signal(t_flat[lo : lo + chunk])
+    return out
+
+
+def eval_grid_into(
+    signal: BaseSignal,
+    out: np.ndarray,
+    dt: float,
+    t0: float = 0.0,
+    chunk: int = DEFAULT_CHUNK,
+) -> np.ndarray:
+    """
+    Evaluate the signal at the time-steps t_k = t0 + k * dt for k = 0 ... len(out) - 1 into out. Every block is
+    evaluated as a UniformGrid, so the time vector is never stored in full and the windows, breakpoints and
+    periodic kernels use the grid fast paths of signals.grid. The result does not depend on the chunk size.
+    """
+    assert out.ndim == 1, "the output of a time grid must be one-dimensional"
+    assert chunk > 0, "the chunk size must be positive"
+
+    n = out.shape[0]
+    grid = UniformGrid(t0, dt, n)
+    for lo in range(0, n, chunk):
+        hi = min(lo + chunk, n)
+        out[lo:hi] = eval_on_grid(signal, grid.block(lo, hi))
+    return out
+
+
+def save_npy(
+    signal: BaseSignal,
+    path: Union[str, PathLike],
+    n: int,
+    dt: float,
+    t0: float = 0.0,
+    chunk: int = DEFAULT_CHUNK,
+) -> np.memmap:
+    """
+    Evaluate the signal on the time grid t0 + k * dt for k < n straight into an .npy file at path. The file is
+    written through a memory map and returned as one, it can be read back with np.load(path, mmap_mode="r").
+    """
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(n,))
+    eval_grid_into(signal, out, dt, t0=t0, chunk=chunk)
+    out.flush()
+    return out
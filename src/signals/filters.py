@@ -0,0 +1,526 @@
+"""
+Saturation, rate limits and linear filters applied to signal expressions.
+
+Saturated clips its input and has no memory. The other operators are discrete-time systems that sample their input
+at t_start + k * dt: RateLimited moves towards the input by at most rate * dt per sample, the lowpasses and
+LinearFilter are IIR filters y[k] = (b * u)[k] - (a[1:] * y)[k] with a[0] = 1. They start from rest, like
+scipy.signal.lfilter, or at the steady state for the input at t_start if steady_state is set, are zero before t_start
+and hold every output sample until the next one.
+
+An evaluation runs the system from the closest stored state up to the last requested sample, with the input
+evaluated on the uniform grid of the samples. The linear filters process the samples in blocks: the forced response
+of all blocks is one FFT convolution with the impulse response and the state is carried from block to block in state
+space, so only one small matrix product per block is sequential. The rate limiter alternates vectorized searches for
+the end of the stretches where the output follows the input or ramps towards it.
+
+The state is checkpointed every CHECKPOINT_INTERVAL samples and after the last sample of every evaluation, so
+consecutive evaluations, streams and scalar calls on increasing times only run the new samples. A query before the
+last evaluated sample restarts from the checkpoint before it. The input expression must not be modified after an
+evaluation, or reset() must be called. The stored states are guarded by a lock of the operator, so one operator can
+be evaluated from several threads, whose evaluations of it run one at a time.
+
+The samples are the same up to rounding whichever way they are reached, but not bit for bit: a run that starts from a
+different stored state, a scalar query that steps single samples and a resumed operator round differently from one
+pass over all samples. The rate limiter and well damped filters agree to within about 1e-14 relative to the size of
+the output, the difference grows with the conditioning of the filter to about 1e-10 for poles within 1e-4 of one.
+"""
+
+from __future__ import annotations
+import threading
+import numpy as np
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+from signals.base_signal import BaseSignal, EMPTY_SUPPORT, add_slots
+from signals.grid import UniformGrid, eval_on_grid
+from signals.tree import children
+
+ArrayLike = Union[list, tuple, np.ndarray]
+
+# Number of samples between two stored states of a stateful operator
+CHECKPOINT_INTERVAL = 1 << 12
+
+# Number of samples per block of the linear filter engine
+FILTER_BLOCK = 256
+
+# Largest number of samples that a scalar query steps through one at a time before switching to a vectorized pass
+_SCALAR_STEPS = 16
+
+
+class Checkpoint(NamedTuple):
+    """State of a stateful operator after the samples before k, with the output of sample k - 1."""
+
+    k: int
+    state: np.ndarray
+    output: float
+
+
+@add_slots
+@dataclass
+class Saturated(BaseSignal):
+    """The signal clipped to [lower, upper]."""
+
+    signal: BaseSignal
+    lower: float = -np.inf
+    upper: float = np.inf
+
+    def __post_init__(self):
+        assert (
+            self.lower <= self.upper
+        ), "the lower limit must not exceed the upper limit"
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return np.clip(self.signal(t), self.lower, self.upper)
+        return min(max(self.signal(t), self.lower), self.upper)
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        if self.lower <= 0.0 <= self.upper:
+            return self.signal.support
+        return -np.inf, np.inf
+
+    def _eval_grid(self, grid: UniformGrid) -> np.ndarray:
+        return np.clip(eval_on_grid(self.signal, grid), self.lower, self.upper)
+
+
+@add_slots
+@dataclass
+class StatefulSignal(BaseSignal):
+    """
+    Base of the operators with memory, which sample the input signal at t_start + k * dt, starting from rest or at
+    the steady state for the input at t_start. Subclasses define the initial state, a vectorized pass over a block of
+    input samples and a single update.
+    """
+
+    __slots__ = ("_checkpoints", "_cursor", "_lock")
+
+    signal: BaseSignal
+    dt: float = 1e-3
+    t_start: float = 0.0
+    steady_state: bool = False
+
+    def __post_init__(self):
+        assert self.dt > 0.0, "the sample time of a stateful operator must be positive"
+        assert np.isfinite(
+            self.t_start
+        ), "a stateful operator must start at a finite time"
+        self._lock = threading.RLock()
+        self.reset()
+
+    @abstractmethod
+    def _initial_state(self, u0: float) -> np.ndarray:
+        """State before the first sample, the steady state for a constant input u0, which is zero at rest."""
+
+    @abstractmethod
+    def _run(self, u: np.ndarray, state: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Outputs of the input samples u and the state after them."""
+
+    @abstractmethod
+    def _step(self, u: float, state: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Output of a single input sample and the state after it."""
+
+    def reset(self):
+        """Drop the stored states, which are recomputed from t_start by the next evaluation."""
+        # Stored states keyed on k // CHECKPOINT_INTERVAL, the state at sample 0 is always present once computed
+        with self._lock:
+            self._checkpoints: Dict[int, Checkpoint] = {}
+            self._cursor: Optional[Checkpoint] = None
+
+    def checkpoint(self) -> Checkpoint:
+        """State after the last evaluated sample, which can be restored with resume()."""
+        with self._lock:
+            if self._cursor is None:
+                self._cursor = self._start()
+            cursor = self._cursor
+            return Checkpoint(cursor.k, cursor.state.copy(), cursor.output)
+
+    def resume(self, checkpoint: Checkpoint):
+        """Continue from a checkpoint, the states stored after it are dropped."""
+        assert (
+            checkpoint.k >= 0
+        ), "the sample index of a checkpoint must be non-negative"
+        with self._lock:
+            if not self._checkpoints:
+                self._checkpoints[0] = self._start()
+            for key in [
+                key for key, c in self._checkpoints.items() if c.k > checkpoint.k
+            ]:
+                del self._checkpoints[key]
+            self._cursor = Checkpoint(
+                checkpoint.k, np.array(checkpoint.state, dtype=float), checkpoint.output
+            )
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        if self.signal.support == EMPTY_SUPPORT:
+            return EMPTY_SUPPORT
+        return self.t_start, np.inf
+
+    def sample_time(self, k: int) -> float:
+        return float(k) * self.dt + self.t_start
+
+    def _start(self) -> Checkpoint:
+        u0 = self.signal(self.t_start) if self.steady_state else 0.0
+        state = self._initial_state(u0)
+        return Checkpoint(0, state, 0.0)
+
+    def _resume_point(self, k: int) -> Checkpoint:
+        """The latest stored state at or before sample k."""
+        if not self._checkpoints:
+            self._checkpoints[0] = self._start()
+        key = k // CHECKPOINT_INTERVAL
+        while key not in self._checkpoints:
+            key -= 1
+        stored = self._checkpoints[key]
+        cursor = self._cursor
+        if cursor is not None and stored.k < cursor.k <= k:
+            return cursor
+        return stored
+
+    def _samples(self, lo: int, hi: int) -> np.ndarray:
+        """Output samples lo <= k < hi, the input is evaluated on the sample grid in blocks between checkpoints."""
+        out = np.empty(hi - lo)
+        k, state, output = self._resume_point(lo)
+        grid = UniformGrid(self.t_start, self.dt, hi)
+
+        while k < hi:
+            end = min((k // CHECKPOINT_INTERVAL + 1) * CHECKPOINT_INTERVAL, hi)
+            y, state = self._run(eval_on_grid(self.signal, grid.block(k, end)), state)
+            if end > lo:
+                first = max(lo, k)
+                out[first - lo : end - lo] = y[first - k :]
+            output = float(y[-1])
+            k = end
+            if k % CHECKPOINT_INTERVAL == 0:
+                self._checkpoints.setdefault(
+                    k // CHECKPOINT_INTERVAL, Checkpoint(k, state.copy(), output)
+                )
+
+        self._cursor = Checkpoint(k, state, output)
+        return out
+
+    def _sample(self, k: int) -> float:
+        """Output sample k, stepping from the last evaluated sample if it is close."""
+        cursor = self._cursor
+        if cursor is not None and k == cursor.k - 1:
+            return cursor.output
+        if cursor is None or not 0 <= k - cursor.k < _SCALAR_STEPS:
+            return float(self._samples(k, k + 1)[0])
+
+        i, state, output = cursor
+        state = state.copy()
+        while i <= k:
+            output, state = self._step(self.signal(self.sample_time(i)), state)
+            i += 1
+        self._cursor = Checkpoint(i, state, output)
+        return output
+
+    def _indices(self, t: np.ndarray) -> np.ndarray:
+        """Index of the last sample at or before every time, -1 before t_start."""
+        t_max = np.max(t, initial=self.t_start)
+        n = (
+            int(np.ceil((t_max - self.t_start) / self.dt)) + 2
+            if np.isfinite(t_max)
+            else 0
+        )
+        grid = UniformGrid(self.t_start, self.dt, n)
+        return grid.indices(np.nextafter(t, np.inf)) - 1
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return self._eval_array(t)
+        if not self.t_start <= t < np.inf:
+            return 0.0
+        with self._lock:
+            return self._sample(self._index(t))
+
+    def _index(self, t: float) -> int:
+        """Index of the last sample at or before t >= t_start."""
+        k = int((t - self.t_start) // self.dt)
+        while self.sample_time(k + 1) <= t:
+            k += 1
+        while k > 0 and self.sample_time(k) > t:
+            k -= 1
+        return k
+
+    def _eval_array(self, t: np.ndarray) -> np.ndarray:
+        out = np.zeros(t.shape)
+        mask = (self.t_start <= t) & (t < np.inf)
+        if mask.any():
+            k = self._indices(t[mask])
+            lo = int(k.min())
+            with self._lock:
+                out[mask] = self._samples(lo, int(k.max()) + 1)[k - lo]
+        return out
+
+    def _eval_grid(self, grid: UniformGrid) -> np.ndarray:
+        if grid.t0 != self.t_start or grid.dt != self.dt:
+            return self(grid.times())
+
+        # The time-steps of the grid are samples of the operator, the ones before t_start are zero
+        out = np.zeros(grid.n)
+        lo = max(grid.offset, 0)
+        hi = grid.offset + grid.n
+        if lo < hi:
+            with self._lock:
+                out[lo - grid.offset :] = self._samples(lo, hi)
+        return out
+
+
+@add_slots
+@dataclass
+class RateLimited(StatefulSignal):
+    """The signal with its rate of change limited to rate: every sample moves at most rate * dt from the last."""
+
+    rate: float = np.inf
+
+    def __post_init__(self):
+        assert self.rate > 0.0, "the rate limit must be positive"
+        StatefulSignal.__post_init__(self)
+
+    def _initial_state(self, u0: float) -> np.ndarray:
+        return np.array([u0])
+
+    def _step(self, u: float, state: np.ndarray) -> Tuple[float, np.ndarray]:
+        y, step = state[0], self.rate * self.dt
+        y = u if abs(u - y) <= step else (y + step if u > y else y - step)
+        state[0] = y
+        return y, state
+
+    def _run(self, u: np.ndarray, state: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        y = _rate_limit(u, float(state[0]), self.rate * self.dt)
+        return y, np.array([y[-1]]) if y.size else state
+
+
+def _rate_limit(u: np.ndarray, y: float, step: float) -> np.ndarray:
+    """
+    Rate limited samples of u starting after the output y. The output follows the input until an increment exceeds
+    step and then ramps by step per sample until it meets the input again, the end of both kinds of stretches is
+    searched in windows that double in size.
+    """
+    n = u.size
+    out = np.empty(n)
+    k = 0
+    while k < n:
+        if abs(u[k] - y) <= step:
+            # Following: the stretch ends before the first increment of the input that is too large
+            j, width = k + 1, 64
+            while j < n:
+                hi = min(j + width, n)
+                jumps = np.flatnonzero(np.abs(u[j:hi] - u[j - 1 : hi - 1]) > step)
+                if jumps.size:
+                    j += int(jumps[0])
+                    break
+                j, width = hi, 2 * width
+            out[k:j] = u[k:j]
+        else:
+            # Ramping: the stretch ends at the first sample that is within a step of the ramp
+            sign = 1.0 if u[k] > y else -1.0
+            j, width, last = k, 64, y
+            while j < n:
+                hi = min(j + width, n)
+                ramp = np.cumsum(np.concatenate(([last], np.full(hi - j, sign * step))))
+                reached = np.flatnonzero(sign * (u[j:hi] - ramp[:-1]) <= step)
+                stop = hi if not reached.size else j + int(reached[0])
+                out[j:stop] = ramp[1 : stop - j + 1]
+                if reached.size:
+                    j = stop
+                    break
+                j, width, last = hi, 2 * width, ramp[-1]
+        y = out[j - 1]
+        k = j
+    return out
+
+
+class _LinearSystem(NamedTuple):
+    """
+    State space form of a filter and the matrices of the block engine: impulse is the rfft of the first FILTER_BLOCK
+    samples of the impulse response, free the (FILTER_BLOCK, n) outputs C A^j of a unit initial state, forced the
+    (n, FILTER_BLOCK) states A^(FILTER_BLOCK-1-j) B after a block for a unit input at sample j and transition the
+    matrix A^FILTER_BLOCK.
+    """
+
+    A: np.ndarray
+    B: np.ndarray
+    C: np.ndarray
+    D: float
+    impulse: np.ndarray
+    free: np.ndarray
+    forced: np.ndarray
+    transition: np.ndarray
+
+
+def _linear_system(b: np.ndarray, a: np.ndarray) -> _LinearSystem:
+    """Transposed direct form II realization of the filter b / a, with a[0] = 1."""
+    n = max(a.size, b.size) - 1
+    b = np.pad(b, (0, n + 1 - b.size))
+    a = np.pad(a, (0, n + 1 - a.size))
+
+    # A filter of order zero is a pure gain y = b[0] u, with an empty state
+    A = np.eye(n, k=1)
+    if n:
+        A[:, 0] = -a[1:]
+    B = b[1:] - a[1:] * b[0]
+    C = np.eye(1, n).ravel()
+
+    # The powers of A are accumulated one step at a time, squaring loses precision for poles close to one
+    free = np.empty((FILTER_BLOCK, n))
+    forced = np.empty((n, FILTER_BLOCK))
+    row, column, transition = C, B, np.eye(n)
+    for j in range(FILTER_BLOCK):
+        free[j] = row
+        forced[:, FILTER_BLOCK - 1 - j] = column
+        row, column, transition = row @ A, A @ column, A @ transition
+
+    h = np.concatenate(([b[0]], free[:-1] @ B))
+    impulse = np.fft.rfft(h, 2 * FILTER_BLOCK)
+    return _LinearSystem(A, B, C, float(b[0]), impulse, free, forced, transition)
+
+
+@add_slots
+@dataclass
+class IIRFilter(StatefulSignal):
+    """Base of the linear filters, which are defined by the coefficients of their difference equation."""
+
+    __slots__ = ("_system",)
+
+    @abstractmethod
+    def coefficients(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Numerator b and denominator a of the filter, with a[0] = 1."""
+
+    @property
+    def system(self) -> _LinearSystem:
+        if self._system is None:
+            self._system = _linear_system(*self.coefficients())
+        return self._system
+
+    def reset(self):
+        # The coefficients are derived again, in case the parameters of the filter were changed
+        with self._lock:
+            StatefulSignal.reset(self)
+            self._system = None
+
+    def _initial_state(self, u0: float) -> np.ndarray:
+        # Steady state s = A s + B u0, filters with an integrator start from rest
+        A, B = self.system.A, self.system.B
+        try:
+            return np.linalg.solve(np.eye(B.size) - A, B * u0)
+        except np.linalg.LinAlgError:
+            return np.zeros(B.size)
+
+    def _step(self, u: float, state: np.ndarray) -> Tuple[float, np.ndarray]:
+        sys = self.system
+        y = float(sys.C @ state) + sys.D * u
+        return y, sys.A @ state + sys.B * u
+
+    def _run(self, u: np.ndarray, state: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        sys = self.system
+        if not state.size:
+            return sys.D * u, state
+        n, size = u.size, FILTER_BLOCK
+        m = -(-n // size)
+        blocks = np.zeros((m, size))
+        blocks.reshape(-1)[:n] = u
+
+        # Zero-state response of every block, the tail beyond the block is carried by the state
+        y = np.fft.irfft(np.fft.rfft(blocks, 2 * size) * sys.impulse, 2 * size)[
+            :, :size
+        ]
+
+        # State at the start of every block, only this recursion is sequential
+        inputs = blocks @ sys.forced.T
+        states = np.empty((m + 1, state.size))
+        states[0] = state
+        for i in range(m):
+            states[i + 1] = sys.transition @ states[i] + inputs[i]
+        y += states[:-1] @ sys.free.T
+
+        # The last block may be partial, its state is advanced over its actual samples only
+        r = n - (m - 1) * size
+        if r < size and m:
+            partial = states[m - 1]
+            for _ in range(r):
+                partial = sys.A @ partial
+            states[m] = partial + sys.forced[:, size - r :] @ blocks[m - 1, :r]
+        return y.reshape(-1)[:n], states[m]
+
+
+@add_slots
+@dataclass
+class LinearFilter(IIRFilter):
+    """
+    The signal filtered by the IIR filter with numerator b and denominator a, like scipy.signal.lfilter:
+    a[0] y[k] = b[0] u[k] + ... + b[M] u[k - M] - a[1] y[k - 1] - ... - a[N] y[k - N].
+    """
+
+    b: np.ndarray = field(default_factory=lambda: np.ones(1))
+    a: np.ndarray = field(default_factory=lambda: np.ones(1))
+
+    def __post_init__(self):
+        self.b = np.atleast_1d(np.asarray(self.b, dtype=float))
+        self.a = np.atleast_1d(np.asarray(self.a, dtype=float))
+        assert self.a[0] != 0.0, "the leading denominator coefficient must be non-zero"
+        StatefulSignal.__post_init__(self)
+
+    def coefficients(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.b / self.a[0], self.a / self.a[0]
+
+
+def _matched(poles: np.ndarray, dt: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Filter with the continuous-time poles mapped to exp(pole * dt) and a unit gain at zero frequency."""
+    a = np.real(np.poly(np.exp(poles * dt)))
+    return np.array([np.sum(a)]), a
+
+
+@add_slots
+@dataclass
+class FirstOrderLowpass(IIRFilter):
+    """First order lowpass filter with time constant tau, discretized by mapping its pole."""
+
+    tau: float = 1.0
+
+    def __post_init__(self):
+        assert self.tau > 0.0, "the time constant must be positive"
+        StatefulSignal.__post_init__(self)
+
+    def coefficients(self) -> Tuple[np.ndarray, np.ndarray]:
+        return _matched(np.array([-1.0 / self.tau]), self.dt)
+
+
+@add_slots
+@dataclass
+class SecondOrderLowpass(IIRFilter):
+    """
+    Second order lowpass filter with natural frequency freq (in Hz) and damping ratio zeta, discretized by mapping
+    its poles.
+    """
+
+    freq: float = 1.0
+    zeta: float = np.sqrt(0.5)
+
+    def __post_init__(self):
+        assert self.freq > 0.0, "the natural frequency must be positive"
+        assert self.zeta > 0.0, "the damping ratio must be positive"
+        StatefulSignal.__post_init__(self)
+
+    def coefficients(self) -> Tuple[np.ndarray, np.ndarray]:
+        omega = 2.0 * np.pi * self.freq
+        root = np.sqrt(complex(self.zeta**2 - 1.0))
+        poles = omega * np.array([-self.zeta + root, -self.zeta - root])
+        return _matched(poles, self.dt)
+
+
+def has_state(signal: BaseSignal) -> bool:
+    """Whether the expression contains a stateful operator, whose evaluations from several threads are serialized."""
+    seen = {id(signal)}
+    stack = [signal]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, StatefulSignal):
+            return True
+        for child in children(node):
+            if id(child) not in seen:
+                seen.add(id(child))
+                stack.append(child)
+    return False
@@ -0,0 +1,235 @@
+"""
+Evaluation of signals on uniform time grids.
+
+A UniformGrid describes the time-steps t_k = t0 + k * dt without storing them. On a grid the window of a signal is
+resolved by index arithmetic instead of comparing every timestamp with its bounds, the breakpoints of piecewise
+signals are located the same way, and the exponential and sinusoidal kernels are generated by recurrences:
+exp(a * (tau + i * dt)) = exp(a * tau) * exp(a * dt)^i and sin(theta + i * w dt) by rotating the phasor of theta.
+The recurrences only evaluate a table of RECURRENCE_BLOCK samples and one exp, or one sin and cos, per block.
+
+Windows, steps, ramps, parabolas and polynomial segments are identical to the evaluation on the timestamps of the
+grid. The recurrences are re-synchronized at every multiple of RECURRENCE_BLOCK time-steps counted from t0, so they
+do not drift along the grid: they agree with the direct evaluation to within 1e-11 relative to the amplitude for
+phases up to 1e4 rad, which is the order of the rounding of the phase itself. The blocks are aligned on the indices
+of the time-steps and not on the start of the evaluated range, so a block of a grid (see UniformGrid.block) gives
+exactly the same samples as the whole grid, whichever way it is split.
+"""
+
+from __future__ import annotations
+import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
+from math import ceil, isfinite
+from typing import Dict, List, Tuple, Union
+from signals.base_signal import (
+    BaseSignal,
+    SumOfSignals,
+    DifferenceOfSignals,
+    ProductOfSignals,
+    DivisionOfSignals,
+)
+from signals.guards import divide
+
+# Number of samples of the recurrence tables, the recurrences restart from an exact value after each block
+RECURRENCE_BLOCK = 1024
+
+_OPERATIONS = {
+    SumOfSignals: np.add,
+    DifferenceOfSignals: np.subtract,
+    ProductOfSignals: np.multiply,
+    DivisionOfSignals: divide,
+}
+
+
+@dataclass(frozen=True)
+class UniformGrid:
+    """
+    The n time-steps t_k = t0 + (offset + k) * dt for k = 0 ... n - 1, with the same values as
+    t0 + np.arange(offset, offset + n) * dt. The offset describes a block of a longer grid with the same t0.
+    """
+
+    t0: float
+    dt: float
+    n: int
+    offset: int = 0
+
+    def __post_init__(self):
+        assert self.dt > 0.0, "the time-step of a grid must be positive"
+        assert self.n >= 0, "the number of time-steps must be non-negative"
+
+    @classmethod
+    def arange(cls, t_start: float, t_stop: float, dt: float) -> UniformGrid:
+        """Grid of the timestamps of np.arange(t_start, t_stop, dt)."""
+        return cls(t_start, dt, max(int(ceil((t_stop - t_start) / dt)), 0))
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def shape(self) -> Tuple[int]:
+        return (self.n,)
+
+    @property
+    def size(self) -> int:
+        return self.n
+
+    def times(self) -> np.ndarray:
+        """Timestamps of the grid."""
+        return (
+            np.arange(self.offset, self.offset + self.n, dtype=float) * self.dt
+            + self.t0
+        )
+
+    def __array__(self, dtype=None) -> np.ndarray:
+        t = self.times()
+        return t if dtype is None else t.astype(dtype)
+
+    def time(self, k: int) -> float:
+        """Timestamp of the time-step k, which may lie outside of the grid."""
+        return float(self.offset + k) * self.dt + self.t0
+
+    def index(self, t: float) -> int:
+        """Number of time-steps of the grid before t, i.e. the first k with t_k >= t, clipped to [0, n]."""
+        if not isfinite(t):
+            return 0 if t < 0 else self.n
+        k = min(max(ceil((t - self.t0) / self.dt) - self.offset, 0), self.n)
+
+        # The estimate can be off by one after rounding, the timestamps themselves decide
+        while k > 0 and self.time(k - 1) >= t:
+            k -= 1
+        while k < self.n and self.time(k) < t:
+            k += 1
+        return k
+
+    def indices(self, t: np.ndarray) -> np.ndarray:
+        """Vectorized index() of an array of times."""
+        with np.errstate(invalid="ignore"):
+            k = np.ceil((t - self.t0) / self.dt) - self.offset
+        k = np.clip(np.nan_to_num(k, posinf=self.n, neginf=0), 0, self.n).astype(int)
+
+        while True:
+            lower = (k > 0) & ((k - 1 + self.offset) * self.dt + self.t0 >= t)
+            upper = (k < self.n) & ((k + self.offset) * self.dt + self.t0 < t)
+            if not (lower.any() or upper.any()):
+                return k
+            k = k - lower + upper
+
+    def window(self, t_start: float, t_end: float) -> Tuple[int, int]:
+        """Range of time-steps lo <= k < hi with t_start <= t_k < t_end."""
+        lo = self.index(t_start)
+        return lo, max(self.index(t_end), lo)
+
+    def block(self, lo: int, hi: int) -> UniformGrid:
+        """The time-steps lo <= k < hi of the grid, as a grid."""
+        return UniformGrid(self.t0, self.dt, hi - lo, self.offset + lo)
+
+    def block_times(self, size: int = RECURRENCE_BLOCK) -> Tuple[np.ndarray, int]:
+        """
+        Timestamps of the time-steps at the multiples of size counted from t0 that start the blocks covering the
+        grid, and the number of time-steps of the first block that come before the grid.
+        """
+        first = self.offset // size * size
+        start = np.arange(first, self.offset + self.n, size, dtype=float)
+        return start * self.dt + self.t0, self.offset - first
+
+
+def _blocked(starts: np.ndarray, table: np.ndarray, skip: int, n: int) -> np.ndarray:
+    """Outer product of the block starts with the recurrence table, flattened to the n samples after skip."""
+    if starts.size == 1:
+        return starts[0] * table[skip : skip + n]
+    out = np.empty((starts.size, table.size))
+    np.multiply(starts[:, np.newaxis], table, out=out)
+    return out.reshape(-1)[skip : skip + n]
+
+
+@lru_cache(maxsize=256)
+def _exp_table(rate: float) -> np.ndarray:
+    """exp(rate * i) for the RECURRENCE_BLOCK steps i of a block."""
+    table = np.exp(rate * np.arange(RECURRENCE_BLOCK))
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=256)
+def _rotation_table(rate: float) -> Tuple[np.ndarray, np.ndarray]:
+    """cos(rate * i) and sin(rate * i) for the RECURRENCE_BLOCK steps i of a block."""
+    step = rate * np.arange(RECURRENCE_BLOCK)
+    cos, sin = np.cos(step), np.sin(step)
+    cos.flags.writeable = sin.flags.writeable = False
+    return cos, sin
+
+
+def exp_recurrence(grid: UniformGrid, alpha: float, t_ref: float) -> np.ndarray:
+    """exp(alpha * (t_k - t_ref)) on the time-steps of the grid."""
+    times, skip = grid.block_times()
+    starts = np.exp(alpha * (times - t_ref))
+    return _blocked(starts, _exp_table(alpha * grid.dt), skip, grid.n)
+
+
+def sin_recurrence(
+    grid: UniformGrid, ampl: float, omega: float, phi: float, t_ref: float
+) -> np.ndarray:
+    """ampl * sin(omega * (t_k - t_ref) + phi) on the time-steps of the grid."""
+    times, skip = grid.block_times()
+    theta = omega * (times - t_ref) + phi
+    cos, sin = _rotation_table(omega * grid.dt)
+
+    # sin(theta + step) = sin(theta) cos(step) + cos(theta) sin(step)
+    out = _blocked(np.sin(theta), ampl * cos, skip, grid.n)
+    out += _blocked(np.cos(theta), ampl * sin, skip, grid.n)
+    return out
+
+
+def _postorder(signal: BaseSignal) -> Tuple[List[BaseSignal], Dict[int, int]]:
+    """Nodes of the expression with the operations after their operands, and the number of uses of every node."""
+    order: List[BaseSignal] = []
+    uses: Dict[int, int] = {id(signal): 1}
+    seen = set()
+    stack = [(signal, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.append((node, True))
+        if type(node) in _OPERATIONS:
+            for child in (node.rhs, node.lhs):
+                if isinstance(child, BaseSignal):
+                    uses[id(child)] = uses.get(id(child), 0) + 1
+                    stack.append((child, False))
+    return order, uses
+
+
+def eval_on_grid(signal: BaseSignal, grid: UniformGrid) -> np.ndarray:
+    """
+    Evaluate a signal expression on a uniform time grid. The operations are applied to the grid evaluations of
+    their operands, which are released as soon as their last parent has been computed.
+    """
+    order, uses = _postorder(signal)
+    values: Dict[int, Union[np.ndarray, float]] = {}
+
+    def operand(value):
+        if not isinstance(value, BaseSignal):
+            return value
+        result = values[id(value)]
+        uses[id(value)] -= 1
+        if uses[id(value)] == 0:
+            del values[id(value)]
+        return result
+
+    for node in order:
+        op = _OPERATIONS.get(type(node))
+        if op is None:
+            values[id(node)] = node._eval_grid(grid)
+        elif op is divide:
+            values[id(node)] = divide(
+                operand(node.lhs), operand(node.rhs), node.fill_value
+            )
+        else:
+            values[id(node)] = op(operand(node.lhs), operand(node.rhs))
+
+    return np.asarray(values[id(signal)], dtype=float)
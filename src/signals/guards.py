@@ -0,0 +1,172 @@
+"""
+Guarded kernels for the operations that can leave the range of floating point numbers.
+
+A quotient evaluates to a fill value where its denominator is zero, instead of raising ZeroDivisionError on floats
+or producing inf and nan on arrays, and the argument of an exponential is clipped at an exponent limit so that its
+value stays finite. The guards are part of the regular array pass: the zero denominators are masked out of a single
+np.divide and the exponents are clipped with np.minimum, no sample is evaluated again in Python.
+
+errstate() sets the fill value and the exponent limit of the evaluations inside its block and counts the guarded
+samples in an ErrorReport:
+
+    with errstate(fill_value=0.0) as report:
+        r = reference.eval_on(t)
+    print(report.zero_division, report.overflow)
+
+The settings are stored in a context variable, so they apply to the thread or task that entered the block and to
+the workers of a parallel evaluation started inside it. Outside of a block the fill value is nan, the limit is
+EXP_LIMIT and nothing is counted.
+"""
+
+from __future__ import annotations
+import math
+import threading
+import numpy as np
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, NamedTuple, Optional, Tuple, Union
+
+# Largest exponent with a finite exp(), just below log(np.finfo(float).max)
+EXP_LIMIT = 709.78
+
+
+@dataclass
+class ErrorReport:
+    """Number of guarded samples of the evaluations inside an errstate() block."""
+
+    zero_division: int = 0
+    overflow: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    @property
+    def clean(self) -> bool:
+        """True if no sample was filled or clipped."""
+        return self.zero_division == 0 and self.overflow == 0
+
+    def _add(self, zero_division: int, overflow: int):
+        with self._lock:
+            self.zero_division += zero_division
+            self.overflow += overflow
+
+
+class _State(NamedTuple):
+    fill_value: float
+    exp_limit: float
+    reports: Tuple[ErrorReport, ...]
+
+
+_STATE: ContextVar[_State] = ContextVar(
+    "signals_errstate", default=_State(math.nan, EXP_LIMIT, ())
+)
+
+
+@contextmanager
+def errstate(
+    fill_value: Optional[float] = None, exp_limit: Optional[float] = None
+) -> Iterator[ErrorReport]:
+    """
+    Evaluate the signals inside the block with the given fill value of zero denominators and limit of the exponents,
+    the settings that are None are taken from the enclosing block. The guarded samples are counted in the yielded
+    report and in the reports of the enclosing blocks.
+    """
+    outer = _STATE.get()
+    if exp_limit is not None:
+        assert exp_limit <= EXP_LIMIT, f"the exponent limit must be at most {EXP_LIMIT}"
+
+    report = ErrorReport()
+    token = _STATE.set(
+        _State(
+            outer.fill_value if fill_value is None else float(fill_value),
+            outer.exp_limit if exp_limit is None else float(exp_limit),
+            outer.reports + (report,),
+        )
+    )
+    try:
+        yield report
+    finally:
+        _STATE.reset(token)
+
+
+def exp_limit() -> float:
+    """Exponent limit of the current errstate() block."""
+    return _STATE.get().exp_limit
+
+
+def propagate(fn: Callable) -> Callable:
+    """Wrap fn to run with the errstate() settings of the caller, for functions that are run by worker threads."""
+    state = _STATE.get()
+
+    def run(*args):
+        token = _STATE.set(state)
+        try:
+            return fn(*args)
+        finally:
+            _STATE.reset(token)
+
+    return run
+
+
+def _count(state: _State, zero_division: int = 0, overflow: int = 0):
+    for report in state.reports:
+        report._add(zero_division, overflow)
+
+
+def divide(
+    num: Union[float, np.ndarray],
+    den: Union[float, np.ndarray],
+    fill_value: Optional[float] = None,
+) -> Union[float, np.ndarray]:
+    """num / den with fill_value, or the fill value of the errstate() block, where den is zero."""
+    state = _STATE.get()
+    fill = state.fill_value if fill_value is None else fill_value
+
+    if isinstance(num, np.ndarray) or isinstance(den, np.ndarray):
+        nonzero = den != 0.0
+        out = np.full(np.broadcast(num, den).shape, fill, dtype=float)
+        np.divide(num, den, out=out, where=nonzero)
+        if state.reports:
+            zeros = out.size - np.count_nonzero(np.broadcast_to(nonzero, out.shape))
+            _count(state, zero_division=int(zeros))
+        return out
+
+    if den == 0.0:
+        if state.reports:
+            _count(state, zero_division=1)
+        return fill
+    return num / den
+
+
+def exp(x: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """exp(x) with x clipped at the exponent limit of the errstate() block."""
+    state = _STATE.get()
+
+    if isinstance(x, np.ndarray):
+        if state.reports:
+            _count(state, overflow=int(np.count_nonzero(x > state.exp_limit)))
+        return np.exp(np.minimum(x, state.exp_limit))
+
+    # np.exp on scalars too, so that a scalar query gives the same bits as the array pass
+    if x > state.exp_limit:
+        if state.reports:
+            _count(state, overflow=1)
+        x = state.exp_limit
+    return np.exp(x)
+
+
+def expm1(x: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """exp(x) - 1, accurate for small x, with x clipped at the exponent limit of the errstate() block."""
+    state = _STATE.get()
+
+    if isinstance(x, np.ndarray):
+        if state.reports:
+            _count(state, overflow=int(np.count_nonzero(x > state.exp_limit)))
+        return np.expm1(np.minimum(x, state.exp_limit))
+
+    if x > state.exp_limit:
+        if state.reports:
+            _count(state, overflow=1)
+        x = state.exp_limit
+    return np.expm1(x)
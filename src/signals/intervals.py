@@ -0,0 +1,123 @@
+"""
+Interval index over the terms of a signal expression.
+
+The expression is decomposed into const + sum(coef_i * term_i) and the support interval of every term is stored in
+an index. A query at time t only evaluates the terms whose support contains t, so long test campaigns built from many
+short manoeuvres cost as much as the manoeuvres that are active at the time.
+"""
+
+from __future__ import annotations
+import numpy as np
+from bisect import bisect_right
+from typing import List, Tuple, Union
+from signals.base_signal import BaseSignal
+from signals.tree import linear_terms
+
+
+class IntervalIndex:
+    """
+    Static interval tree for stabbing queries over half-open intervals [start, end).
+
+    The intervals are sorted by their start and a binary tree over that order stores the largest end of every
+    subtree. A query descends only into the subtrees that start before t and still end after t, so it costs
+    O((k + 1) log n) for k matching intervals.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        starts, ends = np.asarray(starts, dtype=float), np.asarray(ends, dtype=float)
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+
+        n = self.starts.size
+        self._size = 1 << max(n - 1, 0).bit_length()
+        tree = np.full(2 * self._size, -np.inf)
+        tree[self._size : self._size + n] = self.ends
+        level = self._size // 2
+        while level >= 1:
+            tree[level : 2 * level] = np.maximum(
+                tree[2 * level : 4 * level : 2], tree[2 * level + 1 : 4 * level : 2]
+            )
+            level //= 2
+
+        self._tree = tree.tolist()
+        self._starts = self.starts.tolist()
+        self._order = self.order.tolist()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def stab(self, t: float) -> List[int]:
+        """Indices of the intervals that contain t."""
+        n_candidates = bisect_right(self._starts, t)
+        if n_candidates == 0:
+            return []
+
+        tree, size = self._tree, self._size
+        result = []
+        stack = [(1, 0, size)]
+        while stack:
+            node, lo, width = stack.pop()
+            if lo >= n_candidates or tree[node] <= t:
+                continue
+            if width == 1:
+                result.append(self._order[lo])
+                continue
+            half = width // 2
+            stack.append((2 * node + 1, lo + half, half))
+            stack.append((2 * node, lo, half))
+        return result
+
+
+class IndexedSignal(BaseSignal):
+    """
+    Signal that evaluates an expression through an interval index over its terms, created with
+    BaseSignal.indexed(). Like a compiled signal, the index is a snapshot of the expression at the time it is built.
+    """
+
+    def __init__(self, signal: BaseSignal):
+        self.signal = signal
+        self.const, terms = linear_terms(signal)
+        self.coefficients = [coef for coef, _ in terms]
+        self.terms = [node for _, node in terms]
+
+        supports = np.array([node.support for node in self.terms]).reshape(-1, 2)
+        self.index = IntervalIndex(supports[:, 0], supports[:, 1])
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        return self.signal.support
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return self._eval_array(t)
+
+        value = self.const
+        for i in self.index.stab(t):
+            value += self.coefficients[i] * self.terms[i](t)
+        return value
+
+    def _eval_array(self, t: np.ndarray) -> np.ndarray:
+        flat = t.ravel()
+        out = np.full(flat.shape, self.const)
+        if flat.size == 0:
+            return out.reshape(t.shape)
+
+        # Every term is evaluated on the contiguous run of sorted timestamps that falls inside its support
+        order = (
+            None if np.all(flat[1:] >= flat[:-1]) else np.argsort(flat, kind="stable")
+        )
+        t_sorted = flat if order is None else flat[order]
+        values = out if order is None else np.full(flat.shape, self.const)
+
+        starts, ends = self.index.starts, self.index.ends
+        first = np.searchsorted(t_sorted, starts, side="left")
+        last = np.searchsorted(t_sorted, ends, side="left")
+
+        for i, a, b in zip(self.index.order.tolist(), first.tolist(), last.tolist()):
+            if a < b:
+                values[a:b] += self.coefficients[i] * self.terms[i](t_sorted[a:b])
+
+        if order is not None:
+            out[order] = values
+        return out.reshape(t.shape)
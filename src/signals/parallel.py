@@ -0,0 +1,108 @@
+"""
+Multi-threaded evaluation of long time vectors and of batches of signals.
+
+NumPy releases the GIL inside its ufuncs, so the array evaluation of a signal scales over threads when the work is
+split into independent blocks. Every block is written into its own slice of a shared output array and the values of
+a sample do not depend on the block it is evaluated in, so the results are identical to the serial path. Signals that
+contain a stateful operator of signals.filters carry their state from one block to the next and are evaluated
+serially. The workers run with the signals.guards.errstate() settings of the calling thread.
+"""
+
+from __future__ import annotations
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Union
+from signals.base_signal import BaseSignal
+from signals.grid import UniformGrid, eval_on_grid
+from signals.filters import has_state
+from signals.guards import propagate
+
+ArrayLike = Union[list, tuple, np.ndarray]
+
+# Default number of timestamps per block of a parallel evaluation
+DEFAULT_CHUNK = 1 << 16
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def parallel_eval(
+    signal: BaseSignal,
+    t: ArrayLike,
+    out: Optional[np.ndarray] = None,
+    workers: Optional[int] = None,
+    chunk: int = DEFAULT_CHUNK,
+) -> np.ndarray:
+    """
+    Evaluate a signal on an array of timestamps with a pool of worker threads (one per CPU by default). The time
+    axis is split into blocks of chunk samples that are evaluated concurrently, the blocks of a UniformGrid are
+    evaluated as grids.
+    """
+    grid = t if isinstance(t, UniformGrid) else None
+    if grid is None:
+        t = np.asarray(t, dtype=float)
+    if out is None:
+        out = np.empty(t.shape)
+    assert out.shape == t.shape, "the output must have the shape of the timestamps"
+    assert chunk > 0, "the chunk size must be positive"
+    assert out.ndim <= 1 or out.flags.c_contiguous, "the output must be contiguous"
+
+    workers = default_workers() if workers is None else workers
+    out_flat = out.reshape(-1)
+
+    if grid is None:
+        t_flat = t.reshape(-1)
+
+        def evaluate(lo: int):
+            out_flat[lo : lo + chunk] = signal(t_flat[lo : lo + chunk])
+
+    else:
+
+        def evaluate(lo: int):
+            block = grid.block(lo, min(lo + chunk, grid.n))
+            out_flat[lo : lo + chunk] = eval_on_grid(signal, block)
+
+    blocks = range(0, out_flat.size, chunk)
+    if workers <= 1 or len(blocks) <= 1 or has_state(signal):
+        for lo in blocks:
+            evaluate(lo)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Consuming the results re-raises the exceptions of the workers
+            list(pool.map(propagate(evaluate), blocks))
+    return out
+
+
+def parallel_eval_many(
+    signals: Sequence[BaseSignal],
+    t: ArrayLike,
+    out: Optional[np.ndarray] = None,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Evaluate a list of signals on a shared time vector into an (n_signals, n_times) array. The signals are split
+    into one group per worker and every group is evaluated as a SignalBank into its own rows of the output.
+    """
+    from signals.bank import SignalBank
+
+    t = np.asarray(t, dtype=float)
+    shape = (len(signals), t.size)
+    if out is None:
+        out = np.empty(shape)
+    assert out.shape == shape, f"output buffer must have shape {shape}"
+
+    workers = min(default_workers() if workers is None else workers, len(signals))
+    if workers <= 1 or any(has_state(signal) for signal in signals):
+        return SignalBank(signals)(t, out=out)
+
+    bounds = np.linspace(0, len(signals), workers + 1).astype(int)
+
+    def evaluate(i: int):
+        lo, hi = bounds[i], bounds[i + 1]
+        SignalBank(signals[lo:hi])(t, out=out[lo:hi])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(propagate(evaluate), range(workers)))
+    return out
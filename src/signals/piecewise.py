@@ -0,0 +1,264 @@
+from __future__ import annotations
+import numpy as np
+from bisect import bisect_right
+from math import comb
+from typing import Optional, Tuple, Union
+from signals.base_signal import BaseSignal, EMPTY_SUPPORT
+
+ArrayLike = Union[list, tuple, np.ndarray]
+
+# Segment types
+POLYNOMIAL = 0
+COSINE = 1
+SINE = 2
+
+
+class PiecewiseSignal(BaseSignal):
+    """
+    Signal defined by sorted breakpoints b_0 <= b_1 <= ... <= b_n and one segment per interval [b_i, b_i+1).
+    The signal evaluates to zero outside [b_0, b_n), use b_n = inf for a signal that holds its last segment.
+
+    Every segment is a polynomial in the local time tau = t - b_i with coefficients in ascending powers. Segments
+    of type COSINE add a cosine transition of height params[i, 0] and width params[i, 1] on top of the polynomial:
+        delta * (1 - cos(pi * tau / width)) / 2     (held at delta for tau >= width)
+    Segments of type SINE add a sinusoid with amplitude, angular frequency and phase params[i, 0:3]:
+        ampl * sin(omega * tau + phi)
+
+    Scalar queries locate the active segment by bisection and array queries use np.searchsorted, so the cost of an
+    evaluation grows with log(n) rather than with the number of segments.
+    """
+
+    def __init__(
+        self,
+        breakpoints: ArrayLike,
+        coefficients: ArrayLike,
+        kinds: Optional[ArrayLike] = None,
+        params: Optional[ArrayLike] = None,
+    ):
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+        assert self.breakpoints.size >= 1, "at least one breakpoint is required"
+        n = self.breakpoints.size - 1
+
+        coefficients = np.asarray(coefficients, dtype=float)
+        self.coefficients = coefficients.reshape(n, -1) if n > 0 else np.zeros((0, 1))
+        self.kinds = (
+            np.zeros(n, dtype=np.int8)
+            if kinds is None
+            else np.asarray(kinds, dtype=np.int8)
+        )
+        self.params = np.zeros((n, 3)) if params is None else np.asarray(params, float)
+
+        assert np.all(np.diff(self.breakpoints) >= 0), "breakpoints must be sorted"
+        assert self.kinds.shape == (n,), "one segment type is required per segment"
+        assert self.params.shape == (n, 3), "params must have shape (n_segments, 3)"
+
+        # Python lists make the scalar bisection and segment evaluation cheaper than numpy scalar indexing
+        self._breaks = self.breakpoints.tolist()
+        self._coefficients = self.coefficients.tolist()
+        self._kinds = self.kinds.tolist()
+        self._params = self.params.tolist()
+
+    @classmethod
+    def window(
+        cls,
+        t_start: float,
+        t_end: float,
+        coefficients: ArrayLike,
+        kind: int = POLYNOMIAL,
+        params: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+    ) -> PiecewiseSignal:
+        """Piecewise signal with a single segment on the window [t_start, t_end)."""
+        if t_start >= t_end:
+            return cls(breakpoints=[np.inf], coefficients=[])
+        return cls([t_start, t_end], [coefficients], [kind], [params])
+
+    @property
+    def n_segments(self) -> int:
+        return self.kinds.size
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        if self.n_segments == 0:
+            return EMPTY_SUPPORT
+        return self._breaks[0], self._breaks[-1]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(n_segments={self.n_segments})"
+
+    def _eval_segment(self, i: int, tau: float) -> float:
+        """Evaluate segment i at local time tau."""
+        coefs = self._coefficients[i]
+        value = coefs[-1]
+        for c in coefs[-2::-1]:
+            value = value * tau + c
+
+        if self._kinds[i] == COSINE:
+            delta, width = self._params[i][0], self._params[i][1]
+            tau = np.minimum(tau, width)
+            value = value + delta * (-(np.cos(np.pi * tau / width) - 1) / 2)
+        elif self._kinds[i] == SINE:
+            ampl, omega, phi = self._params[i]
+            value = value + ampl * np.sin(omega * tau + phi)
+        return value
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return self._eval_array(t)
+
+        i = bisect_right(self._breaks, t) - 1
+        if 0 <= i < self.n_segments:
+            return self._eval_segment(i, t - self._breaks[i])
+        return 0.0
+
+    def _eval_array(self, t: np.ndarray) -> np.ndarray:
+        out = np.zeros(t.shape)
+        idx = np.searchsorted(self.breakpoints, t, side="right") - 1
+        valid = (idx >= 0) & (idx < self.n_segments)
+        if valid.any():
+            out[valid] = self._eval_segments(idx[valid], t[valid])
+        return out
+
+    def _eval_grid(self, grid) -> np.ndarray:
+        """Evaluate on a UniformGrid, every segment covers the range of time-steps between its breakpoints."""
+        out = np.zeros(grid.n)
+        k = grid.indices(self.breakpoints)
+        lo, hi = int(k[0]), int(k[-1])
+        if lo < hi:
+            idx = np.repeat(np.arange(self.n_segments), np.diff(k))
+            out[lo:hi] = self._eval_segments(idx, grid.block(lo, hi).times())
+        return out
+
+    def _eval_segments(self, idx: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """Evaluate the segments idx at the (absolute) timestamps t, all indices must be valid segments."""
+        tau = t - self.breakpoints[idx]
+
+        # Horner scheme over the polynomial coefficients of each sample's segment
+        value = self.coefficients[idx, -1]
+        for k in range(self.coefficients.shape[1] - 2, -1, -1):
+            value = value * tau + self.coefficients[idx, k]
+
+        cosine = self.kinds[idx] == COSINE
+        if cosine.any():
+            i_cos = idx[cosine]
+            delta, width = self.params[i_cos, 0], self.params[i_cos, 1]
+            tau_cos = np.minimum(tau[cosine], width)
+            value[cosine] = value[cosine] + delta * (
+                -(np.cos(np.pi * tau_cos / width) - 1) / 2
+            )
+
+        sine = self.kinds[idx] == SINE
+        if sine.any():
+            ampl, omega, phi = self.params[idx[sine]].T
+            value[sine] = value[sine] + ampl * np.sin(omega * tau[sine] + phi)
+        return value
+
+    def _sine_form(self) -> PiecewiseSignal:
+        """
+        Equivalent piecewise signal without COSINE segments. A cosine transition is a constant plus a SINE term
+        while it lasts, segments that are longer than the transition are split where it ends.
+        """
+        cosine = self.kinds == COSINE
+        if not cosine.any():
+            return self
+
+        b, c = self.breakpoints, self.coefficients
+        delta, width = self.params[:, 0], self.params[:, 1]
+        split = cosine & (np.diff(b) > width)
+
+        # Position of every segment after the splits, a split segment is followed by its held part
+        pos = np.arange(self.n_segments) + np.cumsum(split) - split
+        held = pos[split] + 1
+        m = self.n_segments + int(split.sum())
+
+        breakpoints = np.empty(m + 1)
+        breakpoints[pos] = b[:-1]
+        breakpoints[held] = b[:-1][split] + width[split]
+        breakpoints[-1] = b[-1]
+
+        coefficients = np.zeros((m, c.shape[1]))
+        coefficients[pos] = c
+        coefficients[pos[cosine], 0] += delta[cosine] / 2
+
+        kinds = np.full(m, POLYNOMIAL, dtype=np.int8)
+        kinds[pos] = np.where(cosine, SINE, self.kinds)
+        params = np.zeros((m, 3))
+        params[pos] = self.params
+        params[pos[cosine]] = np.column_stack(
+            (
+                -delta[cosine] / 2,
+                np.pi / width[cosine],
+                np.full(int(cosine.sum()), np.pi / 2),
+            )
+        )
+
+        # After the transition the polynomial continues in the local time of the held segment
+        coefficients[held] = _shift_polynomials(c[split], width[split])
+        coefficients[held, 0] += delta[split]
+        return PiecewiseSignal(breakpoints, coefficients, kinds, params)
+
+    def _derivative(self) -> PiecewiseSignal:
+        pw = self._sine_form()
+        c = pw.coefficients
+        k = np.arange(1, c.shape[1])
+        coefficients = c[:, 1:] * k if c.shape[1] > 1 else np.zeros_like(c)
+
+        params = pw.params.copy()
+        sine = pw.kinds == SINE
+        params[sine, 0] *= params[sine, 1]
+        params[sine, 2] += np.pi / 2
+        return PiecewiseSignal(pw.breakpoints, coefficients, pw.kinds, params)
+
+    def _integral(self) -> PiecewiseSignal:
+        if self.n_segments and self.breakpoints[0] == -np.inf:
+            raise ValueError(
+                "the integral of a signal that starts at -inf is unbounded"
+            )
+        pw = self._sine_form()
+        n, c = pw.n_segments, pw.coefficients
+
+        coefficients = np.zeros((n, c.shape[1] + 1))
+        coefficients[:, 1:] = c / np.arange(1, c.shape[1] + 1)
+
+        # A sinusoid integrates to a constant and a sinusoid delayed by a quarter period
+        params = pw.params.copy()
+        kinds = pw.kinds.copy()
+        ampl, omega, phi = params.T
+        sine = kinds == SINE
+        moving = sine & (omega != 0.0)
+        coefficients[moving, 0] += ampl[moving] / omega[moving] * np.cos(phi[moving])
+        params[moving, 0] = ampl[moving] / omega[moving]
+        params[moving, 2] = phi[moving] - np.pi / 2
+
+        still = sine & (omega == 0.0)
+        coefficients[still, 1] += ampl[still] * np.sin(phi[still])
+        kinds[still] = POLYNOMIAL
+        params[still] = 0.0
+
+        # Every segment starts at the integral over the previous segments
+        breakpoints = pw.breakpoints
+        lengths = np.diff(breakpoints)
+        idx = np.flatnonzero(np.isfinite(lengths))
+        local = PiecewiseSignal(breakpoints, coefficients, kinds, params)
+        ends = np.zeros(n)
+        ends[idx] = local._eval_segments(idx, breakpoints[idx] + lengths[idx])
+        coefficients[:, 0] += np.concatenate(([0.0], np.cumsum(ends)[:-1]))
+
+        if n and np.isfinite(breakpoints[-1]):
+            # Past the last breakpoint the integral holds its final value
+            breakpoints = np.append(breakpoints, np.inf)
+            tail = np.zeros((1, coefficients.shape[1]))
+            tail[0, 0] = np.sum(ends)
+            coefficients = np.vstack((coefficients, tail))
+            kinds = np.append(kinds, POLYNOMIAL)
+            params = np.vstack((params, np.zeros((1, 3))))
+        return PiecewiseSignal(breakpoints, coefficients, kinds, params)
+
+
+def _shift_polynomials(c: np.ndarray, shift: np.ndarray) -> np.ndarray:
+    """Coefficients of the polynomials p(tau + shift) for the rows of ascending coefficients c."""
+    out = np.zeros_like(c)
+    K = c.shape[1]
+    for k in range(K):
+        for j in range(k + 1):
+            out[:, j] += comb(k, j) * c[:, k] * shift ** (k - j)
+    return out
@@ -0,0 +1,188 @@
+"""
+Opt-in instrumentation of signal evaluations, to find the subtree of an expression that makes it slow.
+
+Inside a profile() block the __call__ and _eval_grid methods of every signal class are replaced by a wrapper that
+records, for every node, the number of calls, the cumulative time spent in the node and its children, the time spent
+in the node itself and the number of evaluated samples. The original methods are restored when the block exits, so signals evaluated
+outside of it run the regular code without any overhead.
+"""
+
+from __future__ import annotations
+import threading
+from contextlib import contextmanager
+from importlib import import_module
+from time import perf_counter
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from signals.base_signal import BaseSignal
+from signals.tree import children
+
+_lock = threading.Lock()
+_active: Optional[Profile] = None
+
+
+class NodeStats(NamedTuple):
+    node: BaseSignal
+    calls: int
+    cumulative: float
+    self_time: float
+    samples: int
+
+
+class Profile:
+    """Evaluation statistics of the signal nodes called inside a profile() block, keyed on the node objects."""
+
+    def __init__(self):
+        # id(node) -> [node, calls, cumulative, self_time, samples]
+        self._stats: Dict[int, list] = {}
+        self._local = threading.local()
+
+    def _record(self, node, elapsed: float, child_time: float, samples: int):
+        with _lock:
+            entry = self._stats.get(id(node))
+            if entry is None:
+                self._stats[id(node)] = [
+                    node,
+                    1,
+                    elapsed,
+                    elapsed - child_time,
+                    samples,
+                ]
+            else:
+                entry[1] += 1
+                entry[2] += elapsed
+                entry[3] += elapsed - child_time
+                entry[4] += samples
+
+    def stats(self, node: BaseSignal) -> Optional[NodeStats]:
+        """Statistics of one node, None if it was not called."""
+        entry = self._stats.get(id(node))
+        return None if entry is None else NodeStats(*entry)
+
+    def hotspots(self, n: int = 10) -> List[NodeStats]:
+        """The n nodes with the largest self time."""
+        entries = sorted(self._stats.values(), key=lambda e: e[3], reverse=True)
+        return [NodeStats(*entry) for entry in entries[:n]]
+
+    def tree(self, signal: BaseSignal) -> dict:
+        """
+        Statistics of the expression as a nested dict with the keys "node", "stats" and "children". A node shared by
+        several parents appears under each of them with its total statistics.
+        """
+        root = {"node": signal, "stats": self.stats(signal), "children": []}
+        stack = [root]
+        while stack:
+            entry = stack.pop()
+            for child in children(entry["node"]):
+                sub = {"node": child, "stats": self.stats(child), "children": []}
+                entry["children"].append(sub)
+                stack.append(sub)
+        return root
+
+    def report(self, signal: Optional[BaseSignal] = None, top: int = 10) -> str:
+        """Text report with a dump of the expression tree of the signal (if given) and the top hotspots."""
+        lines = []
+        if signal is not None:
+            stack = [(self.tree(signal), 0)]
+            while stack:
+                entry, depth = stack.pop()
+                lines.append("  " * depth + _describe(entry["node"], entry["stats"]))
+                stack.extend((c, depth + 1) for c in reversed(entry["children"]))
+            lines.append("")
+
+        lines.append(f"Top {top} nodes by self time:")
+        for stats in self.hotspots(top):
+            lines.append("  " + _describe(stats.node, stats))
+        return "\n".join(lines)
+
+
+def _describe(node: BaseSignal, stats: Optional[NodeStats]) -> str:
+    name = type(node).__name__
+    if stats is None:
+        return f"{name}: not called"
+    return (
+        f"{name}: calls={stats.calls} cumulative={stats.cumulative * 1e3:.3f}ms "
+        f"self={stats.self_time * 1e3:.3f}ms samples={stats.samples}"
+    )
+
+
+def _signal_classes() -> List[type]:
+    """
+    BaseSignal and all its subclasses. The modules of the built-in signals are imported first, since the package
+    loads them lazily and a class defined inside the profile() block would not be instrumented.
+    """
+    for module in (
+        "simple_signals",
+        "complex_signals",
+        "transforms",
+        "compiler",
+        "cache",
+        "intervals",
+        "tabulate",
+        "filters",
+    ):
+        import_module(f"signals.{module}")
+
+    classes, stack = [], [BaseSignal]
+    while stack:
+        cls = stack.pop()
+        if cls not in classes:
+            classes.append(cls)
+            stack.extend(cls.__subclasses__())
+    return classes
+
+
+def _instrument(method, prof: Profile):
+    def wrapper(self, t, *args):
+        local = prof._local
+        frames = local.__dict__.setdefault("frames", [])
+
+        # A method that defers to the method of its base class or to __call__ is counted once
+        if frames and frames[-1][0] is self:
+            return method(self, t, *args)
+
+        frame = [self, 0.0]
+        frames.append(frame)
+        start = perf_counter()
+        try:
+            return method(self, t, *args)
+        finally:
+            elapsed = perf_counter() - start
+            frames.pop()
+            if frames:
+                frames[-1][1] += elapsed
+            # Arrays and uniform grids have a size, scalars count as one sample
+            prof._record(self, elapsed, frame[1], getattr(t, "size", 1))
+
+    return wrapper
+
+
+@contextmanager
+def profile() -> Iterator[Profile]:
+    """
+    Record the evaluations of all signals inside the block, including the evaluations from eval_on() and from
+    worker threads:
+
+        with profile() as prof:
+            reference.eval_on(t)
+        print(prof.report(reference))
+    """
+    global _active
+    with _lock:
+        assert _active is None, "profile() blocks cannot be nested"
+        _active = prof = Profile()
+
+    # Evaluations on uniform grids go through _eval_grid() instead of __call__
+    patched = [
+        (cls, name, cls.__dict__[name])
+        for cls in _signal_classes()
+        for name in ("__call__", "_eval_grid")
+        if name in cls.__dict__
+    ]
+    try:
+        for cls, name, method in patched:
+            setattr(cls, name, _instrument(method, prof))
+        yield prof
+    finally:
+        for cls, name, method in patched:
+            setattr(cls, name, method)
+        _active = None
@@ -0,0 +1,376 @@
+"""
+Publishing of a reference signal to asyncio consumers at fixed rates.
+
+Evaluating a deep expression on the event loop at every tick delays all other tasks. A ReferencePublisher instead
+evaluates the signal ahead of time, in chunks on the uniform time grid of every rate, in an executor. The chunks are
+written into one ring buffer per rate and the subscriptions of that rate read their samples from it, so a tick on the
+event loop only waits for its deadline and copies a float.
+
+The chunks are scheduled earliest deadline first: the next chunk is computed for the rate whose buffer runs dry
+first. A subscription that wakes up more than one period after the deadline of a sample skips to the latest due
+sample (an overrun), a sample that is not computed by its deadline is delivered late as soon as it is (an
+underrun). Both are counted in the SubscriptionMetrics together with the delivery latency. The buffer of a rate does
+not wait for a subscription that stopped reading: the samples it missed are overwritten and it skips them as overruns
+when it calls get() again. If the evaluation of the signal raises, the publisher closes and get() raises the error.
+
+The publisher reads the time from a clock with time() and an awaitable sleep_until(deadline). The default LoopClock
+is the clock of the event loop, the FakeClock is advanced by hand for tests.
+"""
+
+from __future__ import annotations
+import asyncio
+import heapq
+import numpy as np
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from itertools import count
+from math import ceil, floor
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+from signals.base_signal import BaseSignal
+from signals.grid import UniformGrid, eval_on_grid
+
+# Number of times FakeClock.advance() yields to the event loop after waking up the sleepers of a deadline
+_SETTLE_ROUNDS = 20
+
+
+class LoopClock:
+    """The monotonic clock of the running event loop."""
+
+    def time(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    async def sleep_until(self, deadline: float):
+        await asyncio.sleep(max(deadline - self.time(), 0.0))
+
+
+class FakeClock:
+    """
+    Clock that only moves when advance() is awaited, for deterministic tests of asyncio code. The sleepers of every
+    deadline that is passed are woken up in order and the event loop runs until their tasks wait again. Work that
+    the tasks hand to other threads is not waited for, use an executor that runs its calls synchronously.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._order = count()
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep_until(self, deadline: float):
+        if deadline <= self.now:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (deadline, next(self._order), future))
+        await future
+
+    async def advance(self, dt: float):
+        """Move the clock forward by dt."""
+        assert dt >= 0.0, "a clock cannot go backwards"
+        target = self.now + dt
+        await _settle()
+        while self._sleepers and self._sleepers[0][0] <= target:
+            deadline, _, future = heapq.heappop(self._sleepers)
+            self.now = max(self.now, deadline)
+            if not future.done():
+                future.set_result(None)
+            await _settle()
+        self.now = target
+        await _settle()
+
+
+async def _settle():
+    for _ in range(_SETTLE_ROUNDS):
+        await asyncio.sleep(0)
+
+
+@dataclass
+class SubscriptionMetrics:
+    """Delivery statistics of a subscription, latencies are measured from the deadline of a sample."""
+
+    delivered: int = 0
+    overruns: int = 0
+    underruns: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.delivered if self.delivered else 0.0
+
+
+@dataclass
+class PublisherMetrics:
+    """Precomputation statistics of a publisher, the compute times are measured in the executor."""
+
+    chunks: int = 0
+    samples: int = 0
+    compute_time: float = 0.0
+    max_compute_time: float = 0.0
+
+
+def _evaluate(signal: BaseSignal, grid: UniformGrid) -> Tuple[np.ndarray, float]:
+    start = perf_counter()
+    values = eval_on_grid(signal, grid)
+    return values, perf_counter() - start
+
+
+class _Channel:
+    """Ring buffer of the samples k < end of one rate, shared by the subscriptions of that rate."""
+
+    def __init__(self, rate: float, chunk: int, n_chunks: int, k: int):
+        self.rate = rate
+        self.dt = 1.0 / rate
+        self.chunk = chunk
+        self.buffer = np.empty(chunk * n_chunks)
+        self.end = k
+        self.readers: List[Subscription] = []
+
+    def space(self, due: int) -> int:
+        """
+        Number of samples that can be written without overwriting a sample that is still to be read. A reader that
+        is behind the sample due now skips to it at its next get(), so the samples before it may be overwritten and
+        an idle subscription does not hold back the others of its rate.
+        """
+        # One sample of margin for the rounding of the skip in get()
+        tail = min(max(reader.k, due - 1) for reader in self.readers)
+        return self.buffer.size - (self.end - tail)
+
+    def write(self, values: np.ndarray):
+        idx = np.arange(self.end, self.end + values.size) % self.buffer.size
+        self.buffer[idx] = values
+        self.end += values.size
+
+    def read(self, k: int) -> float:
+        return float(self.buffer[k % self.buffer.size])
+
+
+class Subscription:
+    """
+    Samples of the published signal at one rate, created with ReferencePublisher.subscribe(). Every get() waits for
+    the deadline of the next sample and returns its time and value, iterating with async for does the same until
+    the publisher is stopped.
+    """
+
+    def __init__(self, publisher: ReferencePublisher, channel: _Channel, k: int):
+        self.publisher = publisher
+        self.channel = channel
+        self.k = k
+        self.metrics = SubscriptionMetrics()
+
+    @property
+    def rate(self) -> float:
+        return self.channel.rate
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[float, float]:
+        if self.publisher.closed and self.publisher.error is None:
+            raise StopAsyncIteration
+        try:
+            return await self.get()
+        except RuntimeError:
+            if self.publisher.closed and self.publisher.error is None:
+                raise StopAsyncIteration
+            raise
+
+    async def get(self) -> Tuple[float, float]:
+        """
+        Wait for the next sample and return its time and value. Raises a RuntimeError once the publisher is stopped,
+        or the exception of the evaluation if the publisher failed to compute the samples.
+        """
+        publisher, channel, metrics = self.publisher, self.channel, self.metrics
+        dt = channel.dt
+        publisher._check()
+        deadline = publisher.start_time + self.k * dt
+        await publisher.clock.sleep_until(deadline)
+        publisher._check()
+
+        # Samples whose deadline passed more than a period ago are dropped, the latest due sample is delivered
+        late = floor((publisher.clock.time() - deadline) / dt)
+        if late > 0:
+            self.k += late
+            deadline = publisher.start_time + self.k * dt
+            metrics.overruns += late
+            publisher._notify()
+
+        if self.k >= channel.end:
+            # The space of the buffers depends on the time, the producer checks it again
+            publisher._notify()
+            await publisher._wait_for(lambda: self.k < channel.end)
+            publisher._check()
+            if publisher.clock.time() > deadline:
+                metrics.underruns += 1
+
+        t, value = publisher.t0 + self.k * dt, channel.read(self.k)
+        self.k += 1
+        publisher._notify()
+
+        latency = publisher.clock.time() - deadline
+        metrics.delivered += 1
+        metrics.total_latency += latency
+        metrics.max_latency = max(metrics.max_latency, latency)
+        return t, value
+
+    def close(self):
+        """Stop receiving samples, the buffer of the rate is released with its last subscription."""
+        self.publisher._unsubscribe(self)
+
+
+class ReferencePublisher:
+    """
+    Publish a signal to subscriptions at fixed rates, starting at the signal time t0 when the publisher is started.
+    The samples are computed in chunks of chunk_duration seconds on the executor (the default executor of the event
+    loop if None) and buffered n_chunks chunks ahead of the slowest subscription of every rate.
+
+        async with ReferencePublisher(reference) as publisher:
+            async for t, value in publisher.subscribe(rate=50.0):
+                ...
+    """
+
+    def __init__(
+        self,
+        signal: BaseSignal,
+        t0: float = 0.0,
+        chunk_duration: float = 0.1,
+        n_chunks: int = 4,
+        clock=None,
+        executor: Optional[Executor] = None,
+    ):
+        assert chunk_duration > 0.0, "the chunk duration must be positive"
+        assert (
+            n_chunks >= 2
+        ), "at least two chunks are buffered, one is read while the next is computed"
+        self.signal = signal
+        self.t0 = t0
+        self.chunk_duration = chunk_duration
+        self.n_chunks = n_chunks
+        self.clock = LoopClock() if clock is None else clock
+        self.executor = executor
+        self.metrics = PublisherMetrics()
+
+        self.start_time: Optional[float] = None
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        self._channels: Dict[float, _Channel] = {}
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self.closed
+
+    def start(self):
+        """Start publishing on the running event loop, the current time of the clock is the signal time t0."""
+        assert self._task is None, "the publisher has already been started"
+        self.start_time = self.clock.time()
+        self._changed = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._produce())
+
+    async def stop(self):
+        """Stop publishing, pending get() calls raise a RuntimeError and iterations end."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._notify()
+
+    async def __aenter__(self) -> ReferencePublisher:
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def subscribe(self, rate: float) -> Subscription:
+        """
+        Subscribe to the samples at t0 + k / rate, from the first sample whose deadline has not passed. The
+        publisher must be running.
+        """
+        assert rate > 0.0, "the rate of a subscription must be positive"
+        assert self.running, "subscribe to a running publisher"
+        dt = 1.0 / rate
+        k = max(ceil((self.clock.time() - self.start_time) / dt), 0)
+
+        channel = self._channels.get(rate)
+        if channel is None:
+            chunk = max(int(round(self.chunk_duration * rate)), 1)
+            channel = self._channels[rate] = _Channel(rate, chunk, self.n_chunks, k)
+        subscription = Subscription(
+            self, channel, max(k, channel.end - channel.buffer.size)
+        )
+        channel.readers.append(subscription)
+        self._notify()
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        channel = subscription.channel
+        if subscription in channel.readers:
+            channel.readers.remove(subscription)
+        if not channel.readers and self._channels.get(channel.rate) is channel:
+            del self._channels[channel.rate]
+        self._notify()
+
+    def _check(self):
+        """Raise the error of the producer, or a RuntimeError if the publisher is stopped."""
+        if self.error is not None:
+            raise self.error
+        if self.closed:
+            raise RuntimeError("the publisher has been stopped")
+
+    def _notify(self):
+        """Wake up the tasks that wait for a change of the buffers, they check their own condition."""
+        if self._changed is not None:
+            self._changed.set()
+
+    async def _wait_for(self, predicate):
+        while not (self.closed or predicate()):
+            self._changed.clear()
+            await self._changed.wait()
+
+    def _next_channel(self) -> Optional[_Channel]:
+        """The channel with room for a chunk whose buffer runs dry first."""
+        elapsed = self.clock.time() - self.start_time
+        ready = [
+            c
+            for c in self._channels.values()
+            if c.space(floor(elapsed / c.dt)) >= c.chunk
+        ]
+        return min(ready, key=lambda c: c.end * c.dt, default=None)
+
+    async def _produce(self):
+        loop = asyncio.get_running_loop()
+        metrics = self.metrics
+        while True:
+            await self._wait_for(lambda: self._next_channel() is not None)
+            channel = self._next_channel()
+
+            grid = UniformGrid(self.t0, channel.dt, channel.chunk, channel.end)
+            try:
+                values, elapsed = await loop.run_in_executor(
+                    self.executor, _evaluate, self.signal, grid
+                )
+            except Exception as error:
+                # The subscriptions raise the error from get() instead of waiting for samples that never come
+                self.error = error
+                self.closed = True
+                self._notify()
+                return
+            metrics.chunks += 1
+            metrics.samples += grid.n
+            metrics.compute_time += elapsed
+            metrics.max_compute_time = max(metrics.max_compute_time, elapsed)
+
+            # The subscriptions of the channel may have been closed meanwhile
+            if channel.readers and channel.end == grid.offset:
+                channel.write(values)
+                self._notify()
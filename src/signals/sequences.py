@@ -1,31 +1,37 @@
 import numpy as np
-from typing import Union
+from typing import Optional, Union
 from signals.base_signal import Const
 from signals.simple_signals import Signal, Step
 from signals.complex_signals import CosineSmoothedStep
+from signals.piecewise import PiecewiseSignal, POLYNOMIAL, COSINE
 
 ArrayLike = Union[list, tuple, np.ndarray]
 
 
-def StepSequence(times: ArrayLike, amplitudes: ArrayLike) -> Signal:
+def _sorted_levels(times: ArrayLike, amplitudes: ArrayLike):
+    """Sort the step times and return them with the signal level that holds after each step."""
+    times = np.asarray(times, dtype=float)
+
+    # For the first element the step amplitude is relative to 0.0, otherwise its relative to the previous amplitude
+    delta_ampl = np.diff(np.asarray(amplitudes, dtype=float), prepend=0.0)
+
+    order = np.argsort(times, kind="stable")
+    times, delta_ampl = times[order], delta_ampl[order]
+    return times, delta_ampl, np.cumsum(delta_ampl)
+
+
+def StepSequence(times: ArrayLike, amplitudes: ArrayLike) -> PiecewiseSignal:
     """Generates a sequence of Step signals at the elements of t_i in times with height a_i in amplitudes.
     The two arguments must have the same length.
     """
     assert len(times) == len(amplitudes), "sequence arrays must be of equal length"
 
-    signal = Const(0.0)
+    times, _, levels = _sorted_levels(times, amplitudes)
 
-    # Loop over the provided time locations
-    for idx, t0 in enumerate(times):
-        # For the first element the step amplitude is relative to 0.0, otherwise its relative to the previous amplitude
-        ampl_prev = 0.0 if idx == 0 else amplitudes[idx - 1]
-        ampl_i = amplitudes[idx]
-        delta_ampl = ampl_i - ampl_prev
-
-        # Add the signal
-        signal += delta_ampl * Step(t_start=t0)
-
-    return signal
+    # One constant segment per step, the last level is held until infinity
+    return PiecewiseSignal(
+        breakpoints=np.append(times, np.inf), coefficients=levels[:, np.newaxis]
+    )
 
 
 def SmoothedStepSequence(
@@ -36,17 +42,138 @@ def SmoothedStepSequence(
     """
     assert len(times) == len(amplitudes), "sequence arrays must be of equal length"
 
-    signal = Const(0.0)
+    times, delta_ampl, levels = _sorted_levels(times, amplitudes)
 
-    # Loop over the provided time locations
-    for idx, t0 in enumerate(times):
+    # Overlapping transitions do not fit a single segment, these sequences are built as a sum of smoothed steps
+    if times.size > 1 and np.any(times[:-1] + smooth_width > times[1:]):
+        return _smoothed_step_sum(times, delta_ampl, smooth_width)
+
+    return _smoothed_segments(times, delta_ampl, levels, smooth_width)
+
+
+def _smoothed_segments(
+    times: np.ndarray, delta_ampl: np.ndarray, levels: np.ndarray, smooth_width: float
+) -> PiecewiseSignal:
+    """Piecewise signal of a smoothed step sequence with sorted times and non-overlapping transitions."""
+    n = times.size
+    if n == 0:
+        return PiecewiseSignal(breakpoints=[np.inf], coefficients=[])
+
+    # Every step contributes a cosine transition segment followed by a constant segment
+    breakpoints = np.empty(2 * n + 1)
+    breakpoints[0:-1:2] = times
+    breakpoints[1:-1:2] = times + smooth_width
+    breakpoints[-1] = np.inf
 
-        # For the first element the step amplitude is relative to 0.0, otherwise its relative to the previous amplitude
-        ampl_prev = 0.0 if idx == 0 else amplitudes[idx - 1]
-        ampl_i = amplitudes[idx]
-        delta_ampl = ampl_i - ampl_prev
+    coefficients = np.empty(2 * n)
+    coefficients[0] = 0.0
+    coefficients[2::2] = levels[:-1]
+    coefficients[1::2] = levels
 
+    kinds = np.full(2 * n, POLYNOMIAL, dtype=np.int8)
+    kinds[0::2] = COSINE
+
+    params = np.zeros((2 * n, 3))
+    params[0::2, 0] = delta_ampl
+    params[0::2, 1] = smooth_width
+
+    return PiecewiseSignal(breakpoints, coefficients[:, np.newaxis], kinds, params)
+
+
+def _smoothed_step_sum(
+    times: np.ndarray, delta_ampl: np.ndarray, smooth_width: float
+) -> Signal:
+    signal = Const(0.0)
+
+    # Loop over the provided time locations
+    for t0, delta in zip(times, delta_ampl):
         # Add the signal
-        signal += delta_ampl * CosineSmoothedStep(t_start=t0, width=smooth_width)
+        signal += delta * CosineSmoothedStep(t_start=t0, width=smooth_width)
 
     return signal
+
+
+class StepSequenceBatch:
+    """
+    Batch of step sequences that share the number of steps, stored as (batch, n_steps) arrays of step times and
+    levels. With a positive smooth_width the steps are cosine smoothed transitions of that width, which must not
+    overlap.
+
+    Evaluating the batch returns a (batch, n_times) sample matrix directly, indexing it returns the PiecewiseSignal of
+    a single realization.
+    """
+
+    def __init__(
+        self, times: np.ndarray, levels: np.ndarray, smooth_width: float = 0.0
+    ):
+        self.times = np.atleast_2d(np.asarray(times, dtype=float))
+        self.levels = np.atleast_2d(np.asarray(levels, dtype=float))
+        self.smooth_width = smooth_width
+
+        assert (
+            self.times.shape == self.levels.shape
+        ), "times and levels must have the same shape"
+        assert np.all(
+            np.diff(self.times, axis=1) >= smooth_width
+        ), "transitions must be sorted and not overlap"
+
+    def __len__(self) -> int:
+        return self.times.shape[0]
+
+    def __getitem__(self, i: int) -> PiecewiseSignal:
+        times, levels = self.times[i], self.levels[i]
+        if self.smooth_width > 0.0:
+            delta_ampl = np.diff(levels, prepend=0.0)
+            return _smoothed_segments(times, delta_ampl, levels, self.smooth_width)
+        return PiecewiseSignal(np.append(times, np.inf), levels[:, np.newaxis])
+
+    def eval_on(self, t: ArrayLike, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Evaluate every realization on the timestamps t into a (batch, n_times) array."""
+        t = np.asarray(t, dtype=float)
+        shape = (len(self), t.size)
+        if out is None:
+            out = np.empty(shape)
+        assert out.shape == shape, f"output buffer must have shape {shape}"
+
+        # The step index of every sample is found from the positions of the step times in the sorted time vector
+        order = None if np.all(t[1:] >= t[:-1]) else np.argsort(t, kind="stable")
+        t_sorted = t if order is None else t[order]
+
+        batch = len(self)
+        rows = max(1, (1 << 22) // max(t.size, 1))
+        for lo in range(0, batch, rows):
+            block = self._eval_sorted(t_sorted, slice(lo, min(lo + rows, batch)))
+            if order is None:
+                out[lo : lo + rows] = block
+            else:
+                out[lo : lo + rows, order] = block
+        return out
+
+    def _eval_sorted(self, t: np.ndarray, rows: slice) -> np.ndarray:
+        times, levels = self.times[rows], self.levels[rows]
+        n_rows, n_steps = times.shape
+
+        # Count the steps at or before every timestamp with a difference array over the sample positions
+        positions = np.searchsorted(t, times, side="left")
+        positions += (t.size + 1) * np.arange(n_rows)[:, np.newaxis]
+        counts = np.bincount(positions.ravel(), minlength=n_rows * (t.size + 1))
+        counts = counts.reshape(n_rows, t.size + 1)
+        idx = np.cumsum(counts[:, :-1], axis=1) - 1
+
+        # Levels padded with the zero level before the first step
+        padded = np.concatenate((np.zeros((n_rows, 1)), levels), axis=1)
+        values = np.take_along_axis(padded, idx + 1, axis=1)
+
+        if self.smooth_width > 0.0:
+            w = self.smooth_width
+            active = idx >= 0
+            i = np.maximum(idx, 0)
+            tau = t - np.take_along_axis(times, i, axis=1)
+            transition = active & (tau < w)
+
+            previous = np.take_along_axis(padded, i, axis=1)
+            delta = values - previous
+            tau = np.minimum(tau, w)
+            smoothed = previous + delta * (-(np.cos(np.pi * tau / w) - 1) / 2)
+            values = np.where(transition, smoothed, values)
+        return values
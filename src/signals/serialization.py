@@ -0,0 +1,290 @@
+"""
+Serialization of signal expressions.
+
+An expression is flattened into a list of nodes in topological order, children before their parents, so that nodes
+shared by several parents or by several signals are stored once. Every node is described by its type name and its
+constructor arguments, where child signals are replaced by their position in the list.
+
+Two formats are provided:
+    - a JSON compatible dict (to_dict / from_dict), with non-finite floats written as the strings "inf", "-inf"
+      and "nan" and arrays written as nested lists,
+    - a binary .npz file of many signals (save_signals / load_signals), where all scalar arguments of all nodes are
+      stored in one float array and all array arguments, such as the breakpoints of piecewise sequences, in one flat
+      buffer. Loading it parses a handful of arrays and rebuilds the nodes in a single loop.
+"""
+
+from __future__ import annotations
+import dataclasses
+import json
+import numpy as np
+from os import PathLike
+from typing import Any, Dict, List, Sequence, Union
+from signals.base_signal import BaseSignal
+from signals.tree import children, node_state
+
+FORMAT_VERSION = 1
+
+# Value kinds of the binary format
+_FLOAT, _NODE, _ARRAY, _NONE = 0, 1, 2, 3
+
+_TYPES: Dict[str, type] = {}
+_BUILTINS_REGISTERED = False
+
+
+def register_type(cls: type, name: str = None) -> type:
+    """Allow a custom signal type to be serialized, usable as a class decorator. The name defaults to the class name."""
+    name = name or cls.__name__
+    assert _TYPES.get(name, cls) is cls, f"another type is registered as {name}"
+    _TYPES[name] = cls
+    cls._serialized_name = name
+    return cls
+
+
+def _registry() -> Dict[str, type]:
+    global _BUILTINS_REGISTERED
+    if not _BUILTINS_REGISTERED:
+        _BUILTINS_REGISTERED = True
+        from signals import (
+            base_signal,
+            simple_signals,
+            complex_signals,
+            piecewise,
+            transforms,
+            tabulate,
+            filters,
+        )
+
+        for module in (
+            base_signal,
+            simple_signals,
+            complex_signals,
+            transforms,
+            filters,
+        ):
+            for value in vars(module).values():
+                if (
+                    isinstance(value, type)
+                    and issubclass(value, BaseSignal)
+                    and dataclasses.is_dataclass(value)
+                    and not getattr(value, "__abstractmethods__", None)
+                ):
+                    register_type(value)
+        register_type(piecewise.PiecewiseSignal)
+        register_type(tabulate.TabulatedSignal)
+    return _TYPES
+
+
+def _type_name(node: BaseSignal) -> str:
+    registry = _registry()
+    name = type(node).__dict__.get("_serialized_name", type(node).__name__)
+    if registry.get(name) is not type(node):
+        raise TypeError(
+            f"{type(node).__name__} is not a serializable signal type, see register_type()"
+        )
+    return name
+
+
+def _flatten(signals: Sequence[BaseSignal]):
+    """Nodes of all signals in topological order and the positions of the roots."""
+    index: Dict[int, int] = {}
+    nodes: List[BaseSignal] = []
+    stack = [(signal, False) for signal in reversed(signals)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in index:
+            continue
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children(node)))
+            continue
+        index[id(node)] = len(nodes)
+        nodes.append(node)
+
+    return nodes, index, [index[id(signal)] for signal in signals]
+
+
+def _encode_float(value: float) -> Union[float, str]:
+    return float(value) if np.isfinite(value) else repr(float(value))
+
+
+def _encode_json(value: Any, index: Dict[int, int]) -> Any:
+    if isinstance(value, BaseSignal):
+        return {"node": index[id(value)]}
+    if isinstance(value, np.ndarray):
+        data = value.astype(float).ravel()
+        return {
+            "array": [_encode_float(x) for x in data.tolist()],
+            "shape": list(value.shape),
+            "dtype": value.dtype.str,
+        }
+    if isinstance(value, (float, np.floating)):
+        return _encode_float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def _decode_json(value: Any, nodes: List[BaseSignal]) -> Any:
+    if isinstance(value, dict):
+        if "node" in value:
+            return nodes[value["node"]]
+        data = np.array([float(x) for x in value["array"]])
+        return data.reshape(value["shape"]).astype(value["dtype"])
+    if isinstance(value, str):
+        return float(value)
+    return value
+
+
+def to_dict(signal: BaseSignal) -> dict:
+    """JSON compatible description of a signal expression."""
+    nodes, index, roots = _flatten([signal])
+    return {
+        "version": FORMAT_VERSION,
+        "nodes": [
+            {
+                "type": _type_name(node),
+                **{k: _encode_json(v, index) for k, v in node_state(node).items()},
+            }
+            for node in nodes
+        ],
+        "root": roots[0],
+    }
+
+
+def from_dict(data: dict) -> BaseSignal:
+    """Rebuild a signal expression from the description returned by to_dict()."""
+    assert data.get("version") == FORMAT_VERSION, "unsupported serialization version"
+    registry = _registry()
+    nodes: List[BaseSignal] = []
+    for entry in data["nodes"]:
+        cls = registry[entry["type"]]
+        kwargs = {k: _decode_json(v, nodes) for k, v in entry.items() if k != "type"}
+        nodes.append(cls(**kwargs))
+    return nodes[data["root"]]
+
+
+def dumps(signal: BaseSignal) -> str:
+    return json.dumps(to_dict(signal), separators=(",", ":"))
+
+
+def loads(text: str) -> BaseSignal:
+    return from_dict(json.loads(text))
+
+
+def save_signals(path: Union[str, PathLike], signals: Sequence[BaseSignal]):
+    """Save a list of signals into a binary .npz file, nodes shared between the signals are stored once."""
+    nodes, index, roots = _flatten(list(signals))
+
+    type_names: List[str] = []
+    type_codes: Dict[str, int] = {}
+    fields: Dict[str, List[str]] = {}
+    node_type = np.empty(len(nodes), dtype=np.int32)
+    value_start = np.zeros(len(nodes) + 1, dtype=np.int64)
+    kinds: List[int] = []
+    values: List[float] = []
+    arrays: List[np.ndarray] = []
+
+    for i, node in enumerate(nodes):
+        name = _type_name(node)
+        state = node_state(node)
+        if name not in type_codes:
+            type_codes[name] = len(type_names)
+            type_names.append(name)
+            fields[name] = list(state)
+        node_type[i] = type_codes[name]
+
+        for value in state.values():
+            if isinstance(value, BaseSignal):
+                kinds.append(_NODE)
+                values.append(index[id(value)])
+            elif isinstance(value, np.ndarray):
+                kinds.append(_ARRAY)
+                values.append(len(arrays))
+                arrays.append(value)
+            elif value is None:
+                kinds.append(_NONE)
+                values.append(0.0)
+            else:
+                kinds.append(_FLOAT)
+                values.append(value)
+        value_start[i + 1] = len(values)
+
+    array_start = np.cumsum([0] + [a.size for a in arrays])
+    array_shape = [list(a.shape) for a in arrays]
+    array_dtype = [a.dtype.str for a in arrays]
+    buffer = np.concatenate([a.astype(float).ravel() for a in arrays] or [[]])
+
+    header = {
+        "version": FORMAT_VERSION,
+        "types": type_names,
+        "fields": fields,
+        "array_shape": array_shape,
+        "array_dtype": array_dtype,
+    }
+    np.savez(
+        path,
+        header=np.array(json.dumps(header)),
+        node_type=node_type,
+        value_start=value_start,
+        value_kind=np.asarray(kinds, dtype=np.int8),
+        values=np.asarray(values, dtype=float),
+        array_start=array_start,
+        array_data=buffer,
+        roots=np.asarray(roots, dtype=np.int64),
+    )
+
+
+def load_signals(path: Union[str, PathLike]) -> List[BaseSignal]:
+    """Load the list of signals saved with save_signals()."""
+    with np.load(path) as data:
+        header = json.loads(str(data["header"]))
+        assert header["version"] == FORMAT_VERSION, "unsupported serialization version"
+        node_type = data["node_type"].tolist()
+        value_start = data["value_start"].tolist()
+        kind_array = data["value_kind"]
+        kinds = kind_array.tolist()
+        values = data["values"].tolist()
+        array_start = data["array_start"].tolist()
+        buffer = data["array_data"]
+        roots = data["roots"].tolist()
+
+    # Array arguments are views of the shared buffer, cast back to their original type
+    arrays = [
+        buffer[lo:hi].reshape(shape).astype(dtype, copy=False)
+        for lo, hi, shape, dtype in zip(
+            array_start[:-1],
+            array_start[1:],
+            header["array_shape"],
+            header["array_dtype"],
+        )
+    ]
+
+    registry = _registry()
+    classes = [registry[name] for name in header["types"]]
+    fields = [header["fields"][name] for name in header["types"]]
+
+    # Nodes whose arguments are all floats, most of the leaves, skip the dispatch on the value kinds
+    non_float = np.concatenate([[0], np.cumsum(kind_array != _FLOAT)])
+    plain = (non_float[value_start[1:]] == non_float[value_start[:-1]]).tolist()
+
+    nodes: List[BaseSignal] = []
+    for code, lo, hi, is_plain in zip(
+        node_type, value_start[:-1], value_start[1:], plain
+    ):
+        if is_plain:
+            args = values[lo:hi]
+        else:
+            args = []
+            for kind, value in zip(kinds[lo:hi], values[lo:hi]):
+                if kind == _FLOAT:
+                    args.append(value)
+                elif kind == _NODE:
+                    args.append(nodes[int(value)])
+                elif kind == _ARRAY:
+                    args.append(arrays[int(value)])
+                else:
+                    args.append(None)
+        nodes.append(classes[code](**dict(zip(fields[code], args))))
+
+    return [nodes[i] for i in roots]
@@ -1,40 +1,158 @@
 from __future__ import annotations
 import numpy as np
 from dataclasses import dataclass
-from signals.base_signal import Signal
+from typing import Union
+from signals.base_signal import BaseSignal, Const, Signal, add_slots
+from signals.piecewise import PiecewiseSignal, SINE
+from signals.grid import RECURRENCE_BLOCK, exp_recurrence, sin_recurrence
+from signals.guards import EXP_LIMIT, exp, exp_limit, expm1
 
 
+@add_slots
 @dataclass
 class Step(Signal):
-    def _signal(self, _: float) -> float:
+    def _signal(self, _: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return 1.0
 
+    def _derivative(self) -> BaseSignal:
+        return Const(value=0.0)
 
+    def _integral(self) -> BaseSignal:
+        return PiecewiseSignal.window(self.t_start, self.t_end, [1.0])._integral()
+
+
+@add_slots
 @dataclass
 class Ramp(Signal):
-    def _signal(self, t: float) -> float:
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return t
 
+    def _derivative(self) -> BaseSignal:
+        return Step(t_start=self.t_start, t_end=self.t_end)
+
+    def _integral(self) -> BaseSignal:
+        return PiecewiseSignal.window(self.t_start, self.t_end, [0.0, 1.0])._integral()
 
+
+@add_slots
 @dataclass
 class Parabolic(Signal):
-    def _signal(self, t: float) -> float:
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return t * t / 2.0
 
+    def _derivative(self) -> BaseSignal:
+        return Ramp(t_start=self.t_start, t_end=self.t_end)
+
+    def _integral(self) -> BaseSignal:
+        coefficients = [0.0, 0.0, 0.5]
+        return PiecewiseSignal.window(
+            self.t_start, self.t_end, coefficients
+        )._integral()
+
 
+@add_slots
 @dataclass
 class Exponential(Signal):
     alpha: float = 0.0
 
-    def _signal(self, t: float) -> float:
-        return np.exp(self.alpha * t)
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        return exp(self.alpha * t)
+
+    def _grid_signal(self, grid) -> np.ndarray:
+        # A block of the recurrence spans exponents of up to |alpha| * dt * RECURRENCE_BLOCK
+        if abs(self.alpha) * grid.dt * RECURRENCE_BLOCK > EXP_LIMIT:
+            return self._signal(grid.times() - self.t_start)
+        with np.errstate(over="ignore"):
+            out = exp_recurrence(grid, self.alpha, self.t_start)
+
+        # The samples past the exponent limit are clipped one by one, like the samples of _signal()
+        first = self.alpha * (grid.time(0) - self.t_start)
+        last = self.alpha * (grid.time(grid.n - 1) - self.t_start)
+        if max(first, last) > exp_limit():
+            x = self.alpha * (grid.times() - self.t_start)
+            clipped = x > exp_limit()
+            out[clipped] = exp(x[clipped])
+        return out
+
+    def _derivative(self) -> BaseSignal:
+        if self.alpha == 0.0:
+            return Const(value=0.0)
+        return self.alpha * Exponential(self.t_start, self.t_end, alpha=self.alpha)
+
+    def _integral(self) -> BaseSignal:
+        step = Step(t_start=self.t_start, t_end=self.t_end)
+        if self.alpha == 0.0:
+            return step._integral()
+        if self.t_start == -np.inf:
+            raise ValueError(
+                "the integral of a signal that starts at -inf is unbounded"
+            )
+
+        # (exp(alpha * tau) - 1) / alpha on the window, held at its final value afterwards
+        signal = ExponentialRise(self.t_start, self.t_end, alpha=self.alpha)
+        if np.isfinite(self.t_end):
+            final = np.expm1(self.alpha * (self.t_end - self.t_start)) / self.alpha
+            signal = signal + final * Step(t_start=self.t_end)
+        return signal
+
+
+@add_slots
+@dataclass
+class ExponentialRise(Signal):
+    alpha: float = 0.0
+
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        # (exp(alpha * t) - 1) / alpha without the cancellation of the difference for small alpha * t
+        if self.alpha == 0.0:
+            return t
+        return expm1(self.alpha * t) / self.alpha
+
+    def _derivative(self) -> BaseSignal:
+        return Exponential(self.t_start, self.t_end, alpha=self.alpha)
 
+    def _integral(self) -> BaseSignal:
+        ramp = Ramp(t_start=self.t_start, t_end=self.t_end)
+        if self.alpha == 0.0:
+            return ramp._integral()
+        if self.t_start == -np.inf:
+            raise ValueError(
+                "the integral of a signal that starts at -inf is unbounded"
+            )
 
+        # (rise(tau) - tau) / alpha on the window, held at its final value afterwards
+        signal = (self - ramp) * (1.0 / self.alpha)
+        if np.isfinite(self.t_end):
+            width = self.t_end - self.t_start
+            final = (np.expm1(self.alpha * width) / self.alpha - width) / self.alpha
+            signal = signal + final * Step(t_start=self.t_end)
+        return signal
+
+
+@add_slots
 @dataclass
 class Sinusoid(Signal):
     ampl: float = 1.0
     freq: float = 1.0
     phi: float = 0.0
 
-    def _signal(self, t: float) -> float:
+    def _signal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         return self.ampl * np.sin(2.0 * np.pi * self.freq * t + self.phi)
+
+    def _grid_signal(self, grid) -> np.ndarray:
+        omega = 2.0 * np.pi * self.freq
+        return sin_recurrence(grid, self.ampl, omega, self.phi, self.t_start)
+
+    def _derivative(self) -> BaseSignal:
+        omega = 2.0 * np.pi * self.freq
+        return Sinusoid(
+            self.t_start,
+            self.t_end,
+            ampl=self.ampl * omega,
+            freq=self.freq,
+            phi=self.phi + np.pi / 2,
+        )
+
+    def _integral(self) -> BaseSignal:
+        params = (self.ampl, 2.0 * np.pi * self.freq, self.phi)
+        pw = PiecewiseSignal.window(self.t_start, self.t_end, [0.0], SINE, params)
+        return pw._integral()
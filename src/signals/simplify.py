@@ -0,0 +1,161 @@
+"""
+Canonicalizing simplification of signal expressions.
+
+The expression is lowered into the flat representation of the compiler, which folds scalar factors and full-domain
+constants into coefficients, drops terms with a zero coefficient and adds up the coefficients of a leaf that appears
+several times. On top of that, leaves with the same parameters are merged, windowed constants are absorbed as scaled
+steps and steps with equal coefficients on adjacent windows are joined into one. The result is rebuilt as a regular
+signal tree with balanced sums and products, so its depth grows with the logarithm of the number of terms.
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Tuple, Union
+from signals.base_signal import (
+    BaseSignal,
+    Const,
+    EMPTY_SUPPORT,
+    SumOfSignals,
+    ProductOfSignals,
+    DivisionOfSignals,
+)
+from signals.simple_signals import Step
+from signals.compiler import lower, _Leaf, _Lin, _Prod, _Div
+from signals.tree import balanced_tree, fingerprint
+
+
+def _is_zero(node) -> bool:
+    """Leaves without support are zero everywhere, and so is any product with such a factor."""
+    if isinstance(node, _Leaf):
+        return node.signal.support == EMPTY_SUPPORT
+    if isinstance(node, _Prod):
+        return any(_is_zero(factor) for factor in node.factors)
+    return False
+
+
+def _canonical_terms(lin: _Lin) -> List[Tuple[float, object]]:
+    """Terms of a linear combination with equal leaves merged and adjacent steps joined."""
+    merged: Dict[object, list] = {}
+    steps: List[Tuple[float, float, float]] = []
+
+    for coef, node in lin.terms.values():
+        if coef == 0.0 or _is_zero(node):
+            continue
+
+        if isinstance(node, _Leaf):
+            signal = node.signal
+            if type(signal) is Const:
+                # A windowed constant is a scaled step
+                steps.append((coef * signal.value, signal.t_start, signal.t_end))
+                continue
+            if type(signal) is Step:
+                steps.append((coef, signal.t_start, signal.t_end))
+                continue
+            key = ("leaf", fingerprint(signal))
+        else:
+            key = node.key
+
+        entry = merged.get(key)
+        if entry is None:
+            merged[key] = [coef, node]
+        else:
+            entry[0] += coef
+
+    terms = [(coef, node) for coef, node in merged.values() if coef != 0.0]
+    terms.extend((coef, _Leaf(step)) for coef, step in _join_steps(steps))
+    return terms
+
+
+def _join_steps(steps: List[Tuple[float, float, float]]) -> List[Tuple[float, Step]]:
+    """Merge steps with the same window, then join steps of equal coefficient whose windows touch."""
+    windows: Dict[Tuple[float, float], float] = {}
+    for coef, t_start, t_end in steps:
+        windows[(t_start, t_end)] = windows.get((t_start, t_end), 0.0) + coef
+
+    by_coef: Dict[float, List[Tuple[float, float]]] = {}
+    for window, coef in windows.items():
+        if coef != 0.0:
+            by_coef.setdefault(coef, []).append(window)
+
+    out = []
+    for coef, group in by_coef.items():
+        group.sort()
+        t_start, t_end = group[0]
+        for lo, hi in group[1:]:
+            if lo == t_end:
+                t_end = hi
+            else:
+                out.append((coef, Step(t_start=t_start, t_end=t_end)))
+                t_start, t_end = lo, hi
+        out.append((coef, Step(t_start=t_start, t_end=t_end)))
+    return out
+
+
+def _children(node) -> list:
+    if isinstance(node, _Lin):
+        return [n for _, n in node.terms.values()]
+    if isinstance(node, _Prod):
+        return node.factors
+    if isinstance(node, _Div):
+        return [node.num, node.den]
+    return []
+
+
+def _memo_key(node) -> object:
+    return id(node) if isinstance(node, _Lin) else node.key
+
+
+def _build(root: _Lin) -> BaseSignal:
+    """Rebuild a signal tree from the lowered representation without recursion."""
+    built: Dict[object, BaseSignal] = {}
+    stack = [(root, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        key = _memo_key(node)
+        if key in built:
+            continue
+        children = _children(node)
+        if children and not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+            continue
+
+        if isinstance(node, _Leaf):
+            built[key] = node.signal
+        elif isinstance(node, _Prod):
+            built[key] = balanced_tree(
+                [built[_memo_key(f)] for f in node.factors], ProductOfSignals
+            )
+        elif isinstance(node, _Div):
+            built[key] = DivisionOfSignals(
+                built[_memo_key(node.num)], built[_memo_key(node.den)], node.fill_value
+            )
+        else:
+            built[key] = _build_lin(node, built)
+
+    return built[_memo_key(root)]
+
+
+def _build_lin(lin: _Lin, built: Dict[object, BaseSignal]) -> BaseSignal:
+    terms = []
+    for coef, node in _canonical_terms(lin):
+        # Leaves created by joining steps are not part of the lowered tree
+        signal = built[node.key] if node.key in built else node.signal
+        terms.append(
+            signal if coef == 1.0 else ProductOfSignals(signal, Const(value=coef))
+        )
+
+    if lin.const != 0.0 or not terms:
+        terms.append(Const(value=lin.const))
+    return balanced_tree(terms, SumOfSignals)
+
+
+def simplify(signal: Union[BaseSignal, float, int]) -> BaseSignal:
+    """
+    Return a canonical, simplified expression with the same values as the signal, up to the rounding of folded
+    coefficients. Terms that cancel are dropped, so x - x simplifies to zero even where x is not finite. The leaves
+    of the result are shared with the original expression.
+    """
+    if not isinstance(signal, BaseSignal):
+        return Const(value=float(signal))
+    return _build(lower(signal))
@@ -1,38 +1,63 @@
 import numpy as np
+from typing import Optional, Union
 from signals.base_signal import Signal
-from signals.sequences import StepSequence, SmoothedStepSequence
+from signals.sequences import StepSequence, SmoothedStepSequence, StepSequenceBatch
 
+# Anything accepted by np.random.default_rng: a seed, a SeedSequence or a Generator
+RandomState = Union[None, int, np.random.SeedSequence, np.random.Generator]
 
-def RandomizedStepSequence(
+
+def _random_sequence(
     t_max: float,
     ampl_max: float,
     block_width: float,
-    start_with_zero: bool = True,
-    n_levels: int = 5,
-    vary_timings: float = 0.0,
-) -> Signal:
-
+    start_with_zero: bool,
+    n_levels: int,
+    vary_timings: float,
+    rng: RandomState,
+    batch_size: Optional[int] = None,
+):
+    """Draw the step times and amplitudes of one realization, or of batch_size realizations at once."""
     assert (
         vary_timings < block_width / 2
     ), "vary timings should be smaller than half block width"
 
+    # Without a generator the global numpy random state is used
+    random = np.random if rng is None else np.random.default_rng(rng)
+
     # Starting time of each step block
     t_starts = np.arange(0, t_max, block_width)
+    shape = t_starts.shape if batch_size is None else (batch_size, t_starts.size)
 
     # Possible choices
     ampl_choices = np.linspace(-ampl_max, ampl_max, n_levels)
 
     # Generate random amplitudes
-    amplitudes = np.random.choice(ampl_choices, size=t_starts.size, replace=True)
-
+    amplitudes = random.choice(ampl_choices, size=shape, replace=True)
     if start_with_zero:
-        amplitudes[0] = 0.0
+        amplitudes[..., 0] = 0.0
+
+    # Vary the timings of the steps, except for the first one
+    jitter = random.uniform(
+        -vary_timings, vary_timings, size=shape[:-1] + (shape[-1] - 1,)
+    )
+    t_starts = t_starts + np.concatenate((np.zeros(shape[:-1] + (1,)), jitter), axis=-1)
 
-    # Vary the timings of the steps
-    t_starts = [t_starts[0]] + [
-        t + np.random.uniform(-vary_timings, vary_timings) for t in t_starts[1:]
-    ]
+    return t_starts, amplitudes
 
+
+def RandomizedStepSequence(
+    t_max: float,
+    ampl_max: float,
+    block_width: float,
+    start_with_zero: bool = True,
+    n_levels: int = 5,
+    vary_timings: float = 0.0,
+    rng: RandomState = None,
+) -> Signal:
+    t_starts, amplitudes = _random_sequence(
+        t_max, ampl_max, block_width, start_with_zero, n_levels, vary_timings, rng
+    )
     return StepSequence(times=t_starts, amplitudes=amplitudes)
 
 
@@ -44,28 +69,72 @@ def RandomizedCosineStepSequence(
     start_with_zero: bool = True,
     n_levels: int = 10,
     vary_timings: float = 0.0,
+    rng: RandomState = None,
 ) -> Signal:
+    t_starts, amplitudes = _random_sequence(
+        t_max, ampl_max, block_width, start_with_zero, n_levels, vary_timings, rng
+    )
+    return SmoothedStepSequence(
+        times=t_starts, amplitudes=amplitudes, smooth_width=smooth_width
+    )
 
-    assert (
-        vary_timings < block_width / 2
-    ), "vary timings should be smaller than half block width"
-
-    # Starting time of each step block
-    t_starts = np.arange(0, t_max, block_width)
-
-    # Possible choices
-    ampl_choices = np.linspace(-ampl_max, ampl_max, n_levels)
 
-    # Generate random amplitudes
-    amplitudes = np.random.choice(ampl_choices, size=t_starts.size, replace=True)
-    if start_with_zero:
-        amplitudes[0] = 0.0
+def RandomizedStepSequenceBatch(
+    batch_size: int,
+    t_max: float,
+    ampl_max: float,
+    block_width: float,
+    start_with_zero: bool = True,
+    n_levels: int = 5,
+    vary_timings: float = 0.0,
+    rng: RandomState = None,
+) -> StepSequenceBatch:
+    """
+    Draw batch_size realizations of a RandomizedStepSequence at once. Pass a seed, SeedSequence or Generator as rng
+    for reproducible batches, for instance one child of SeedSequence(seed).spawn(n_workers) per worker process.
+    """
+    t_starts, amplitudes = _random_sequence(
+        t_max,
+        ampl_max,
+        block_width,
+        start_with_zero,
+        n_levels,
+        vary_timings,
+        rng,
+        batch_size,
+    )
+    return StepSequenceBatch(times=t_starts, levels=amplitudes)
 
-    # Vary the timings of the steps
-    t_starts = [t_starts[0]] + [
-        t + np.random.uniform(-vary_timings, vary_timings) for t in t_starts[1:]
-    ]
 
-    return SmoothedStepSequence(
-        times=t_starts, amplitudes=amplitudes, smooth_width=smooth_width
+def RandomizedCosineStepSequenceBatch(
+    batch_size: int,
+    t_max: float,
+    ampl_max: float,
+    block_width: float,
+    smooth_width: float,
+    start_with_zero: bool = True,
+    n_levels: int = 10,
+    vary_timings: float = 0.0,
+    rng: RandomState = None,
+) -> StepSequenceBatch:
+    """
+    Draw batch_size realizations of a RandomizedCosineStepSequence at once. The smoothed transitions of a batch must
+    not overlap, so smooth_width may be at most block_width - 2 * vary_timings.
+    """
+    assert (
+        smooth_width <= block_width - 2 * vary_timings
+    ), "smoothed transitions of a batch must not overlap"
+
+    t_starts, amplitudes = _random_sequence(
+        t_max,
+        ampl_max,
+        block_width,
+        start_with_zero,
+        n_levels,
+        vary_timings,
+        rng,
+        batch_size,
+    )
+    return StepSequenceBatch(
+        times=t_starts, levels=amplitudes, smooth_width=smooth_width
     )
@@ -0,0 +1,177 @@
+"""
+Streaming evaluation of signals on monotonically increasing, uniformly spaced time-steps.
+
+A stream decomposes the signal into a sum of scaled terms. Terms are activated when the stream reaches the start of
+their support and dropped for good once its end has passed, so the work per tick only depends on the terms that are
+active. Piecewise signals keep a cursor to their current segment instead of searching the breakpoints at every tick.
+"""
+
+from __future__ import annotations
+import numpy as np
+from bisect import bisect_right
+from typing import Optional, Tuple, Union
+from signals.base_signal import BaseSignal, Signal
+from signals.piecewise import PiecewiseSignal
+from signals.grid import UniformGrid, eval_on_grid
+from signals.tree import linear_terms
+
+
+class _Term:
+    """Scaled term of the streamed signal that is non-zero on the window [t_start, t_end)."""
+
+    __slots__ = ("coef", "signal", "t_start", "t_end")
+
+    def __init__(self, coef: float, signal: BaseSignal, window: Tuple[float, float]):
+        self.coef = coef
+        self.signal = signal
+        self.t_start, self.t_end = window
+
+    def value(self, t: float) -> float:
+        return self.signal(t)
+
+    def values(self, t: np.ndarray, grid: UniformGrid) -> np.ndarray:
+        return eval_on_grid(self.signal, grid)
+
+
+class _SignalTerm(_Term):
+    """Term for a Signal, the window check is skipped because the stream only evaluates it while it is active."""
+
+    __slots__ = ()
+
+    def value(self, t: float) -> float:
+        return self.signal._signal(t - self.t_start)
+
+
+class _PiecewiseTerm(_Term):
+    """Term for a PiecewiseSignal that keeps a cursor to the segment of the last query."""
+
+    __slots__ = ("cursor",)
+
+    def __init__(self, coef: float, signal: PiecewiseSignal, t0: float):
+        super().__init__(coef, signal, signal.support)
+        self.cursor = bisect_right(signal._breaks, t0) - 1
+
+    def value(self, t: float) -> float:
+        breaks = self.signal._breaks
+        i = self.cursor
+        while i + 1 < len(breaks) and breaks[i + 1] <= t:
+            i += 1
+        self.cursor = i
+
+        if 0 <= i < self.signal.n_segments:
+            return self.signal._eval_segment(i, t - breaks[i])
+        return 0.0
+
+    def values(self, t: np.ndarray, grid: UniformGrid) -> np.ndarray:
+        # Only the breakpoints between the cursor and the end of the chunk have to be searched
+        lo = max(self.cursor, 0)
+        hi = bisect_right(self.signal._breaks, t[-1])
+        idx = lo - 1 + np.searchsorted(self.signal.breakpoints[lo:hi], t, side="right")
+        self.cursor = int(idx[-1])
+
+        out = np.zeros(t.shape)
+        valid = (idx >= 0) & (idx < self.signal.n_segments)
+        if valid.any():
+            out[valid] = self.signal._eval_segments(idx[valid], t[valid])
+        return out
+
+
+class SignalStream:
+    """
+    Iterator over the samples of a signal at the time-steps t_k = t0 + k * dt, created with BaseSignal.stream().
+
+    Without a chunk size every step of the iteration returns the float value at the next time-step. With a chunk
+    size every step returns the values of the next chunk of time-steps, written into the same preallocated buffer,
+    so the returned array is overwritten by the next chunk.
+    """
+
+    def __init__(
+        self,
+        signal: BaseSignal,
+        dt: float,
+        t0: float = 0.0,
+        chunk: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+    ):
+        assert dt > 0.0, "the time-step of a stream must be positive"
+        self.signal = signal
+        self.dt = dt
+        self.t0 = t0
+        self.k = 0
+
+        self.chunk = chunk
+        if chunk is not None:
+            self.buffer = np.empty(chunk) if out is None else out
+            assert self.buffer.shape == (
+                chunk,
+            ), "the output buffer must match the chunk size"
+
+        self._const, terms = linear_terms(signal)
+        terms = [self._make_term(coef, node) for coef, node in terms]
+
+        # Pending terms are sorted by start time, latest first, so that the next one to activate is at the end
+        self._pending = sorted(terms, key=lambda term: term.t_start, reverse=True)
+        self._active = []
+        self._next_expiry = np.inf
+
+    def _make_term(self, coef: float, node: BaseSignal) -> _Term:
+        if isinstance(node, PiecewiseSignal):
+            return _PiecewiseTerm(coef, node, self.t0)
+        if isinstance(node, Signal):
+            return _SignalTerm(coef, node, node.support)
+        return _Term(coef, node, node.support)
+
+    @property
+    def time(self) -> float:
+        """Time of the next sample of the stream."""
+        return self.t0 + self.k * self.dt
+
+    @property
+    def n_active(self) -> int:
+        """Number of terms that are currently evaluated at every tick."""
+        return len(self._active)
+
+    def _update(self, t_first: float, t_last: float):
+        """Activate the terms that start before t_last and drop the terms that end before t_first."""
+        pending = self._pending
+        while pending and pending[-1].t_start <= t_last:
+            term = pending.pop()
+            if term.t_end > t_first:
+                self._active.append(term)
+                self._next_expiry = min(self._next_expiry, term.t_end)
+
+        if t_first >= self._next_expiry:
+            self._active = [term for term in self._active if term.t_end > t_first]
+            self._next_expiry = min(
+                (term.t_end for term in self._active), default=np.inf
+            )
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Union[float, np.ndarray]:
+        if self.chunk is None:
+            return self._next_sample()
+        return self._next_chunk()
+
+    def _next_sample(self) -> float:
+        t = self.time
+        self.k += 1
+        self._update(t, t)
+
+        value = self._const
+        for term in self._active:
+            value += term.coef * term.value(t)
+        return value
+
+    def _next_chunk(self) -> np.ndarray:
+        grid = UniformGrid(self.t0, self.dt, self.chunk, self.k)
+        t = grid.times()
+        self.k += self.chunk
+        self._update(t[0], t[-1])
+
+        out = self.buffer
+        out.fill(self._const)
+        for term in self._active:
+            out += term.coef * term.values(t, grid)
+        return out
@@ -0,0 +1,344 @@
+"""
+Tabulation of signal expressions into lookup tables.
+
+The expression is sampled on [t0, t1) with adaptive refinement: every interval between two knots is checked at three
+probe points against its interpolant and split in half until the error is below the tolerance. The edges of windows,
+the breakpoints of piecewise signals, the end of cosine transitions and the samples of stateful operators, which hold
+their output between them, are found in the expression tree and are always knots. Every interval is interpolated
+between the values on its own side of them, so jumps are represented exactly. The probes can underestimate the error
+by a little, a RuntimeWarning is issued when the measured error of the table exceeds twice the tolerance, which
+happens at jumps that are not breakpoints of the tree.
+
+The table is a PiecewiseSignal with one linear or cubic Hermite polynomial per interval, so it supports the regular
+arithmetic, derivatives, streaming, uniform grids and serialization. Scalar queries locate their interval through a
+bucket index over [t0, t1), which makes a lookup independent of the number of knots for evenly spread knots.
+"""
+
+from __future__ import annotations
+import warnings
+import numpy as np
+from bisect import bisect_right
+from math import ceil, floor
+from typing import List, Optional, Union
+from signals.base_signal import BaseSignal, Signal
+from signals.complex_signals import AlternatingRamp, CosineSmoothedStep, SeeSaw
+from signals.filters import StatefulSignal
+from signals.piecewise import PiecewiseSignal, COSINE
+from signals.transforms import Shifted, TimeScaled, Repeated
+from signals.tree import children
+
+ArrayLike = Union[list, tuple, np.ndarray]
+
+# Relative positions of the points at which an interval is compared with its interpolant
+_PROBES = np.array([0.25, 0.5, 0.75])
+
+# Relative positions at which the error of the finished table is measured
+_CHECKS = np.arange(1, 16) / 16
+
+# Number of uniform knots the refinement starts from
+_INITIAL_KNOTS = 64
+
+# Largest number of ulps by which a breakpoint is moved onto the jump it stands for
+_SNAP_ULPS = 4
+
+
+class TabulatedSignal(PiecewiseSignal):
+    """
+    Lookup table of a signal on [t0, t1) created with BaseSignal.tabulate(), zero outside of it. Holds the estimated
+    maximum interpolation error of the table in error and its memory footprint in nbytes.
+    """
+
+    def __init__(
+        self,
+        breakpoints: ArrayLike,
+        coefficients: ArrayLike,
+        kinds: Optional[ArrayLike] = None,
+        params: Optional[ArrayLike] = None,
+        error: float = np.nan,
+    ):
+        if params is None:
+            # A table only has polynomial segments, their parameters share a single row of zeros
+            n = max(np.size(breakpoints) - 1, 0)
+            params = np.broadcast_to(np.zeros(3), (n, 3))
+        super().__init__(breakpoints, coefficients, kinds, params)
+        self.error = float(error)
+
+        # Bucket j covers [t0 + j * width, t0 + (j + 1) * width) and holds the range of breakpoints it can land on
+        n_buckets = max(self.n_segments, 1)
+        t0, t1 = self._breaks[0], self._breaks[-1]
+        span = t1 - t0 if np.isfinite(t1 - t0) and t1 > t0 else 1.0
+        self._origin = t0 if np.isfinite(t0) else 0.0
+        self._scale = n_buckets / span
+        edges = self._origin + np.arange(n_buckets + 1) / self._scale
+        self._bounds = np.searchsorted(self.breakpoints, edges, side="right").tolist()
+
+    @property
+    def n_knots(self) -> int:
+        return self.breakpoints.size
+
+    @property
+    def nbytes(self) -> int:
+        """Memory footprint of the table: its knots, polynomial coefficients and bucket index."""
+        return (
+            self.breakpoints.nbytes + self.coefficients.nbytes + 8 * len(self._bounds)
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(n_knots={self.n_knots}, error={self.error:.3g}, "
+            f"nbytes={self.nbytes})"
+        )
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return self._eval_array(t)
+
+        breaks = self._breaks
+        if not breaks[0] <= t < breaks[-1]:
+            return 0.0
+
+        # The bucket of t is only known up to rounding, its neighbours bound the search
+        j = int((t - self._origin) * self._scale)
+        bounds = self._bounds
+        lo = bounds[max(j - 1, 0)]
+        hi = bounds[min(j + 2, len(bounds) - 1)]
+        i = bisect_right(breaks, t, max(lo - 1, 0), hi) - 1
+        return self._eval_segment(i, t - breaks[i])
+
+
+def _breakpoints(signal: BaseSignal, t0: float, t1: float) -> np.ndarray:
+    """
+    Times inside (t0, t1) where the signal or its derivative may jump. Every node is visited with the affine map
+    t = scale * u + offset from its local time u to the time of the tabulated signal.
+    """
+    found: List[float] = []
+    stack = [(signal, 1.0, 0.0)]
+
+    while stack:
+        node, scale, offset = stack.pop()
+        local: List[float] = []
+
+        if isinstance(node, Signal):
+            local += [node.t_start, node.t_end]
+            if isinstance(node, CosineSmoothedStep):
+                local.append(node.t_start + node.width)
+            elif isinstance(node, (SeeSaw, AlternatingRamp)):
+                local += _corners(node, (t0 - offset) / scale, (t1 - offset) / scale)
+        elif isinstance(node, PiecewiseSignal):
+            local += node._breaks
+            cosine = node.kinds == COSINE
+            local += (node.breakpoints[:-1][cosine] + node.params[cosine, 1]).tolist()
+        elif isinstance(node, StatefulSignal):
+            # The output jumps at the samples, the breakpoints of the input do not matter
+            u0, u1 = (t0 - offset) / scale, (t1 - offset) / scale
+            first = max(ceil((u0 - node.t_start) / node.dt) - 1, 0)
+            last = max(floor((u1 - node.t_start) / node.dt) + 1, first)
+            k = np.arange(first, last + 1, dtype=float)
+            local += (k * node.dt + node.t_start).tolist()
+        elif isinstance(node, Shifted):
+            stack.append((node.signal, scale, offset + scale * node.delay))
+        elif isinstance(node, TimeScaled):
+            stack.append((node.signal, scale * node.factor, offset))
+        elif isinstance(node, Repeated):
+            # Every repetition in the range maps the period of the signal to its own window
+            u0, u1 = (t0 - offset) / scale, (t1 - offset) / scale
+            first = max(floor((u0 - node.t_start) / node.period), 0)
+            last = ceil((u1 - node.t_start) / node.period)
+            if node.count is not None:
+                last = min(last, node.count)
+            for m in range(first, last):
+                start = node.t_start + m * node.period
+                local.append(start)
+                stack.append((node.signal, scale, offset + scale * m * node.period))
+            local.append(node.t_end)
+        else:
+            stack.extend((child, scale, offset) for child in children(node))
+
+        found.extend(scale * u + offset for u in local)
+
+    times = np.unique(np.asarray(found, dtype=float))
+    return times[(times > t0) & (times < t1)]
+
+
+def _snap(
+    signal: BaseSignal, times: np.ndarray, t0: float, t1: float, tol: float
+) -> np.ndarray:
+    """
+    Move the breakpoints onto the jumps they stand for, which can lie a few ulps away once the breakpoint of a node
+    was mapped through shifts and time scales.
+    """
+    for _ in range(_SNAP_ULPS):
+        after, before = np.nextafter(times, np.inf), _left(times)
+        late = np.abs(signal(after) - signal(times)) > tol
+        early = ~late & (np.abs(signal(before) - signal(_left(before))) > tol)
+        if not (late.any() or early.any()):
+            break
+        times = np.where(late, after, np.where(early, before, times))
+    times = np.unique(times)
+    return times[(times > t0) & (times < t1)]
+
+
+def _corners(node: Union[SeeSaw, AlternatingRamp], u0: float, u1: float) -> List[float]:
+    """
+    Peaks of a zigzag signal within [u0, u1], which lie (k + 1/2) half periods after t_start for SeeSaw and
+    (k - 1/2) half periods for AlternatingRamp.
+    """
+    hp = node.halfperiod
+    shift = 0.5 if isinstance(node, SeeSaw) else -0.5
+    lo = max(u0, node.t_start) - node.t_start
+    hi = min(u1, node.t_end) - node.t_start
+    if not lo < hi:
+        return []
+    k = np.arange(ceil(lo / hp - shift), floor(hi / hp - shift) + 1)
+    return (node.t_start + (k + shift) * hp).tolist()
+
+
+def _left(t: np.ndarray) -> np.ndarray:
+    """The largest floats below t, where a signal takes its value from the left of a jump."""
+    return np.nextafter(t, -np.inf)
+
+
+class _Slopes:
+    """Derivative of the signal for cubic tables: analytic where available, else finite differences."""
+
+    def __init__(self, signal: BaseSignal, t0: float, t1: float):
+        self.signal = signal
+        self.h = 1e-6 * max(t1 - t0, 1.0)
+        try:
+            self.derivative = signal.derivative()
+        except (NotImplementedError, ValueError):
+            self.derivative = None
+
+    def __call__(self, t: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """Slopes at t, which lie within the continuous pieces [lo, hi]."""
+        if self.derivative is not None:
+            return self.derivative(t)
+
+        # Differences of second order that stay within the piece of every point
+        f, h = self.signal, np.minimum(self.h, (hi - lo) / 4)
+        forward = (-3 * f(t) + 4 * f(t + h) - f(t + 2 * h)) / (2 * h)
+        backward = (3 * f(t) - 4 * f(t - h) + f(t - 2 * h)) / (2 * h)
+        central = (f(t + h) - f(t - h)) / (2 * h)
+        return np.where(
+            t - lo < 2 * h, forward, np.where(hi - t < 2 * h, backward, central)
+        )
+
+
+def _interpolate(fa, fb, da, db, a, b, x, cubic: bool) -> np.ndarray:
+    """Linear or cubic Hermite interpolation of the intervals [a, b] at the points x."""
+    h = b - a
+    s = (x - a) / h
+    if not cubic:
+        return fa + s * (fb - fa)
+    h00 = (1 + 2 * s) * (1 - s) ** 2
+    h10 = s * (1 - s) ** 2
+    h01 = s * s * (3 - 2 * s)
+    h11 = s * s * (s - 1)
+    return h00 * fa + h10 * h * da + h01 * fb + h11 * h * db
+
+
+def tabulate(
+    signal: BaseSignal,
+    t0: float,
+    t1: float,
+    tol: float = 1e-6,
+    kind: str = "linear",
+    min_width: Optional[float] = None,
+) -> TabulatedSignal:
+    """
+    Tabulate the signal on [t0, t1) with linear or cubic interpolation, refining every interval until the
+    interpolation error at its probe points is below tol, or until it is narrower than min_width (by default
+    1e-9 * (t1 - t0)). The maximum error of the table, measured at 15 points within every interval, is stored in
+    its error attribute and a RuntimeWarning is issued if it exceeds twice tol.
+    """
+    assert kind in ("linear", "cubic"), "the interpolation kind is linear or cubic"
+    assert np.isfinite(t0) and np.isfinite(t1) and t0 < t1, "the range must be finite"
+    assert tol > 0.0, "the tolerance must be positive"
+    min_width = 1e-9 * (t1 - t0) if min_width is None else min_width
+    cubic = kind == "cubic"
+    slopes = _Slopes(signal, t0, t1) if cubic else None
+
+    # Continuous pieces between the breakpoints, each one starts with uniformly spread knots
+    breaks = _snap(signal, _breakpoints(signal, t0, t1), t0, t1, tol)
+    edges = np.concatenate(([t0], breaks, [t1]))
+    n_init = np.maximum(
+        np.ceil(_INITIAL_KNOTS * np.diff(edges) / (t1 - t0)).astype(int), 1
+    )
+    piece = np.repeat(np.arange(edges.size - 1), n_init)
+    rank = np.arange(piece.size) - np.repeat(np.cumsum(n_init) - n_init, n_init)
+    lo, hi = edges[:-1][piece], edges[1:][piece]
+    a = lo + (hi - lo) * rank / n_init[piece]
+    b = np.where(
+        rank + 1 == n_init[piece], hi, lo + (hi - lo) * (rank + 1) / n_init[piece]
+    )
+    b_left = rank + 1 == n_init[piece]
+
+    # Values on the inner side of the pieces: from the left at their end, from the right at their start
+    fa = signal(a)
+    fb = signal(np.where(b_left, _left(b), b))
+    if cubic:
+        da = slopes(a, lo, hi)
+        db = slopes(np.where(b_left, _left(b), b), lo, hi)
+    else:
+        da = db = np.zeros_like(a)
+
+    done = []
+    while a.size:
+        x = a[:, np.newaxis] + (b - a)[:, np.newaxis] * _PROBES
+        fx = signal(x.ravel()).reshape(x.shape)
+        approx = _interpolate(
+            *(v[:, np.newaxis] for v in (fa, fb, da, db, a, b)), x, cubic
+        )
+        error = np.max(np.abs(fx - approx), axis=1)
+
+        keep = (error <= tol) | (b - a <= min_width) | ~np.isfinite(error)
+        done.append((a[keep], b[keep], fa[keep], fb[keep], da[keep], db[keep]))
+
+        # Split the other intervals at their midpoint, whose value is the middle probe
+        split = ~keep
+        m, fm = x[split, 1], fx[split, 1]
+        dm = slopes(m, lo[split], hi[split]) if cubic else np.zeros_like(m)
+        a = np.concatenate((a[split], m))
+        b = np.concatenate((m, b[split]))
+        fa = np.concatenate((fa[split], fm))
+        fb = np.concatenate((fm, fb[split]))
+        da = np.concatenate((da[split], dm))
+        db = np.concatenate((dm, db[split]))
+        lo = np.concatenate((lo[split], lo[split]))
+        hi = np.concatenate((hi[split], hi[split]))
+
+    a, b, fa, fb, da, db = (np.concatenate(v) for v in zip(*done))
+    order = np.argsort(a, kind="stable")
+    table = _table(*(v[order] for v in (a, b, fa, fb, da, db)), cubic)
+
+    # The error is measured on a finer set of points than the probes of the refinement
+    x = (
+        table.breakpoints[:-1, np.newaxis]
+        + np.diff(table.breakpoints)[:, np.newaxis] * _CHECKS
+    )
+    idx = np.repeat(np.arange(table.n_segments), _CHECKS.size)
+    deviation = np.abs(table._eval_segments(idx, x.ravel()) - signal(x.ravel()))
+    table.error = float(np.max(deviation, initial=0.0))
+    if table.error > 2.0 * tol:
+        warnings.warn(
+            f"the error of the table is {table.error:.3g}, above the tolerance {tol:.3g}",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    return table
+
+
+def _table(a, b, fa, fb, da, db, cubic: bool) -> TabulatedSignal:
+    """
+    Polynomial segments of the sorted, contiguous intervals [a, b). Every segment holds the values on its own side of
+    a jump, so a jump at a breakpoint needs no extra knot.
+    """
+    h = b - a
+    delta = (fb - fa) / h
+    if cubic:
+        c2 = (3 * delta - 2 * da - db) / h
+        c3 = (da + db - 2 * delta) / (h * h)
+        coefficients = np.column_stack((fa, da, c2, c3))
+    else:
+        coefficients = np.column_stack((fa, delta))
+    return TabulatedSignal(np.append(a, b[-1]), coefficients)
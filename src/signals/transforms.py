@@ -0,0 +1,134 @@
+"""
+Time transforms of signal expressions: delays, time scaling and periodic repetition.
+
+The transform nodes refer to the transformed expression instead of copying it, so a maneuver that is shifted or
+repeated many times is stored once. Every evaluation maps the query times and evaluates the shared expression on the
+mapped times, a repetition maps the query to its phase within the period with a modulo, so the cost of an evaluation
+does not depend on the number of repetitions.
+"""
+
+from __future__ import annotations
+import numpy as np
+from dataclasses import dataclass
+from math import floor
+from typing import Optional, Tuple, Union
+from signals.base_signal import BaseSignal, EMPTY_SUPPORT, add_slots
+
+
+def _derivative(signal: BaseSignal) -> BaseSignal:
+    from signals.calculus import derivative
+
+    return derivative(signal)
+
+
+def _integral(signal: BaseSignal) -> BaseSignal:
+    from signals.calculus import integral
+
+    return integral(signal)
+
+
+@add_slots
+@dataclass
+class Shifted(BaseSignal):
+    """The signal delayed by delay: s(t - delay)."""
+
+    signal: BaseSignal
+    delay: float = 0.0
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        return self.signal(t - self.delay)
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        lo, hi = self.signal.support
+        if lo >= hi:
+            return EMPTY_SUPPORT
+        return lo + self.delay, hi + self.delay
+
+    def _derivative(self) -> BaseSignal:
+        return Shifted(_derivative(self.signal), self.delay)
+
+    def _integral(self) -> BaseSignal:
+        return Shifted(_integral(self.signal), self.delay)
+
+
+@add_slots
+@dataclass
+class TimeScaled(BaseSignal):
+    """The signal on a stretched time axis: s(t / factor), a factor larger than one slows the signal down."""
+
+    signal: BaseSignal
+    factor: float = 1.0
+
+    def __post_init__(self):
+        assert self.factor > 0.0, "the time scale factor must be positive"
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        return self.signal(t / self.factor)
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        lo, hi = self.signal.support
+        if lo >= hi:
+            return EMPTY_SUPPORT
+        return lo * self.factor, hi * self.factor
+
+    def _derivative(self) -> BaseSignal:
+        return TimeScaled(_derivative(self.signal), self.factor) * (1.0 / self.factor)
+
+    def _integral(self) -> BaseSignal:
+        return TimeScaled(_integral(self.signal), self.factor) * self.factor
+
+
+@add_slots
+@dataclass
+class Repeated(BaseSignal):
+    """
+    The window [t_start, t_start + period) of the signal, repeated count times from t_start (forever if count is
+    None). The signal is zero before t_start and after the last repetition.
+    """
+
+    signal: BaseSignal
+    period: float = 1.0
+    count: Optional[int] = None
+    t_start: float = 0.0
+
+    def __post_init__(self):
+        assert self.period > 0.0, "the period of a repetition must be positive"
+        if self.count is not None:
+            self.count = int(self.count)
+            assert self.count >= 0, "the number of repetitions must be non-negative"
+
+    @property
+    def t_end(self) -> float:
+        return np.inf if self.count is None else self.t_start + self.count * self.period
+
+    @property
+    def support(self) -> Tuple[float, float]:
+        if self.count == 0:
+            return EMPTY_SUPPORT
+        return self.t_start, self.t_end
+
+    def __call__(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        if isinstance(t, np.ndarray):
+            return self._eval_array(t)
+
+        tau = t - self.t_start
+        if tau < 0.0 or (
+            self.count is not None and floor(tau / self.period) >= self.count
+        ):
+            return 0.0
+        return self.signal(self.t_start + tau % self.period)
+
+    def _eval_array(self, t: np.ndarray) -> np.ndarray:
+        out = np.zeros(t.shape)
+        tau = t - self.t_start
+        mask = tau >= 0.0
+        if self.count is not None:
+            mask &= np.floor(tau / self.period) < self.count
+        if mask.any():
+            out[mask] = self.signal(self.t_start + np.mod(tau[mask], self.period))
+        return out
+
+    def _derivative(self) -> BaseSignal:
+        return Repeated(_derivative(self.signal), self.period, self.count, self.t_start)
@@ -0,0 +1,197 @@
+"""
+Helpers to inspect signal expression trees.
+
+All traversals use an explicit stack, so they also work on long chains that are deeper than the recursion limit.
+"""
+
+from __future__ import annotations
+import dataclasses
+import hashlib
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from signals.base_signal import (
+    BaseSignal,
+    Const,
+    TwoSidedOperation,
+    EMPTY_SUPPORT,
+    SumOfSignals,
+    DifferenceOfSignals,
+    ProductOfSignals,
+    DivisionOfSignals,
+)
+
+
+def constant_value(node: Union[BaseSignal, float, int]) -> Optional[float]:
+    """
+    Return the value of numbers and of constants defined on the full time domain, None for anything else.
+    A zero constant is zero everywhere, whatever its window.
+    """
+    if isinstance(node, (float, int)) and not isinstance(node, bool):
+        return float(node)
+    if type(node) is Const:
+        if node.value == 0.0:
+            return 0.0
+        if node.t_start == -np.inf and node.t_end == np.inf:
+            return float(node.value)
+    return None
+
+
+def linear_terms(signal: BaseSignal) -> Tuple[float, List[Tuple[float, BaseSignal]]]:
+    """
+    Decompose a signal into const + sum(coef_i * term_i) by expanding sums, differences and products or divisions
+    with constants. The terms are the nodes of the original tree, a node that appears several times is returned
+    once with the sum of its coefficients.
+    """
+    const = 0.0
+    coefficients: Dict[int, List] = {}
+    stack = [(signal, 1.0)]
+
+    while stack:
+        node, coef = stack.pop()
+
+        value = constant_value(node)
+        if value is not None:
+            const += coef * value
+            continue
+
+        if isinstance(node, (SumOfSignals, DifferenceOfSignals)):
+            sign = 1.0 if isinstance(node, SumOfSignals) else -1.0
+            stack.append((node.rhs, sign * coef))
+            stack.append((node.lhs, coef))
+            continue
+
+        if isinstance(node, ProductOfSignals):
+            lhs, rhs = constant_value(node.lhs), constant_value(node.rhs)
+            if lhs is not None:
+                stack.append((node.rhs, coef * lhs))
+                continue
+            if rhs is not None:
+                stack.append((node.lhs, coef * rhs))
+                continue
+
+        if isinstance(node, DivisionOfSignals):
+            rhs = constant_value(node.rhs)
+            if rhs is not None and rhs != 0.0:
+                stack.append((node.lhs, coef / rhs))
+                continue
+
+        entry = coefficients.get(id(node))
+        if entry is None:
+            coefficients[id(node)] = [coef, node]
+        else:
+            entry[0] += coef
+
+    terms = [(coef, node) for coef, node in coefficients.values() if coef != 0.0]
+    return const, terms
+
+
+def support(signal: Union[BaseSignal, float, int]) -> Tuple[float, float]:
+    """
+    Support interval [lo, hi) of an expression, outside of which it evaluates to zero. Sums and differences take the
+    union of the operand supports and products take their intersection.
+    """
+    supports: Dict[int, Tuple[float, float]] = {}
+    stack = [(signal, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in supports:
+            continue
+
+        if not isinstance(node, TwoSidedOperation):
+            if isinstance(node, BaseSignal):
+                supports[id(node)] = node.support
+            else:
+                supports[id(node)] = EMPTY_SUPPORT if node == 0 else (-np.inf, np.inf)
+        elif not expanded:
+            stack.append((node, True))
+            stack.append((node.rhs, False))
+            stack.append((node.lhs, False))
+        else:
+            lhs, rhs = supports[id(node.lhs)], supports[id(node.rhs)]
+            supports[id(node)] = node._combine_support(lhs, rhs)
+
+    return supports[id(signal)]
+
+
+def balanced_tree(nodes: List[BaseSignal], op) -> BaseSignal:
+    """Combine the nodes with a binary operation into a tree of logarithmic depth."""
+    while len(nodes) > 1:
+        pairs = [op(nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+        nodes = pairs + nodes[len(pairs) * 2 :]
+    return nodes[0]
+
+
+def node_state(node: BaseSignal) -> Dict[str, Any]:
+    """Parameters that define a node: its dataclass fields, or its public attributes for other node types."""
+    if dataclasses.is_dataclass(node):
+        return {f.name: getattr(node, f.name) for f in dataclasses.fields(node)}
+    return {k: v for k, v in vars(node).items() if not k.startswith("_")}
+
+
+def _iter_signals(value: Any) -> Iterator[BaseSignal]:
+    if isinstance(value, BaseSignal):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_signals(item)
+
+
+def children(node: BaseSignal) -> List[BaseSignal]:
+    """Signals that a node refers to in its parameters."""
+    return [
+        child for value in node_state(node).values() for child in _iter_signals(value)
+    ]
+
+
+def count_nodes(signal: BaseSignal) -> int:
+    """Number of distinct nodes in an expression."""
+    seen = {id(signal)}
+    stack = [signal]
+    while stack:
+        for child in children(stack.pop()):
+            if id(child) not in seen:
+                seen.add(id(child))
+                stack.append(child)
+    return len(seen)
+
+
+def _encode(value: Any, digests: Dict[int, bytes]) -> bytes:
+    """Encode a parameter value, child signals are replaced by their digest."""
+    if isinstance(value, BaseSignal):
+        return digests[id(value)]
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        return repr((value.dtype.str, value.shape)).encode() + value.tobytes()
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(_encode(item, digests) for item in value) + b"]"
+    if value is None or isinstance(value, (bool, int, float, str, np.generic)):
+        return repr(value).encode()
+    # Objects without a value representation are identified by identity
+    return f"<{type(value).__qualname__} {id(value)}>".encode()
+
+
+def fingerprint(signal: BaseSignal) -> bytes:
+    """
+    Digest of the structure and parameters of an expression. Two expressions have the same fingerprint if they are
+    built from the same node types with the same parameters, and any change of a parameter changes the fingerprint.
+    """
+    digests: Dict[int, bytes] = {}
+    stack = [(signal, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in digests:
+            continue
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children(node))
+            continue
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{type(node).__module__}.{type(node).__qualname__}".encode())
+        for name, value in node_state(node).items():
+            h.update(name.encode() + b"=" + _encode(value, digests) + b";")
+        digests[id(node)] = h.digest()
+
+    return digests[id(signal)]
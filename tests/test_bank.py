@@ -0,0 +1,57 @@
+import pytest
+import signals
+import numpy as np
+
+
+def test_eval_many():
+    channels = [
+        signals.Doublet(t_start=1.0, ampl=2.0, block_width=0.5),
+        signals.ThreeTwoOneOne(t_start=2.0, ampl=0.5, block_width=0.3),
+        signals.CompositeSinusoid(
+            0.5, 8.0, frequencies=[0.2, 0.7, 1.1], amplitudes=[1, 2, 3]
+        ),
+        signals.StepSequence([1.0, 3.0], [1.0, -1.0]) + 0.5 * signals.Ramp(),
+        signals.Const(value=3.0),
+    ]
+    t = np.linspace(-1.0, 10.0, 1001)
+
+    out = np.empty((len(channels), t.size))
+    res = signals.eval_many(channels, t, out=out)
+
+    assert res is out
+    for row, channel in zip(res, channels):
+        assert row == pytest.approx(channel(t), abs=1e-12)
+
+
+def test_signal_bank_grouping():
+    bank = signals.SignalBank(
+        [signals.Sinusoid(freq=f) + signals.Step(t_start=f) for f in [0.1, 0.2, 0.3]]
+    )
+    assert len(bank.sines) == 3
+    assert len(bank.steps) == 3
+    assert len(bank.generic) == 0
+    assert bank([0.0, 1.0]).shape == (3, 2)
+
+
+def test_signal_bank_empty_windows():
+    channels = [
+        2 * signals.Step(t_start=5.0, t_end=3.0) + signals.Sinusoid(freq=0.0),
+        signals.Step(t_start=4.0, t_end=4.0) - signals.Step(t_start=6.0, t_end=1.0),
+    ]
+    bank = signals.SignalBank(channels)
+    for t in [np.arange(8.0), np.arange(8.0)[::-1]]:
+        for row, channel in zip(bank(t), channels):
+            assert np.array_equal(row, channel(t))
+
+    # A scalar timestamp is a single sample
+    assert bank(4.5).shape == (2, 1)
+    assert np.array_equal(bank(np.float64(4.5))[:, 0], [c(4.5) for c in channels])
+
+
+def test_signal_bank_multisine():
+    ms = signals.CompositeSinusoid(0.5, 8.0, [0.2, 0.7, 1.1], [1, 2, 3])
+    bank = signals.SignalBank([ms, 2.0 * ms])
+    assert len(bank.sines) == 6
+
+    t = np.linspace(0.0, 10.0, 101)
+    assert bank(t)[1] == pytest.approx(2.0 * ms(t), abs=1e-12)
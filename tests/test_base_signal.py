@@ -142,3 +142,51 @@ def test_implementation():
     # Custom signals must implement a _signal() method.
     with pytest.raises(TypeError):
         CustomSignal()
+
+
+def test_array_call():
+    t = np.linspace(-2.0, 12.0, 301)
+    s = signals.Step(t_start=1.0, t_end=5.0) + 2.0 * signals.Sinusoid(
+        t_start=2.0, freq=0.5
+    ) / signals.Const(value=4.0)
+
+    res = s(t)
+    assert isinstance(res, np.ndarray)
+    assert res.shape == t.shape
+
+    # The array path must match the scalar path exactly
+    assert np.array_equal(res, [s(t_i) for t_i in t.tolist()])
+
+
+def test_eval_on_expression():
+    s = signals.StepSequence(times=[1.0, 2.0, 3.0], amplitudes=[2.0, -1.0, 0.0])
+    res = s.eval_on([0.0, 1.5, 2.5, 3.5])
+    assert res == pytest.approx([0.0, 2.0, -1.0, 0.0])
+
+
+def test_slotted_nodes():
+    import copy
+    import pickle
+    from dataclasses import dataclass
+
+    step = signals.Step(t_start=1.0)
+    expr = 2.0 * step + signals.RampSinusoid(t_start=0.0, t_end=5.0)
+    for node in (step, expr, expr.lhs, signals.Const(value=1.0)):
+        assert not hasattr(node, "__dict__")
+
+    clone = pickle.loads(pickle.dumps(expr))
+    assert clone(2.0) == expr(2.0)
+    assert copy.deepcopy(step) == step
+    assert repr(step) == "Step(t_start=1.0, t_end=inf)"
+
+    # Subclasses without slots keep working, including overridden field defaults
+    @dataclass
+    class LateStep(signals.Step):
+        t_start: float = 3.0
+
+    class NegativeRamp(signals.Signal):
+        def _signal(self, t):
+            return -t
+
+    assert LateStep()(3.5) == 1.0
+    assert NegativeRamp(t_start=1.0)(3.0) == -2.0
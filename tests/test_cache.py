@@ -0,0 +1,73 @@
+import signals
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_cache_hits_and_misses():
+    cache = signals.EvaluationCache(maxsize=4)
+    sig = (signals.Step(t_start=1.0) + signals.Sinusoid(freq=0.5)).cached(cache)
+    t = np.linspace(0.0, 5.0, 101)
+
+    first = sig.eval_on(t)
+    second = sig.eval_on(t.copy())
+    assert second is first
+    assert not first.flags.writeable
+    assert np.array_equal(first, sig.signal(t))
+
+    assert sig(2.0) == sig.signal(2.0)
+    sig(2.0)
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.size) == (2, 2, 2)
+
+
+def test_cache_invalidation():
+    step = signals.Step(t_start=1.0)
+    sig = (2.0 * step).cached(frozen=False)
+    assert sig(1.5) == 2.0
+
+    # Changing a parameter of a node changes the key of the expression
+    step.t_start = 2.0
+    assert sig(1.5) == 0.0
+    assert sig.cache.hits == 0
+
+    # The key of a frozen expression is computed again by refresh()
+    frozen = (2.0 * step).cached()
+    assert frozen(2.5) == 2.0
+    assert frozen(2.5) == 2.0
+    assert frozen.cache.hits == 1
+    step.t_start = 3.0
+    frozen.refresh()
+    assert frozen(2.5) == 0.0
+    assert frozen.cache.misses == 2
+
+
+def test_cache_threads():
+    cache = signals.EvaluationCache(maxsize=8)
+    sig = sum(signals.Step(t_start=0.1 * k) for k in range(100)).cached(cache)
+    grids = [np.linspace(0.0, 10.0, 100 + k) for k in range(16)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(sig.eval_on, grids * 20))
+    for t, result in zip(grids * 20, results):
+        assert np.array_equal(result, sig.signal(t))
+
+    info = cache.cache_info()
+    assert info.hits + info.misses == len(results)
+    assert info.size == 8 and info.nbytes == sum(
+        r.nbytes for r in cache._entries.values()
+    )
+
+
+def test_cache_eviction():
+    cache = signals.EvaluationCache(maxsize=10, max_bytes=2 * 8 * 100)
+    sig = signals.Ramp().cached(cache)
+
+    for k in range(3):
+        sig.eval_on(np.linspace(0.0, k + 1.0, 100))
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.nbytes == 2 * 8 * 100
+
+    # The oldest grid was evicted
+    sig.eval_on(np.linspace(0.0, 1.0, 100))
+    assert cache.misses == 4
@@ -0,0 +1,91 @@
+import pytest
+import signals
+import numpy as np
+from signals.aerospace_signals import ThreeTwoOneOneSmoothed
+
+
+def numeric_derivative(signal, t, h=1e-6):
+    return (signal(t + h) - signal(t - h)) / (2 * h)
+
+
+def numeric_integral(signal, t):
+    values = signal(t)
+    return np.concatenate(
+        ([0.0], np.cumsum((values[1:] + values[:-1]) / 2 * np.diff(t)))
+    )
+
+
+LEAVES = [
+    signals.Step(t_start=1.0, t_end=3.0),
+    signals.Ramp(t_start=0.5, t_end=4.0),
+    signals.Parabolic(t_start=1.0),
+    signals.Exponential(t_start=0.2, t_end=3.0, alpha=-0.7),
+    signals.ExponentialRise(t_start=0.2, t_end=3.0, alpha=0.4),
+    signals.Sinusoid(t_start=0.3, t_end=4.5, ampl=2.0, freq=0.4, phi=0.3),
+    signals.CosineSmoothedStep(t_start=1.0, t_end=4.0, width=1.5),
+    signals.CompositeSinusoid(
+        0.5, 4.0, [0.0, 0.3, 0.9], [0.5, 1.0, 2.0], [0.2, 0.0, 1.0]
+    ),
+    signals.SmoothedStepSequence([1.0, 2.5, 3.0], [1.0, -1.0, 2.0], smooth_width=0.4),
+    signals.StepSequence([1.0, 2.0], [1.0, 3.0]),
+]
+
+# Samples away from the kinks and jumps of the leaves
+T = np.linspace(0.05, 4.95, 99) + 1e-3
+
+
+@pytest.mark.parametrize("signal", LEAVES, ids=lambda s: type(s).__name__)
+def test_derivative_of_leaves(signal):
+    assert signal.derivative()(T) == pytest.approx(
+        numeric_derivative(signal, T), abs=1e-5
+    )
+
+
+@pytest.mark.parametrize("signal", LEAVES, ids=lambda s: type(s).__name__)
+def test_integral_of_leaves(signal):
+    t = np.linspace(0.0, 6.0, 20001)
+    error = signal.integral()(t) - numeric_integral(signal, t)
+    assert np.abs(error).max() < 1e-3
+
+    # The integral of a piecewise signal is continuous, its derivative is the signal
+    assert signal.integral().derivative()(T) == pytest.approx(signal(T), abs=1e-9)
+
+
+def test_integral_of_slow_exponential():
+    # (exp(alpha * tau) - 1) / alpha keeps its digits for small alpha
+    for alpha in [1e-9, -1e-12, 1e-3]:
+        integral = signals.Exponential(t_start=1.0, t_end=4.0, alpha=alpha).integral()
+        tau = np.clip(T - 1.0, 0.0, 3.0)
+        assert integral(T) == pytest.approx(np.expm1(alpha * tau) / alpha, rel=1e-14)
+
+
+def test_product_and_quotient_rules():
+    s = signals.Sinusoid(freq=0.3)
+    e = signals.Exponential(alpha=0.2)
+    x = 3.0 * s * e + s / (e + 1.0) - 2.0 * signals.Ramp()
+    t = T[5:]
+
+    assert x.derivative()(t) == pytest.approx(numeric_derivative(x, t), abs=1e-5)
+    assert x.derivative(2)(t) == pytest.approx(
+        numeric_derivative(x.derivative(), t), abs=1e-5
+    )
+
+
+def test_eval_with_derivatives():
+    x = ThreeTwoOneOneSmoothed(t_start=1.0, smooth_width=0.3) + signals.Sinusoid()
+    out = x.eval_with_derivatives(T, order=2)
+
+    assert out.shape == (3, T.size)
+    assert out[0] == pytest.approx(x(T), abs=1e-12)
+    assert out[1] == pytest.approx(x.derivative()(T), abs=1e-12)
+    assert out[2] == pytest.approx(x.derivative(2)(T), abs=1e-12)
+    assert x.eval_with_derivatives(1.2, order=1).shape == (2,)
+
+
+def test_unsupported_integrals():
+    with pytest.raises(ValueError):
+        (signals.Step(t_start=1.0) + 1.0).integral()
+    with pytest.raises(ValueError):
+        signals.Ramp(t_start=-np.inf).integral()
+    with pytest.raises(NotImplementedError):
+        (signals.Ramp() * signals.Sinusoid()).integral()
@@ -0,0 +1,44 @@
+import pytest
+import signals
+import numpy as np
+
+
+def example_expression():
+    s = signals.Sinusoid(t_start=2.0)
+    e = signals.Exponential(t_start=2.0, alpha=0.1)
+    r = signals.Ramp()
+    k = signals.Step(t_start=5.0, t_end=10.0)
+    return k + (s * 2 * e + 3 * r - 4 * s) / (2 * e + 1.0)
+
+
+def test_compiled_matches_tree():
+    x = example_expression()
+    c = x.compile()
+    t = np.linspace(-1.0, 12.0, 501)
+
+    assert c(t) == pytest.approx(x(t), rel=1e-12, abs=1e-12)
+    for t_i in [-1.0, 2.0, 4.0, 5.0, 9.99, 10.0, 11.5]:
+        assert c(t_i) == pytest.approx(x(t_i), rel=1e-12, abs=1e-12)
+
+    # The compiled signal composes with the regular arithmetic
+    assert (c + 1.0)(4.0) == pytest.approx(x(4.0) + 1.0)
+
+
+def test_constant_folding():
+    c = (2 * 3 * signals.Step(t_start=1.0) - signals.Const(value=0.0)).compile()
+    assert c(2.0) == pytest.approx(6.0)
+
+    # A single scaled step remains after folding
+    assert c.source.count("if") == 1
+
+
+def test_deep_sum_chain():
+    n = 3000
+    signal = signals.Const(0.0)
+    for i in range(n):
+        signal += 1.0 * signals.Step(t_start=float(i))
+
+    # The tree is deeper than the recursion limit, the compiled form is flat
+    c = signal.compile()
+    assert c(n + 0.5) == pytest.approx(n)
+    assert c(np.array([-1.0, 10.5])) == pytest.approx([0.0, 11.0])
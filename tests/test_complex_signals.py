@@ -0,0 +1,71 @@
+import pytest
+import signals
+import numpy as np
+
+
+def test_seesaw():
+    s = signals.SeeSaw(t_start=0.0, t_end=10.0, ampl=2.0, freq=0.5)
+
+    # Zero at the start, peaks of +-ampl every half period, linear in between
+    t = [0.0, 0.25, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 10.0]
+    expected = [0.0, 1.0, 2.0, 0.0, -2.0, 0.0, 2.0, 0.0, 0.0]
+    assert [s(t_i) for t_i in t] == pytest.approx(expected, abs=1e-12)
+    assert s.eval_on(t) == pytest.approx(expected, abs=1e-12)
+
+
+def test_seesaw_is_shifted_with_t_start():
+    s0 = signals.SeeSaw(t_start=0.0, t_end=np.inf, ampl=1.5, freq=1.3)
+    s1 = signals.SeeSaw(t_start=2.0, t_end=np.inf, ampl=1.5, freq=1.3)
+    tau = np.linspace(0.0, 20.0, 1001)
+    assert s1(tau + 2.0) == pytest.approx(s0(tau), abs=1e-12)
+
+
+def test_alternating_ramp():
+    s = signals.AlternatingRamp(t_start=0.0, t_end=4.0, ampl_max=4.0, freq=0.5)
+
+    # Peaks at (k - 1/2) half periods with magnitude rate * t and alternating sign
+    t = [0.0, 0.25, 0.5, 1.0, 1.5, 2.5, 3.5, 4.0]
+    expected = [0.0, 0.25, 0.5, -0.5, -1.5, 2.5, -3.5, 0.0]
+    assert [s(t_i) for t_i in t] == pytest.approx(expected, abs=1e-12)
+    assert s.eval_on(t) == pytest.approx(expected, abs=1e-12)
+
+
+def test_unbounded_window():
+    s = signals.SeeSaw(t_start=0.0, t_end=np.inf, freq=1000.0)
+    assert s(1e6 + 0.25e-3) == pytest.approx(1.0)
+    assert signals.AlternatingRamp(t_start=0.0, t_end=np.inf)(10.0) == 0.0
+
+
+def test_multisine_matches_sum_of_sinusoids():
+    f = np.linspace(0.1, 5.0, 20)
+    a = np.linspace(1.0, 0.1, 20)
+    ms = signals.CompositeSinusoid(0.5, 8.0, frequencies=f, amplitudes=a)
+    assert isinstance(ms, signals.MultiSine)
+
+    chain = 0
+    for f_i, a_i in zip(f, a):
+        chain = chain + signals.Sinusoid(t_start=0.5, t_end=8.0, ampl=a_i, freq=f_i)
+
+    t = np.linspace(0.0, 10.0, 1001)
+    assert np.array_equal(ms(t), chain(t))
+    assert [ms(t_i) for t_i in t[::50]] == pytest.approx(chain(t[::50]), abs=1e-12)
+
+
+@pytest.mark.parametrize("method", ["fft", "recurrence", "auto"])
+def test_multisine_eval_grid(method):
+    # Frequencies on the bins of a grid of 2000 samples over 20 seconds
+    f = np.arange(1, 41) / 10.0
+    ms = signals.CompositeSinusoid(1.0, 15.0, f, np.ones(40), schroeder=True)
+
+    n, dt, t0 = 2000, 0.01, -1.0
+    t = t0 + np.arange(n) * dt
+    assert ms.eval_grid(n, dt, t0, method=method) == pytest.approx(ms(t), abs=1e-9)
+
+
+def test_schroeder_phases_lower_peak_factor():
+    f = np.arange(1, 101) / 10.0
+    t = np.arange(10_000) * 1e-3
+
+    zero = signals.CompositeSinusoid(0.0, np.inf, f, np.ones(100))
+    schroeder = signals.CompositeSinusoid(0.0, np.inf, f, np.ones(100), schroeder=True)
+    assert np.abs(schroeder.eval_grid(t.size, 1e-3)).max() < 0.2 * np.abs(zero(t)).max()
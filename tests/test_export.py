@@ -0,0 +1,51 @@
+import tracemalloc
+import pytest
+import signals
+import numpy as np
+
+
+def reference():
+    return signals.Doublet(t_start=1.0, ampl=2.0, block_width=0.5) + signals.SeeSaw(
+        t_start=0.5, ampl=0.3, freq=0.7
+    )
+
+
+def test_eval_into():
+    sig = reference()
+    t = np.linspace(-1.0, 5.0, 1001)
+
+    out = np.empty_like(t)
+    assert sig.eval_into(t, out, chunk=64) is out
+    assert np.array_equal(out, sig.eval_on(t))
+
+    out = np.empty((7, 11))
+    sig.eval_into(t[:77].reshape(7, 11), out, chunk=10)
+    assert np.array_equal(out.ravel(), sig.eval_on(t[:77]))
+
+
+def test_eval_grid_into():
+    sig = reference()
+    out = np.empty(1000)
+    signals.eval_grid_into(sig, out, dt=0.01, t0=-1.0, chunk=300)
+
+    t = -1.0 + np.arange(1000) * 0.01
+    assert out == pytest.approx(sig.eval_on(t), abs=1e-12)
+
+
+def test_save_npy(tmp_path):
+    sig = reference()
+    path = tmp_path / "reference.npy"
+    n = 200_000
+
+    tracemalloc.start()
+    signals.save_npy(sig, path, n=n, dt=1e-4, chunk=1000)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # The peak memory is set by the block size, not by the length of the file
+    assert peak < n * 8 / 4
+
+    data = np.load(path, mmap_mode="r")
+    assert data.shape == (n,)
+    t = np.arange(n) * 1e-4
+    assert np.allclose(data, sig.eval_on(t), atol=1e-12)
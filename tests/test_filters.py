@@ -0,0 +1,212 @@
+import pytest
+import signals
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from signals import from_dict, to_dict
+from signals.filters import CHECKPOINT_INTERVAL, has_state
+
+DT = 1e-3
+T = np.arange(0.0, 12.0, DT)
+
+
+def reference():
+    return (
+        5 * signals.Step(t_start=1.0, t_end=6.0)
+        + signals.Sinusoid(freq=0.7)
+        - 2 * signals.Ramp(t_start=8.0, t_end=9.0)
+    )
+
+
+def loop_filter(b, a, u, steady_state=False):
+    """Direct form of the difference equation, started from rest or at the steady state of u[0]."""
+    b, a = np.asarray(b) / a[0], np.asarray(a) / a[0]
+    u0 = u[0] if steady_state else 0.0
+    us, ys = [u0] * len(b), [u0 * np.sum(b) / np.sum(a)] * len(a)
+    out = np.empty_like(u)
+    for k, x in enumerate(u):
+        us = [x] + us[:-1]
+        y = np.dot(b, us) - np.dot(a[1:], ys[: len(a) - 1])
+        ys = [y] + ys[:-1]
+        out[k] = y
+    return out
+
+
+def test_saturate():
+    signal = reference().saturate(-0.5, 2.0)
+    assert np.array_equal(signal(T), np.clip(reference()(T), -0.5, 2.0))
+    assert signal(3.0) == 2.0
+    assert signals.Step(t_start=1.0).saturate(upper=0.5).support == (1.0, np.inf)
+
+
+def test_rate_limit():
+    u = reference()(T)
+    limited = reference().rate_limit(rate=4.0, dt=DT)
+
+    expected, y = np.empty_like(u), 0.0
+    for k, x in enumerate(u):
+        y = y + np.clip(x - y, -4.0 * DT, 4.0 * DT)
+        expected[k] = y
+
+    assert limited(T) == pytest.approx(expected, abs=1e-12)
+    assert np.max(np.abs(np.diff(limited(T)))) <= 4.0 * DT * (1 + 1e-9)
+
+
+@pytest.mark.parametrize(
+    "make, b, a",
+    [
+        (
+            lambda s: s.lowpass(tau=0.2, dt=DT),
+            [1 - np.exp(-DT / 0.2)],
+            [1, -np.exp(-DT / 0.2)],
+        ),
+        (
+            lambda s: s.lfilter([0.2, 0.3], [1.0, -0.9, 0.4], dt=DT),
+            [0.2, 0.3],
+            [1.0, -0.9, 0.4],
+        ),
+        (lambda s: s.lfilter([2.0, 0.6], [2.0, -1.0], dt=DT), [2.0, 0.6], [2.0, -1.0]),
+    ],
+)
+def test_linear_filters(make, b, a):
+    u = reference()(T)
+    assert make(reference())(T) == pytest.approx(loop_filter(b, a, u), abs=1e-10)
+
+
+def test_initial_state():
+    # The operators start from rest by default, so a step at t_start is limited and filtered
+    step = signals.Step()
+    assert (3.0 * step).rate_limit(rate=1.0, dt=0.01)(0.5) == pytest.approx(0.51)
+    assert step.lowpass(tau=0.5, dt=0.01)(0.0) == pytest.approx(1.0 - np.exp(-0.02))
+    assert step.lowpass2(freq=2.0, dt=0.01)(0.0) < 0.1
+
+    # At steady state they pass a constant input through
+    assert (3.0 * step).rate_limit(rate=1.0, dt=0.01, steady_state=True)(0.5) == 3.0
+    assert step.lowpass(tau=0.5, dt=0.01, steady_state=True)(T) == pytest.approx(1.0)
+    assert step.lowpass2(freq=2.0, dt=0.01, steady_state=True)(T) == pytest.approx(1.0)
+
+    u = (reference() + 1.0)(T)
+    b, a = [0.2, 0.3], [1.0, -0.9, 0.4]
+    for steady_state in (False, True):
+        filtered = (reference() + 1.0).lfilter(b, a, dt=DT, steady_state=steady_state)
+        assert filtered(T) == pytest.approx(
+            loop_filter(b, a, u, steady_state), abs=1e-10
+        )
+        assert from_dict(to_dict(filtered)).steady_state == steady_state
+
+
+def test_gain():
+    # Filters of order zero are a pure gain of the input samples
+    u = reference().eval_on(signals.UniformGrid(0.0, DT, T.size))
+    assert np.array_equal(reference().lfilter([2.0], [1.0], dt=DT)(T), 2.0 * u)
+    assert reference().lfilter([3.0], [4.0], dt=DT)(2.5) == 0.75 * reference()(2.5)
+
+
+def test_lowpass2():
+    step = signals.Step(t_start=1.0)
+    filtered = step.lowpass2(freq=2.0, zeta=0.5, dt=DT)
+    y = filtered(T)
+
+    # Unit gain at steady state and the overshoot of a damping ratio of 0.5
+    assert y[-1] == pytest.approx(1.0, abs=1e-6)
+    assert np.max(y) == pytest.approx(
+        1.0 + np.exp(-np.pi * 0.5 / np.sqrt(0.75)), abs=1e-3
+    )
+    assert step.lowpass2(freq=2.0, zeta=1.0, dt=DT)(T) == pytest.approx(
+        step.lowpass2(freq=2.0, zeta=1.0 + 1e-9, dt=DT)(T), abs=1e-6
+    )
+
+
+def test_scalar_array_and_grid():
+    filtered = (reference().lowpass(tau=0.1, dt=DT) + 1.0).saturate(-1.0, 4.5)
+    expected = filtered(T)
+
+    # Every path gives the same samples, the outputs are held between the samples
+    fresh = (reference().lowpass(tau=0.1, dt=DT) + 1.0).saturate(-1.0, 4.5)
+    assert [fresh(t) for t in T[:3000].tolist()] == pytest.approx(
+        expected[:3000], abs=1e-12
+    )
+    assert filtered.eval_on(signals.UniformGrid(0.0, DT, T.size)) == pytest.approx(
+        expected, abs=1e-12
+    )
+    assert filtered(T + 0.4 * DT) == pytest.approx(expected, abs=1e-12)
+    assert reference().lowpass(tau=0.1, dt=DT)(-0.5) == 0.0
+    assert filtered(-0.5) == 1.0
+
+
+def test_lightly_damped_filter():
+    # Every path rounds differently, the block engine keeps them close for poles near one
+    step = signals.Step(t_start=1.0)
+    expected = step.lowpass2(freq=2.0, zeta=0.3, dt=DT)(T)
+    scalar = step.lowpass2(freq=2.0, zeta=0.3, dt=DT)
+    assert [scalar(t) for t in T[:3000].tolist()] == pytest.approx(
+        expected[:3000], rel=0.0, abs=1e-12
+    )
+    chunked = step.lowpass2(freq=2.0, zeta=0.3, dt=DT)
+    assert np.concatenate([chunked(t) for t in np.array_split(T, 7)]) == pytest.approx(
+        expected, rel=0.0, abs=1e-12
+    )
+
+
+def test_stream():
+    filtered = reference().rate_limit(rate=4.0, dt=DT) * 2.0
+    expected = filtered(T)
+
+    stream = (reference().rate_limit(rate=4.0, dt=DT) * 2.0).stream(dt=DT)
+    samples = [next(stream) for _ in range(T.size)]
+    assert samples == pytest.approx(expected, abs=1e-12)
+
+    chunks = (reference().rate_limit(rate=4.0, dt=DT) * 2.0).stream(dt=DT, chunk=1000)
+    assert np.concatenate([next(chunks).copy() for _ in range(12)]) == pytest.approx(
+        expected, abs=1e-12
+    )
+
+
+def test_checkpoint_resume():
+    filtered = reference().lfilter([0.2, 0.3], [1.0, -0.9, 0.4], dt=DT)
+    expected = filtered(T)
+
+    # A fresh filter continues from a checkpoint without running the samples before it
+    first = reference().lfilter([0.2, 0.3], [1.0, -0.9, 0.4], dt=DT)
+    first(T[:5000])
+    checkpoint = first.checkpoint()
+    assert checkpoint.k == 5000
+
+    second = reference().lfilter([0.2, 0.3], [1.0, -0.9, 0.4], dt=DT)
+    second.resume(checkpoint)
+    assert second(T[5000:]) == pytest.approx(expected[5000:], abs=1e-12)
+    assert len(second._checkpoints) == 1 + (T.size - 5000) // CHECKPOINT_INTERVAL
+
+    # Going back in time restarts from an earlier checkpoint
+    assert filtered(T[::-1]) == pytest.approx(expected[::-1], abs=1e-12)
+
+
+def test_concurrent_evaluation():
+    # One filter shared by threads that query it at different times
+    filtered = reference().lfilter([0.2, 0.3], [1.0, -0.9, 0.4], dt=DT)
+    expected = reference().lfilter([0.2, 0.3], [1.0, -0.9, 0.4], dt=DT)(T)
+    rng = np.random.default_rng(0)
+    queries = [np.sort(rng.choice(T, 2000)) for _ in range(64)]
+
+    def evaluate(i):
+        t = queries[i]
+        if i % 4 == 0:
+            return np.array([filtered(x) for x in t[:200].tolist()]), t[:200]
+        if i % 4 == 1:
+            filtered.reset()
+        return filtered(t), t
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for y, t in pool.map(evaluate, range(len(queries))):
+            assert y == pytest.approx(expected[np.rint(t / DT).astype(int)], abs=1e-12)
+
+
+def test_parallel_and_serialization():
+    filtered = reference().rate_limit(rate=4.0, dt=DT).lowpass(tau=0.05, dt=DT)
+    expected = filtered(T)
+
+    assert has_state(filtered) and not has_state(reference().saturate(0.0, 1.0))
+    assert np.array_equal(filtered.eval_on(T, workers=4), expected)
+
+    loaded = from_dict(to_dict(filtered))
+    assert type(loaded) is signals.FirstOrderLowpass
+    assert np.array_equal(loaded(T), expected)
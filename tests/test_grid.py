@@ -0,0 +1,81 @@
+import pytest
+import signals
+import numpy as np
+from signals.grid import UniformGrid, eval_on_grid
+from signals.parallel import parallel_eval
+
+
+def test_grid_times():
+    for t0, t1, dt in [(0.0, 1.0, 0.1), (-2.5, 7.3, 0.013), (1e3, 1e3 + 1.0, 1e-4)]:
+        grid = UniformGrid.arange(t0, t1, dt)
+        assert np.array_equal(grid.times(), t0 + np.arange(grid.n) * dt)
+        assert grid.n == np.arange(t0, t1, dt).size
+
+    grid = UniformGrid(0.5, 0.1, 100)
+    block = grid.block(30, 70)
+    assert np.array_equal(block.times(), grid.times()[30:70])
+    assert np.array_equal(np.asarray(block), block.times())
+
+
+def test_grid_index():
+    grid = UniformGrid(-1.0, 0.01, 500, offset=7)
+    t = grid.times()
+    queries = np.concatenate([t, t + 1e-12, t - 1e-12, [-np.inf, np.inf, -5.0, 9.0]])
+
+    expected = np.searchsorted(t, queries, side="left")
+    assert np.array_equal(grid.indices(queries), expected)
+    assert [grid.index(q) for q in queries] == expected.tolist()
+
+    lo, hi = grid.window(0.3, 0.6)
+    assert np.array_equal(np.flatnonzero((0.3 <= t) & (t < 0.6)), np.arange(lo, hi))
+
+
+def reference():
+    sequence = signals.RandomizedCosineStepSequence(
+        t_max=30.0, ampl_max=1.0, block_width=1.0, smooth_width=0.3, rng=3
+    )
+    ramp = signals.Ramp(t_start=1.0, t_end=8.0)
+    return (
+        signals.Doublet(t_start=0.5, ampl=1.5, block_width=0.7)
+        + 2.0 * sequence
+        + ramp * ramp
+        - signals.Parabolic(t_start=0.013)
+        + signals.Const(value=1.0, t_start=3.0, t_end=4.0)
+    )
+
+
+def periodic():
+    return (
+        signals.Sinusoid(t_start=0.3, t_end=25.0, ampl=2.0, freq=1.7, phi=0.4)
+        + signals.Exponential(t_start=-1.0, alpha=-0.3)
+        + signals.Exponential(t_start=2.0, t_end=12.0, alpha=0.2)
+        + signals.CompositeSinusoid(1.0, 20.0, [0.3, 1.1], [1.0, 0.5])
+        + signals.SeeSaw(t_start=0.5, ampl=1.0, freq=0.2) / 2
+    )
+
+
+def test_eval_on_grid():
+    grid = UniformGrid(-2.0, 1e-3, 35_000)
+    t = grid.times()
+
+    # Windows and piecewise segments are located exactly
+    assert np.array_equal(reference().eval_on(grid), reference()(t))
+
+    # Recurrences stay within the documented tolerance
+    assert periodic().eval_on(grid) == pytest.approx(periodic()(t), rel=0, abs=1e-11)
+
+
+def test_grid_blocks():
+    signal = reference() + periodic()
+    grid = UniformGrid(-1.0, 0.003, 20_000)
+    full = eval_on_grid(signal, grid)
+
+    # The recurrences restart at the same time-steps whichever way the grid is split
+    out = np.empty(grid.n)
+    signals.eval_grid_into(signal, out, dt=grid.dt, t0=grid.t0, chunk=3001)
+    assert np.array_equal(out, full)
+    assert np.array_equal(signal.eval_on(grid, workers=3), full)
+    assert np.array_equal(parallel_eval(signal, grid, workers=4, chunk=777), full)
+
+    stream = signal.stream(dt=grid.dt, t0=grid.t0, chunk=2000)
+    assert next(stream) == pytest.approx(full[:2000], abs=1e-11)
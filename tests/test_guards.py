@@ -0,0 +1,110 @@
+import math
+import warnings
+import pytest
+import numpy as np
+import signals
+from signals import errstate, from_dict, load_signals, save_signals, to_dict
+from signals.guards import EXP_LIMIT
+
+T = np.linspace(0.0, 12.0, 1201)
+
+
+def example():
+    # The expression of examples/example_usage.py, its denominator is zero before t = 2
+    s = signals.Sinusoid(t_start=2.0)
+    e = signals.Exponential(t_start=2.0, alpha=0.1)
+    r = signals.Ramp()
+    k = signals.Step(t_start=5.0, t_end=10.0)
+    return k + (s * 2 * e + 3 * r - 4 * s) / (2 * e)
+
+
+def test_division_fill_value():
+    x = example()
+    assert math.isnan(x(1.0))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        y = x(T)
+    assert np.isnan(y[T < 2.0]).all() and np.isfinite(y[T >= 2.0]).all()
+
+    with errstate(fill_value=0.0) as report:
+        assert x(1.0) == 0.0
+        assert np.array_equal(x(T), np.where(T < 2.0, 0.0, y))
+    assert report.zero_division == 1 + np.count_nonzero(T < 2.0)
+    assert report.overflow == 0 and not report.clean
+
+    # The fill value of a node takes precedence over the one of the block
+    quotient = signals.Step(t_start=1.0).divide(signals.Ramp(t_start=3.0), 5.0)
+    with errstate(fill_value=0.0):
+        assert quotient(2.0) == 5.0
+        assert quotient(np.array([2.0, 4.0])) == pytest.approx([5.0, 1.0])
+
+
+def test_exponential_overflow():
+    signal = signals.Exponential(t_start=1.0, alpha=100.0)
+    t = np.array([0.0, 2.0, 10.0, 20.0])
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        with errstate() as report:
+            assert signal(20.0) == np.exp(EXP_LIMIT)
+            assert signal(t) == pytest.approx(
+                [0.0, math.exp(100.0), *[math.exp(EXP_LIMIT)] * 2]
+            )
+    assert report.overflow == 3
+
+    with errstate(exp_limit=50.0) as report:
+        assert signal(2.0) == pytest.approx(math.exp(50.0))
+    assert report.overflow == 1
+
+    # Scalar queries give the same bits as the array pass
+    slow = signals.Exponential(alpha=0.37)
+    t = np.random.default_rng(0).uniform(0.0, 100.0, 5000)
+    scalar = [slow(x) for x in t.tolist()]
+    assert type(scalar[0]) is np.float64
+    assert np.array_equal(scalar, slow(t))
+
+
+def test_grid_compiled_and_simplified():
+    x = example() + signals.Exponential(alpha=80.0)
+    grid = signals.UniformGrid(0.0, 0.01, T.size)
+
+    with errstate(fill_value=-1.0) as report:
+        expected = x(T)
+        assert np.isfinite(expected).all()
+        assert x.eval_on(grid) == pytest.approx(expected, rel=1e-11)
+        assert x.compile()(T) == pytest.approx(expected, rel=1e-12)
+        assert [x.compile()(t) for t in T[::50].tolist()] == pytest.approx(
+            expected[::50], rel=1e-12
+        )
+        assert x.simplify()(T) == pytest.approx(expected, rel=1e-12)
+    assert report.zero_division >= 4 * np.count_nonzero(T < 2.0)
+
+    # Grids that stay below the limit keep the recurrence
+    assert signals.Exponential(alpha=0.5).eval_on(grid) == pytest.approx(
+        np.exp(0.5 * T), rel=1e-11
+    )
+
+
+def test_nested_and_parallel():
+    x = example()
+    t = np.linspace(0.0, 12.0, 300000)
+
+    with errstate(fill_value=0.0) as outer:
+        with errstate() as inner:
+            y = x.eval_on(t, workers=4)
+        x(1.0)
+    assert np.array_equal(y, np.nan_to_num(x(t)))
+    assert inner.zero_division == np.count_nonzero(t < 2.0)
+    assert outer.zero_division == inner.zero_division + 1
+
+
+def test_serialization(tmp_path):
+    quotient = signals.Step(t_start=5.0).divide(signals.Ramp(), 2.0)
+    assert from_dict(to_dict(quotient)) == quotient
+    assert from_dict(to_dict(example()))(T) == pytest.approx(example()(T), nan_ok=True)
+
+    save_signals(tmp_path / "signals.npz", [quotient, example()])
+    loaded, x = load_signals(tmp_path / "signals.npz")
+    assert loaded.fill_value == 2.0 and loaded(0.0) == 2.0
+    assert x.rhs.fill_value is None
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+import signals
+
+# Modules that are only imported when one of their names is used
+LAZY = ["signals.sequences", "signals.serialization", "signals.stochastic_signals"]
+
+
+def _run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+
+
+def test_lazy_import():
+    loaded = _run(
+        "import sys, signals\n"
+        "signals.Step(t_start=1.0)\n"
+        "print(' '.join(m for m in sys.modules if m.startswith('signals')))"
+    ).split()
+    assert "signals.simple_signals" in loaded
+    assert not set(LAZY) & set(loaded)
+
+    # All public names resolve and are listed
+    for name in signals.__all__:
+        assert getattr(signals, name) is not None
+    assert set(signals.__all__) <= set(dir(signals))
+
+
+def test_import_time():
+    # Cold start of the package itself, without the numpy import that any signal needs
+    elapsed = float(
+        _run(
+            "import numpy, time\n"
+            "t = time.perf_counter()\n"
+            "import signals\n"
+            "signals.Step\n"
+            "print(time.perf_counter() - t)"
+        )
+    )
+    assert elapsed < 0.5
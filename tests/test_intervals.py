@@ -0,0 +1,44 @@
+import pytest
+import signals
+import numpy as np
+from signals.base_signal import EMPTY_SUPPORT
+from signals.intervals import IntervalIndex
+
+
+def test_support():
+    step = signals.Step(t_start=1.0, t_end=3.0)
+    sine = signals.Sinusoid(t_start=2.0, t_end=5.0)
+
+    assert step.support == (1.0, 3.0)
+    assert (step + sine).support == (1.0, 5.0)
+    assert (step - 2 * sine).support == (1.0, 5.0)
+    assert (step * sine).support == (2.0, 3.0)
+    assert (step * signals.Step(t_start=4.0)).support == EMPTY_SUPPORT
+    assert (step / 2.0).support == (1.0, 3.0)
+    assert (step / sine).support == (-np.inf, np.inf)
+    assert signals.Const(value=0.0).support == EMPTY_SUPPORT
+    assert signals.StepSequence([1.0, 2.0], [1.0, 0.0]).support == (1.0, np.inf)
+
+
+def test_interval_index():
+    starts = np.random.uniform(0.0, 100.0, size=300)
+    ends = starts + np.random.uniform(0.0, 10.0, size=300)
+    index = IntervalIndex(starts, ends)
+
+    for t in np.linspace(-5.0, 115.0, 97):
+        expected = np.flatnonzero((starts <= t) & (t < ends))
+        assert sorted(index.stab(t)) == expected.tolist()
+
+
+def test_indexed_signal():
+    campaign = 0.5
+    for i in range(40):
+        campaign += signals.Doublet(t_start=10.0 * i, ampl=1.0 + i, block_width=1.0)
+        campaign += signals.ThreeTwoOneOne(t_start=10.0 * i + 3.0, ampl=0.5)
+    indexed = campaign.indexed()
+
+    t = np.linspace(-10.0, 420.0, 4001)
+    assert indexed(t) == pytest.approx(campaign(t))
+    assert indexed(t[::-1]) == pytest.approx(campaign(t[::-1]))
+    for t_i in [-1.0, 0.0, 1.5, 5.0, 123.4, 399.0]:
+        assert indexed(t_i) == pytest.approx(campaign(t_i))
@@ -0,0 +1,29 @@
+import signals
+import numpy as np
+from signals.parallel import parallel_eval
+
+
+def test_parallel_eval():
+    sig = signals.CompositeSinusoid(
+        0.5, 20.0, frequencies=np.linspace(0.1, 5.0, 50), amplitudes=np.ones(50)
+    ) + signals.StepSequence([1.0, 3.0, 7.0], [1.0, -2.0, 0.5])
+    t = np.linspace(-1.0, 25.0, 10_001)
+
+    serial = sig.eval_on(t)
+    assert np.array_equal(sig.eval_on(t, workers=4), serial)
+
+    out = np.empty((101, 99))
+    parallel_eval(sig, t[:9999].reshape(101, 99), out=out, workers=3, chunk=500)
+    assert np.array_equal(out.ravel(), serial[:9999])
+
+
+def test_parallel_eval_many():
+    channels = [
+        signals.Sinusoid(freq=0.1 * k) + k * signals.Step(t_start=0.5 * k)
+        for k in range(10)
+    ] + [signals.SeeSaw(ampl=1.0, freq=0.3)]
+    t = np.linspace(0.0, 10.0, 2001)
+
+    serial = signals.eval_many(channels, t)
+    assert np.array_equal(signals.eval_many(channels, t, workers=4), serial)
+    assert np.array_equal(signals.eval_many(channels, t, workers=100), serial)
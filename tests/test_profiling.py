@@ -0,0 +1,60 @@
+import signals
+import numpy as np
+from signals.base_signal import Signal, SumOfSignals
+from signals.profiling import profile
+
+
+def test_profile_counts():
+    step = signals.Step(t_start=1.0)
+    ramp = signals.Ramp(t_start=2.0)
+    product = ramp * 0.5
+    signal = step + product
+    t = np.linspace(0.0, 5.0, 101)
+
+    with profile() as prof:
+        signal.eval_on(t)
+        signal(3.0)
+
+    root = prof.stats(signal)
+    assert root.calls == 2 and root.samples == 102
+    assert prof.stats(step).calls == 2
+    assert prof.stats(product.rhs).samples == 102
+
+    # Self times add up to the cumulative time of the root
+    total = sum(
+        prof.stats(n).self_time for n in (signal, step, product, ramp, product.rhs)
+    )
+    assert abs(total - root.cumulative) < 1e-9
+    assert root.self_time <= root.cumulative
+
+    assert prof.hotspots(2)[0].self_time >= prof.hotspots(2)[1].self_time
+    tree = prof.tree(signal)
+    assert [c["node"] for c in tree["children"]] == [step, product]
+
+    report = prof.report(signal, top=3)
+    assert report.splitlines()[0].startswith("SumOfSignals: calls=2")
+    assert "Top 3 nodes by self time:" in report
+
+
+def test_profile_restores_methods():
+    call = SumOfSignals.__call__
+    with profile():
+        assert SumOfSignals.__call__ is not call
+    assert SumOfSignals.__call__ is call
+    assert Signal.__call__ is Signal.__dict__["__call__"]
+
+
+def test_profile_threads():
+    signal = signals.Sinusoid(freq=0.5) + signals.Step(t_start=1.0)
+    t = np.linspace(0.0, 10.0, 4000)
+    with profile() as prof:
+        signal.eval_on(t, workers=4)
+    assert prof.stats(signal).samples == t.size
+
+
+def test_profile_grid():
+    step = signals.Step(t_start=1.0)
+    signal = step * signals.Sinusoid(freq=0.5)
+    with profile() as prof:
+        signal.eval_on(signals.UniformGrid(0.0, 0.01, 500))
+    assert prof.stats(step).samples == 500
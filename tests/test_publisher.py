@@ -0,0 +1,206 @@
+import asyncio
+import numpy as np
+import signals
+from concurrent.futures import Executor, Future
+from signals import FakeClock, ReferencePublisher
+
+
+class InlineExecutor(Executor):
+    """Runs every call when it is submitted, so a FakeClock test does not depend on thread scheduling."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, fn, *args):
+        self.calls += 1
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class HeldExecutor(InlineExecutor):
+    """Runs the submitted calls only when they are released."""
+
+    def __init__(self):
+        super().__init__()
+        self.held = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.held.append((future, fn, args))
+        return future
+
+    def release(self):
+        for future, fn, args in self.held:
+            future.set_result(fn(*args))
+        self.held = []
+
+
+def reference():
+    return 5 * signals.Step(t_start=0.05, t_end=0.5) + signals.Sinusoid(freq=3.0)
+
+
+async def collect(subscription, n):
+    return [await subscription.get() for _ in range(n)]
+
+
+def test_publish_rates():
+    async def main():
+        clock = FakeClock()
+        signal = reference()
+        publisher = ReferencePublisher(
+            signal, t0=10.0, chunk_duration=0.1, clock=clock, executor=InlineExecutor()
+        )
+        async with publisher:
+            slow, fast = publisher.subscribe(rate=50.0), publisher.subscribe(
+                rate=1000.0
+            )
+            tasks = [
+                asyncio.create_task(collect(slow, 50)),
+                asyncio.create_task(collect(fast, 1000)),
+            ]
+            for _ in range(100):
+                await clock.advance(0.01)
+            samples = [task.result() for task in tasks]
+
+        for sub, rate, got in zip((slow, fast), (50.0, 1000.0), samples):
+            t, values = np.array(got).T
+            expected_t = 10.0 + np.arange(t.size) / rate
+            assert np.allclose(t, expected_t, atol=1e-12, rtol=0.0)
+            assert np.allclose(values, signal(t), atol=1e-11, rtol=0.0)
+            assert sub.metrics.delivered == t.size
+            assert sub.metrics.overruns == sub.metrics.underruns == 0
+            assert sub.metrics.max_latency == 0.0
+
+        # The buffers only run a few chunks ahead of the subscriptions
+        assert publisher.metrics.samples <= 1.5 * 1050
+        assert publisher.closed
+
+    asyncio.run(main())
+
+
+def test_overrun():
+    async def main():
+        clock = FakeClock()
+        publisher = ReferencePublisher(
+            reference(), clock=clock, executor=InlineExecutor()
+        )
+        async with publisher:
+            sub = publisher.subscribe(rate=100.0)
+            first = asyncio.create_task(sub.get())
+            await clock.advance(0.0)
+            assert first.result()[0] == 0.0
+
+            # The consumer comes back 35 ms late and gets the sample that is due, not the stale ones
+            await clock.advance(0.035)
+            t, _ = await sub.get()
+            assert abs(t - 0.03) < 1e-12
+            assert sub.metrics.overruns == 2
+            assert abs(sub.metrics.max_latency - 0.005) < 1e-12
+
+    asyncio.run(main())
+
+
+def test_underrun():
+    async def main():
+        clock, executor = FakeClock(), HeldExecutor()
+        publisher = ReferencePublisher(reference(), clock=clock, executor=executor)
+        async with publisher:
+            sub = publisher.subscribe(rate=100.0)
+            task = asyncio.create_task(sub.get())
+            await clock.advance(0.002)
+            assert not task.done()
+
+            # The chunk is computed 2 ms after the deadline of its first sample
+            executor.release()
+            await clock.advance(0.0)
+            assert task.result() == (0.0, reference()(0.0))
+            assert sub.metrics.underruns == 1
+            assert abs(sub.metrics.max_latency - 0.002) < 1e-12
+
+    asyncio.run(main())
+
+
+def test_idle_subscription():
+    async def main():
+        clock = FakeClock()
+        publisher = ReferencePublisher(
+            reference(), clock=clock, executor=InlineExecutor()
+        )
+        async with publisher:
+            active, idle = publisher.subscribe(rate=100.0), publisher.subscribe(
+                rate=100.0
+            )
+            task = asyncio.create_task(collect(active, 100))
+            for _ in range(100):
+                await clock.advance(0.01)
+            assert len(task.result()) == 100
+            assert active.metrics.overruns == 0
+
+            # The idle subscription skips the overwritten samples when it reads again
+            t, _ = await idle.get()
+            assert abs(t - 1.0) < 1e-12
+            assert idle.metrics.overruns == 100
+
+    asyncio.run(main())
+
+
+def test_failing_signal():
+    class Failing(signals.Signal):
+        def _signal(self, t):
+            raise ValueError("evaluation failed")
+
+    async def main():
+        clock = FakeClock()
+        publisher = ReferencePublisher(
+            Failing(t_start=0.5), clock=clock, executor=InlineExecutor()
+        )
+        async with publisher:
+            sub = publisher.subscribe(rate=10.0)
+            task = asyncio.create_task(collect(sub, 10))
+            await clock.advance(1.0)
+            assert isinstance(task.exception(), ValueError)
+            assert publisher.closed and not publisher.running
+            try:
+                await sub.get()
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("get() did not raise the error of the signal")
+
+    asyncio.run(main())
+
+
+def test_stop_ends_iteration():
+    async def main():
+        clock = FakeClock()
+        publisher = ReferencePublisher(
+            reference(), clock=clock, executor=InlineExecutor()
+        )
+        publisher.start()
+        sub = publisher.subscribe(rate=10.0)
+
+        async def consume():
+            return [t async for t, _ in sub]
+
+        task = asyncio.create_task(consume())
+        await clock.advance(0.45)
+        await publisher.stop()
+        await clock.advance(1.0)
+        assert len(task.result()) == 5
+
+    asyncio.run(main())
+
+
+def test_event_loop_clock():
+    # With the default clock and executor the samples arrive in real time from a worker thread
+    async def main():
+        async with ReferencePublisher(reference(), chunk_duration=0.01) as publisher:
+            sub = publisher.subscribe(rate=1000.0)
+            got = await collect(sub, 20)
+        return sub, got
+
+    sub, got = asyncio.run(main())
+    t, values = np.array(got).T
+    assert np.allclose(values, reference()(t), atol=1e-11, rtol=0.0)
+    assert sub.metrics.delivered == 20
@@ -0,0 +1,68 @@
+import pytest
+import signals
+import numpy as np
+from signals.piecewise import PiecewiseSignal
+
+
+def test_step_sequence():
+    s = signals.StepSequence(times=[1, 2, 3, 4, 5, 7], amplitudes=[2, 1, 0, -1, 2, 0])
+    assert isinstance(s, PiecewiseSignal)
+
+    t = [0.5, 1.0, 2.5, 3.5, 4.5, 6.0, 100.0]
+    expected = [0.0, 2.0, 1.0, 0.0, -1.0, 2.0, 0.0]
+    assert [s(t_i) for t_i in t] == pytest.approx(expected)
+    assert s.eval_on(t) == pytest.approx(expected)
+
+
+def test_step_sequence_matches_sum_of_steps():
+    times = np.random.uniform(0.0, 100.0, size=200)
+    amplitudes = np.random.uniform(-1.0, 1.0, size=200)
+
+    # Reference built as a sum of steps, in the order in which they are given
+    reference = sum(
+        (a - a_prev) * signals.Step(t_start=t0)
+        for t0, a, a_prev in zip(times, amplitudes, np.append(0.0, amplitudes[:-1]))
+    )
+
+    s = signals.StepSequence(times=times, amplitudes=amplitudes)
+    t = np.linspace(-1.0, 101.0, 2000)
+    assert s(t) == pytest.approx(reference(t), abs=1e-12)
+
+
+def test_smoothed_step_sequence():
+    times, amplitudes = [1.0, 2.0, 4.0], [2.0, -1.0, 0.5]
+    s = signals.SmoothedStepSequence(times, amplitudes, smooth_width=0.4)
+    assert isinstance(s, PiecewiseSignal)
+
+    reference = sum(
+        (a - a_prev) * signals.CosineSmoothedStep(t_start=t0, width=0.4)
+        for t0, a, a_prev in zip(times, amplitudes, [0.0] + amplitudes[:-1])
+    )
+    t = np.linspace(0.0, 6.0, 601)
+    assert np.array_equal(s(t), reference(t))
+    assert [s(t_i) for t_i in t.tolist()] == pytest.approx(reference(t), abs=0.0)
+
+
+def test_smoothed_step_sequence_with_overlapping_transitions():
+    s = signals.SmoothedStepSequence([1.0, 1.2], [1.0, 2.0], smooth_width=0.5)
+    assert s(1.3) == pytest.approx(
+        signals.CosineSmoothedStep(t_start=1.0, width=0.5)(1.3)
+        + signals.CosineSmoothedStep(t_start=1.2, width=0.5)(1.3)
+    )
+    assert s(5.0) == pytest.approx(2.0)
+
+
+def test_piecewise_polynomial():
+    # Ramp on [0, 1) followed by a parabola on [1, 3), zero afterwards
+    p = PiecewiseSignal(
+        breakpoints=[0.0, 1.0, 3.0], coefficients=[[0, 1, 0], [1, 0, 2]]
+    )
+
+    assert p(-0.5) == pytest.approx(0.0)
+    assert p(0.5) == pytest.approx(0.5)
+    assert p(2.0) == pytest.approx(3.0)
+    assert p(3.0) == pytest.approx(0.0)
+    assert p.eval_on([-0.5, 0.5, 2.0, 3.0]) == pytest.approx([0.0, 0.5, 3.0, 0.0])
+
+    # Composes with the signal arithmetic
+    assert (2 * p + signals.Step())(0.5) == pytest.approx(2.0)
@@ -0,0 +1,78 @@
+import json
+import pickle
+import pytest
+import signals
+import numpy as np
+from dataclasses import dataclass
+from signals.serialization import dumps, loads, register_type
+
+
+def library():
+    shared = signals.Sinusoid(t_start=1.0, t_end=np.inf, ampl=0.5, freq=0.3)
+    return [
+        signals.Doublet(t_start=1.0, ampl=2.0, block_width=0.5) + shared,
+        signals.ThreeTwoOneOne(t_start=2.0) * 0.5 - shared,
+        signals.RandomizedCosineStepSequence(
+            t_max=50.0, ampl_max=1.0, block_width=2.0, smooth_width=0.5, rng=1
+        ),
+        signals.CompositeSinusoid(0.0, 10.0, [0.1, 0.5], [1.0, 2.0], schroeder=True),
+        signals.RampSinusoid(t_start=0.0, t_end=5.0) / (signals.Ramp() + 1),
+        signals.SeeSaw(ampl=1.0, freq=0.2) + signals.Const(value=2.0),
+    ]
+
+
+T = np.linspace(-1.0, 60.0, 2001)
+
+
+def test_dict_roundtrip():
+    for signal in library():
+        data = json.loads(json.dumps(signals.to_dict(signal)))
+        clone = signals.from_dict(data)
+        assert np.array_equal(clone(T), signal(T))
+        assert loads(dumps(signal))(3.3) == signal(3.3)
+
+    # Non-finite floats are stored as strings, so the dict is valid strict JSON
+    text = json.dumps(signals.to_dict(signals.Step()), allow_nan=False)
+    assert '"inf"' in text
+
+
+def test_binary_roundtrip(tmp_path):
+    path = tmp_path / "library.npz"
+    originals = library()
+    signals.save_signals(path, originals)
+    loaded = signals.load_signals(path)
+
+    assert len(loaded) == len(originals)
+    for clone, signal in zip(loaded, originals):
+        assert np.array_equal(clone(T), signal(T))
+
+    # Shared nodes stay shared across the loaded signals
+    assert loaded[0].rhs is loaded[1].rhs
+
+
+def test_binary_size(tmp_path):
+    # Piecewise sequences are stored as flat arrays, smaller than a pickle of their arrays and breakpoint lists
+    path = tmp_path / "sequences.npz"
+    sequences = [
+        signals.RandomizedCosineStepSequence(
+            t_max=200.0, ampl_max=1.0, block_width=2.0, smooth_width=0.5, rng=i
+        )
+        for i in range(10)
+    ]
+    signals.save_signals(path, sequences)
+    assert path.stat().st_size < len(pickle.dumps(sequences))
+
+
+def test_custom_types():
+    @dataclass
+    class Custom(signals.Signal):
+        gain: float = 1.0
+
+        def _signal(self, t):
+            return self.gain * t
+
+    with pytest.raises(TypeError):
+        signals.to_dict(Custom())
+
+    register_type(Custom)
+    assert signals.from_dict(signals.to_dict(Custom(gain=3.0)))(2.0) == 6.0
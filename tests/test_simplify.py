@@ -0,0 +1,72 @@
+import pytest
+import signals
+import numpy as np
+from signals.tree import count_nodes
+
+
+def test_simplify_folds_constants():
+    s = signals.Sinusoid(freq=0.3)
+    x = 2 * 3 * s + 0 * signals.Ramp() + signals.Const(value=1.0) * 2.0
+    y = x.simplify()
+
+    t = np.linspace(-1.0, 10.0, 201)
+    assert y(t) == pytest.approx(x(t), abs=1e-12)
+    assert count_nodes(y) < count_nodes(x)
+
+    assert isinstance((s - s).simplify(), signals.Const)
+    assert (s - s).simplify()(1.0) == 0.0
+
+
+def test_simplify_merges_equal_leaves():
+    x = signals.Sinusoid(freq=2.0) + 0.5 * signals.Sinusoid(freq=2.0)
+    y = x.simplify()
+    assert count_nodes(y) == 3
+    assert y(0.1) == pytest.approx(x(0.1))
+
+
+def test_simplify_joins_steps():
+    # Equal steps on touching windows become one step, a windowed constant counts as a step
+    x = (
+        2.0 * signals.Step(t_start=0.0, t_end=1.0)
+        + 2.0 * signals.Step(t_start=1.0, t_end=2.5)
+        + signals.Const(t_start=2.5, t_end=4.0, value=2.0)
+        + signals.Step(t_start=5.0, t_end=6.0)
+    )
+    y = x.simplify()
+
+    steps = [n for n in _nodes(y) if type(n) is signals.Step]
+    assert sorted((s.t_start, s.t_end) for s in steps) == [(0.0, 4.0), (5.0, 6.0)]
+
+    t = np.linspace(-1.0, 7.0, 321)
+    assert np.array_equal(y(t), x(t))
+
+
+def test_simplify_nonlinear():
+    s = signals.Sinusoid(t_start=1.0)
+    e = signals.Exponential(alpha=0.1)
+    x = (3 * s * e + 1.0) / (2.0 * e + 1.0) * signals.Ramp()
+    t = np.linspace(0.0, 5.0, 101)
+    assert x.simplify()(t) == pytest.approx(x(t), rel=1e-12)
+
+
+def test_simplify_deep_chain_is_balanced():
+    x = signals.Const(0.0)
+    for i in range(2000):
+        x += signals.Sinusoid(t_start=float(i), freq=1.0 + i)
+
+    # The rebuilt sum has logarithmic depth, so the recursive evaluation works
+    y = x.simplify()
+    assert y(10.5) == pytest.approx(
+        sum(signals.Sinusoid(t_start=float(i), freq=1.0 + i)(10.5) for i in range(11))
+    )
+
+
+def _nodes(signal):
+    from signals.tree import children
+
+    stack, out = [signal], []
+    while stack:
+        node = stack.pop()
+        out.append(node)
+        stack.extend(children(node))
+    return out
@@ -0,0 +1,65 @@
+import pytest
+import signals
+import numpy as np
+
+
+def test_seeded_sequences_are_reproducible():
+    kwargs = dict(t_max=50.0, ampl_max=2.0, block_width=2.0, vary_timings=0.3)
+    t = np.linspace(0.0, 50.0, 1001)
+
+    s1 = signals.RandomizedStepSequence(rng=42, **kwargs)
+    s2 = signals.RandomizedStepSequence(rng=np.random.default_rng(42), **kwargs)
+    s3 = signals.RandomizedStepSequence(rng=43, **kwargs)
+
+    assert np.array_equal(s1(t), s2(t))
+    assert not np.array_equal(s1(t), s3(t))
+
+
+def test_step_sequence_batch():
+    batch = signals.RandomizedStepSequenceBatch(
+        batch_size=64,
+        t_max=30.0,
+        ampl_max=1.0,
+        block_width=1.5,
+        vary_timings=0.5,
+        rng=7,
+    )
+    assert len(batch) == 64
+    assert batch.times.shape == batch.levels.shape
+
+    t = np.linspace(-1.0, 35.0, 777)
+    samples = batch.eval_on(t)
+    assert samples.shape == (64, t.size)
+    for i in [0, 13, 63]:
+        assert np.array_equal(samples[i], batch[i](t))
+
+    # Unsorted time vectors give the same samples
+    perm = np.random.permutation(t.size)
+    assert np.array_equal(batch.eval_on(t[perm]), samples[:, perm])
+
+    # Same seed, same batch
+    again = signals.RandomizedStepSequenceBatch(
+        batch_size=64,
+        t_max=30.0,
+        ampl_max=1.0,
+        block_width=1.5,
+        vary_timings=0.5,
+        rng=7,
+    )
+    assert np.array_equal(again.eval_on(t), samples)
+
+
+def test_cosine_step_sequence_batch():
+    batch = signals.RandomizedCosineStepSequenceBatch(
+        batch_size=16,
+        t_max=20.0,
+        ampl_max=1.0,
+        block_width=2.0,
+        smooth_width=0.5,
+        vary_timings=0.4,
+        rng=np.random.SeedSequence(3),
+    )
+    t = np.linspace(0.0, 22.0, 2001)
+    samples = batch.eval_on(t)
+    for i in range(len(batch)):
+        assert samples[i] == pytest.approx(batch[i](t), abs=1e-12)
@@ -0,0 +1,48 @@
+import pytest
+import signals
+import numpy as np
+from itertools import islice
+
+
+def reference_signal():
+    seq = signals.StepSequence(
+        times=np.arange(0.0, 10.0, 0.5), amplitudes=np.sin(np.arange(20))
+    )
+    doublet = signals.Doublet(t_start=2.0, ampl=1.5, block_width=0.7)
+    sine = signals.Sinusoid(t_start=1.0, t_end=3.0, freq=0.8)
+    return 2.0 * seq + doublet - sine * signals.Ramp() + 0.5
+
+
+def test_scalar_stream():
+    s = reference_signal()
+    dt, n = 0.01, 1200
+    t = 0.1 + dt * np.arange(n)
+
+    stream = s.stream(dt=dt, t0=0.1)
+    values = list(islice(stream, n))
+
+    assert values == pytest.approx(s(t), abs=1e-12)
+    assert stream.time == pytest.approx(t[-1] + dt)
+
+
+def test_chunked_stream():
+    s = reference_signal()
+    dt, chunk = 0.01, 128
+    buffer = np.empty(chunk)
+    stream = s.stream(dt=dt, chunk=chunk, out=buffer)
+
+    for i in range(10):
+        values = next(stream)
+        assert values is buffer
+        t = dt * np.arange(i * chunk, (i + 1) * chunk)
+        assert values == pytest.approx(s(t), abs=1e-12)
+
+
+def test_expired_terms_are_dropped():
+    s = signals.Const(0.0)
+    for i in range(50):
+        s += signals.Step(t_start=0.1 * i, t_end=0.1 * i + 0.05)
+
+    stream = s.stream(dt=0.01)
+    list(islice(stream, 1000))
+    assert stream.n_active == 0
@@ -0,0 +1,105 @@
+import pytest
+import signals
+import numpy as np
+from signals import TabulatedSignal, from_dict, to_dict
+from signals.tabulate import tabulate
+
+T = np.linspace(-1.0, 31.0, 32001)
+
+
+def reference():
+    return (
+        5 * signals.Step(t_start=2.0, t_end=20.0)
+        + signals.Sinusoid(t_end=10.0, freq=0.5)
+        + 2 * signals.CosineSmoothedStep(t_start=4.0, width=1.5)
+        + signals.SeeSaw(t_start=1.0, freq=0.3)
+    )
+
+
+def inside(signal, t, t0=0.0, t1=30.0):
+    return np.where((t0 <= t) & (t < t1), signal(t), 0.0)
+
+
+@pytest.mark.parametrize("kind", ["linear", "cubic"])
+def test_tabulate_error(kind):
+    signal = reference()
+    table = signal.tabulate(0.0, 30.0, tol=1e-6, kind=kind)
+
+    assert isinstance(table, TabulatedSignal)
+    assert table.support == (0.0, 30.0)
+    assert table.error < 2e-6
+    assert table(T) == pytest.approx(inside(signal, T), abs=2 * table.error)
+
+    # The edges of the windows are knots, the jumps are exact on both sides
+    for t in [2.0, 20.0, np.nextafter(20.0, 0.0), 4.0, 5.5, 10.0]:
+        assert table(t) == pytest.approx(signal(t), abs=1e-12)
+    assert table(30.0) == table(-1.0) == 0.0
+
+
+def test_tabulate_stateful():
+    # The samples of a filter are knots, its steps between them are exact
+    signal = signals.Step(t_start=1.0).lowpass(tau=0.2, dt=0.01)
+    table = signal.tabulate(0.0, 5.0, tol=1e-4)
+    assert table.error <= 1e-4
+    assert table(T) == pytest.approx(inside(signal, T, 0.0, 5.0), abs=1e-12)
+
+    shifted = signal.shift(0.5).scale_time(2.0)
+    assert shifted.tabulate(0.0, 5.0, tol=1e-4).error <= 1e-4
+
+    # A table that cannot reach the tolerance is reported
+    with pytest.warns(RuntimeWarning):
+        tabulate(signals.Sinusoid(freq=0.5), 0.0, 5.0, tol=1e-6, min_width=0.1)
+
+
+def test_tabulate_compact():
+    signal = reference()
+    linear = signal.tabulate(0.0, 30.0, tol=1e-6)
+    cubic = signal.tabulate(0.0, 30.0, tol=1e-6, kind="cubic")
+
+    # Cubic segments need far fewer knots for smooth signals
+    assert cubic.n_knots < linear.n_knots / 10
+    assert cubic.nbytes < linear.nbytes / 10
+    assert cubic.nbytes == 8 * cubic.n_knots + 32 * cubic.n_segments + 8 * (
+        cubic.n_segments + 1
+    )
+
+
+def test_tabulate_scalar_and_array():
+    table = reference().tabulate(0.0, 30.0, tol=1e-5, kind="cubic")
+    probes = np.linspace(-1.0, 31.0, 997)
+
+    assert np.array_equal([table(t) for t in probes.tolist()], table(probes))
+    assert np.array_equal(
+        table.eval_on(signals.UniformGrid(-1.0, 0.01, 3200)),
+        table(signals.UniformGrid(-1.0, 0.01, 3200).times()),
+    )
+
+
+def test_tabulate_transforms():
+    maneuver = signals.Doublet(t_start=1.0, ampl=2.0, block_width=0.5)
+    signal = maneuver.repeat(period=3.0, count=5).shift(0.25) + maneuver.scale_time(1.5)
+    table = signal.tabulate(0.0, 20.0, tol=1e-9)
+
+    # Piecewise constant, every knot comes from a breakpoint and the table is exact
+    assert table.error == 0.0
+    assert np.array_equal(table(T), inside(signal, T, 0.0, 20.0))
+
+
+def test_tabulate_arithmetic():
+    table = reference().tabulate(0.0, 30.0, tol=1e-6, kind="cubic")
+    expression = 2 * table - signals.Step(t_start=15.0) + table.shift(1.0)
+    expected = 2 * table(T) - signals.Step(t_start=15.0)(T) + table(T - 1.0)
+
+    assert expression(T) == pytest.approx(expected, abs=1e-12)
+    # SeeSaw has no derivative rule, the derivative of its table is the slope of the interpolant
+    slope = (reference()(12.5 + 1e-5) - reference()(12.5 - 1e-5)) / 2e-5
+    assert table.derivative()(12.5) == pytest.approx(slope, abs=1e-3)
+
+
+def test_tabulate_serialization():
+    table = reference().tabulate(0.0, 30.0, tol=1e-4, kind="cubic")
+    loaded = from_dict(to_dict(table))
+
+    assert isinstance(loaded, TabulatedSignal)
+    assert loaded.error == table.error
+    assert np.array_equal(loaded(T), table(T))
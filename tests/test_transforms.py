@@ -0,0 +1,85 @@
+import pytest
+import signals
+import numpy as np
+from signals.tree import count_nodes
+
+T = np.linspace(-5.0, 60.0, 6501)
+
+
+def test_shift():
+    doublet = signals.Doublet(t_start=1.0, ampl=2.0, block_width=0.5)
+    shifted = doublet.shift(10.0)
+    expected = signals.Doublet(t_start=11.0, ampl=2.0, block_width=0.5)
+
+    assert shifted.signal is doublet
+    assert np.array_equal(shifted(T), expected(T))
+    assert shifted(11.2) == expected(11.2)
+    assert shifted.support == (11.0, 12.0)
+
+    # Shifts of shifts are merged into one node
+    assert shifted.shift(-4.0).signal is doublet
+    assert shifted.shift(-4.0).delay == 6.0
+
+
+def test_scale_time():
+    sine = signals.Sinusoid(t_start=1.0, t_end=9.0, freq=0.4, phi=0.2)
+    slow = sine.scale_time(2.0)
+    expected = signals.Sinusoid(t_start=2.0, t_end=18.0, freq=0.2, phi=0.2)
+
+    assert slow(T) == pytest.approx(expected(T), abs=1e-12)
+    assert slow.support == (2.0, 18.0)
+    assert slow.derivative()(T) == pytest.approx(expected.derivative()(T), abs=1e-12)
+
+
+def test_repeat():
+    maneuver = signals.ThreeTwoOneOne(t_start=1.0, ampl=1.0) + signals.Doublet(
+        t_start=9.0, ampl=0.5, block_width=1.0
+    )
+    repeated = maneuver.repeat(period=15.0, count=3)
+    expected = maneuver + maneuver.shift(15.0) + maneuver.shift(30.0)
+
+    assert repeated.t_start == 1.0
+    assert repeated.support == (1.0, 46.0)
+    assert np.array_equal(repeated(T), expected(T))
+    assert [repeated(t) for t in T[::7]] == expected(T[::7]).tolist()
+
+    # An infinite repetition shares one instance of the maneuver
+    forever = maneuver.repeat(period=15.0)
+    assert count_nodes(forever) == count_nodes(maneuver) + 1
+    phase = np.arange(300) * 0.05 + 0.025
+    assert np.array_equal(forever(1.0 + 15.0 * 10**6 + phase), maneuver(1.0 + phase))
+
+
+def test_transforms_on_grids_and_files(tmp_path):
+    sine = signals.Sinusoid(t_start=0.5, t_end=4.0, freq=1.3)
+    signal = sine.shift(2.0) + sine.scale_time(3.0) + sine.repeat(2.0, count=4)
+    grid = signals.UniformGrid(-1.0, 0.01, 2000)
+
+    assert signal.eval_on(grid) == pytest.approx(signal(grid.times()), abs=1e-11)
+
+    path = tmp_path / "transforms.npz"
+    signals.save_signals(path, [signal])
+    (loaded,) = signals.load_signals(path)
+    assert np.array_equal(loaded(T), signal(T))
+    assert signals.from_dict(signals.to_dict(signal))(3.3) == signal(3.3)
+
+
+def test_transform_windows_on_grids():
+    # The window edges of the transformed steps fall on the same samples as on the timestamps of the grid
+    cases = [
+        (signals.Step(t_start=1.35, t_end=2.35).scale_time(3.0), (0.0, 0.05)),
+        (signals.Step(t_start=1.939).shift(1.167), (0.372, 0.001)),
+    ]
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        t_start = round(rng.uniform(0.0, 3.0), 3)
+        step = signals.Step(
+            t_start=t_start, t_end=t_start + round(rng.uniform(0.1, 2.0), 2)
+        )
+        signal = step.shift(round(rng.uniform(-2.0, 2.0), 3))
+        signal = signal + step.scale_time(round(rng.uniform(0.2, 5.0), 2))
+        cases.append((signal, (round(rng.uniform(-1.0, 1.0), 3), 0.001)))
+
+    for signal, (t0, dt) in cases:
+        grid = signals.UniformGrid(t0, dt, 5000)
+        assert np.array_equal(signal.eval_on(grid), signal(grid.times()))